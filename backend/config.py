@@ -0,0 +1,115 @@
+"""
+Shared Configuration - The Consensus Matrix File
+================================================
+
+``config/consensus_matrix.json`` drives both the grade consensus (modes,
+veto rules, thresholds) and the TVCA internet-drift penalty
+(``tvca.internet_penalty_weight``). Both read it through the process-wide
+``ConfigFile`` returned by ``get_consensus_matrix()``, so an edit reaches
+them together: the file's modification time is checked at most every
+``CONSENSUS_MATRIX_CHECK_INTERVAL`` seconds and the JSON is re-read when it
+changes.
+
+Assigned to: Jatin (Digital Twin Architect)
+Branch: feat/jatin-twin
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+
+CONSENSUS_MATRIX_PATH = Path(__file__).resolve().parents[1] / "config" / "consensus_matrix.json"
+DEFAULT_PENALTY_WEIGHT = 0.5
+
+
+class ConfigFile:
+    """A JSON config file, re-read when its modification time changes."""
+
+    def __init__(self, path: Union[str, Path], check_interval: float = 5.0):
+        """
+        Args:
+            path: JSON file
+            check_interval: Minimum seconds between modification-time checks
+        """
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.data: Optional[dict] = None
+        self.version = 0  # Incremented on every successful read
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self.reload()
+
+    def reload(self) -> bool:
+        """
+        Read the file now.
+
+        Returns:
+            True if it was read (a missing or invalid file keeps the
+            current data)
+        """
+        self._checked_at = time.monotonic()
+        try:
+            mtime = self.path.stat().st_mtime
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict):
+            return False
+        self.data = data
+        self._mtime = mtime
+        self.version += 1
+        return True
+
+    def maybe_reload(self) -> bool:
+        """Re-read if the file changed (checked at most every ``check_interval``)."""
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = time.monotonic()
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return False
+        return mtime != self._mtime and self.reload()
+
+    def get(self) -> Optional[dict]:
+        """The current contents (None if the file was never readable)."""
+        self.maybe_reload()
+        return self.data
+
+
+_consensus_matrix: Optional[ConfigFile] = None
+
+
+def get_consensus_matrix() -> ConfigFile:
+    """
+    Process-wide consensus matrix file (``CONSENSUS_MATRIX_PATH`` and
+    ``CONSENSUS_MATRIX_CHECK_INTERVAL``).
+    """
+    global _consensus_matrix
+    if _consensus_matrix is None:
+        _consensus_matrix = ConfigFile(
+            os.getenv("CONSENSUS_MATRIX_PATH") or CONSENSUS_MATRIX_PATH,
+            check_interval=float(os.getenv("CONSENSUS_MATRIX_CHECK_INTERVAL", "5")),
+        )
+    return _consensus_matrix
+
+
+def penalty_weight(config: Optional[dict]) -> float:
+    """The internet-drift penalty of a consensus matrix (default if unset)."""
+    tvca = (config or {}).get("tvca", {})
+    return float(tvca.get("internet_penalty_weight", DEFAULT_PENALTY_WEIGHT))
+
+
+def load_penalty_weight(path: Optional[Union[str, Path]] = None) -> float:
+    """
+    Read the internet-drift penalty from a consensus matrix file.
+
+    Args:
+        path: Config file (defaults to the shared consensus matrix)
+    """
+    config = ConfigFile(path).data if path else get_consensus_matrix().get()
+    return penalty_weight(config)
@@ -7,6 +7,6 @@ Branch: feat/jatin-twin
 """
 
 from backend.digital_twin.personality_loader import load_teacher_persona
-from backend.digital_twin.decision_maker import synthesize_grade
+from backend.digital_twin.decision_maker import synthesize_grade, synthesize_grades
 
-__all__ = ["load_teacher_persona", "synthesize_grade"]
+__all__ = ["load_teacher_persona", "synthesize_grade", "synthesize_grades"]
@@ -0,0 +1,292 @@
+"""
+Consensus Engine - Table-Driven Grade Consensus
+===============================================
+
+Compiles ``config/consensus_matrix.json`` into arrays and scores any
+number of answers at once:
+
+    - ``grading_modes``: per-mode agent weights, multiplied by the teacher's
+      ``grading_bias`` and renormalised
+    - ``veto_rules``: a rule table (agent column, threshold, action), applied
+      to all answers with array comparisons. Rule thresholds are fractions
+      of the 0-100 score scale; actions are ``zero_score``, ``reduce_score``
+      (by ``reduction_factor``) and ``flag_review``
+    - ``thresholds``: votes below ``minimum_confidence`` (e.g. an agent that
+      failed to respond) are left out of the average and cannot trigger a
+      veto; ``unanimous_bonus`` is added when every counted agent awards at
+      least ``passing_grade``; ``disagreement_penalty`` is subtracted when
+      the counted scores span more than ``excellent_grade - passing_grade``
+
+The file is read through ``backend.config`` (the same hot-reloaded copy the
+TVCA penalty uses): its modification time is checked at most every
+``check_interval`` seconds and the engine recompiles when it changes. A single
+answer and a cohort go through the same ``score()`` call, so both paths
+always agree.
+
+Assigned to: Jatin (Digital Twin Architect)
+Branch: feat/jatin-twin
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from backend.config import CONSENSUS_MATRIX_PATH, ConfigFile, get_consensus_matrix
+
+
+# Column order of every score/confidence block (CouncilVotes.to_list order)
+AGENTS = ("fact_agent", "structure_agent", "critical_agent", "security_agent")
+# Matching keys of TeacherPersona.grading_bias
+BIAS_KEYS = ("fact_weight", "structure_weight", "critical_weight", "security_weight")
+SECURITY = AGENTS.index("security_agent")
+
+DEFAULT_MODE = "balanced"
+# Review flags on the security score (independent of the veto rules)
+PLAGIARISM_FLAG_BELOW = 50.0
+AI_FLAG_BELOW = 70.0
+
+ACTIONS = ("zero_score", "reduce_score", "flag_review")
+ZERO_SCORE, REDUCE_SCORE, FLAG_REVIEW = range(len(ACTIONS))
+
+_DEFAULT_THRESHOLDS = {
+    "passing_grade": 60.0,
+    "excellent_grade": 90.0,
+    "minimum_confidence": 0.5,
+    "unanimous_bonus": 0.0,
+    "disagreement_penalty": 0.0,
+}
+
+
+@dataclass
+class CompiledMatrix:
+    """The consensus matrix as arrays."""
+    mode_weights: dict[str, np.ndarray]  # Mode name ("balanced") -> (4,) weights
+    rule_names: list[str]
+    rule_agents: np.ndarray  # (R,) agent column of each enabled rule
+    rule_thresholds: np.ndarray  # (R,) on the 0-100 scale
+    rule_actions: np.ndarray  # (R,) index into ACTIONS
+    rule_factors: np.ndarray  # (R,) score multiplier for reduce_score
+    rule_messages: list[str]
+    thresholds: dict[str, float] = field(default_factory=lambda: dict(_DEFAULT_THRESHOLDS))
+
+    @classmethod
+    def from_config(cls, config: dict) -> "CompiledMatrix":
+        mode_weights = {}
+        for name, mode in config["grading_modes"].items():
+            weights = np.array([float(mode.get(agent, 0.0)) for agent in AGENTS])
+            if weights.sum() <= 0:
+                raise ValueError(f"Grading mode {name} has no positive weights")
+            mode_weights[name.removesuffix("_mode")] = weights / weights.sum()
+
+        rules = [
+            (name, rule) for name, rule in config.get("veto_rules", {}).items()
+            if not name.startswith("_") and isinstance(rule, dict) and rule.get("enabled", False)
+        ]
+        for name, rule in rules:
+            if rule["agent"] not in AGENTS or rule["action"] not in ACTIONS:
+                raise ValueError(f"Veto rule {name} has an unknown agent or action")
+
+        thresholds = dict(_DEFAULT_THRESHOLDS)
+        thresholds.update(
+            (k, float(v)) for k, v in config.get("thresholds", {}).items() if isinstance(v, (int, float))
+        )
+        return cls(
+            mode_weights=mode_weights,
+            rule_names=[name for name, _ in rules],
+            rule_agents=np.array([AGENTS.index(r["agent"]) for _, r in rules], dtype=np.int64),
+            rule_thresholds=np.array([100.0 * float(r["threshold"]) for _, r in rules]),
+            rule_actions=np.array([ACTIONS.index(r["action"]) for _, r in rules], dtype=np.int64),
+            rule_factors=np.array([float(r.get("reduction_factor", 1.0)) for _, r in rules]),
+            rule_messages=[r.get("message", name) for name, r in rules],
+            thresholds=thresholds,
+        )
+
+
+@dataclass
+class ConsensusResult:
+    """Consensus for N answers; every array has one entry per answer."""
+    grades: np.ndarray  # 0-100, unrounded
+    vetoed: np.ndarray  # A zero_score rule fired
+    review: np.ndarray  # A flag_review rule fired
+    plagiarism_flags: np.ndarray
+    ai_generated_flags: np.ndarray
+    rule_hits: np.ndarray  # (N x R) which rules fired
+    rule_names: list[str]
+    rule_messages: list[str]
+
+    def __len__(self) -> int:
+        return len(self.grades)
+
+    def messages(self, index: int) -> list[str]:
+        """Messages of the rules that fired for one answer."""
+        return [m for m, hit in zip(self.rule_messages, self.rule_hits[index]) if hit]
+
+
+class ConsensusEngine:
+    """Compiled consensus matrix, recompiled when the JSON file changes."""
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        check_interval: float = 5.0,
+        source: Optional[ConfigFile] = None,
+    ):
+        """
+        Args:
+            path: Matrix file (defaults to ``config/consensus_matrix.json``)
+            check_interval: Minimum seconds between modification-time checks
+            source: Already-open matrix file to compile (overrides ``path``
+                and ``check_interval``)
+        """
+        self.source = source or ConfigFile(path or CONSENSUS_MATRIX_PATH, check_interval)
+        self.path = self.source.path
+        self.matrix: Optional[CompiledMatrix] = None
+        self.reloads = 0
+        self.answers = 0
+        self._version: Optional[int] = None
+        if not self._compile():
+            raise ValueError(f"Cannot compile consensus matrix {self.path}")
+
+    @classmethod
+    def from_env(cls) -> "ConsensusEngine":
+        """Compile the shared matrix file (see ``backend.config.get_consensus_matrix``)."""
+        return cls(source=get_consensus_matrix())
+
+    def reload(self) -> bool:
+        """
+        Re-read and recompile the file now.
+
+        Returns:
+            True if a new matrix was compiled (a missing or invalid file
+            keeps the current one)
+        """
+        return self.source.reload() and self._compile()
+
+    def maybe_reload(self) -> bool:
+        """Recompile if the file changed (checked at most every ``check_interval``)."""
+        self.source.maybe_reload()
+        return self.source.version != self._version and self._compile()
+
+    def _compile(self) -> bool:
+        version = self.source.version
+        if self.source.data is None or version == self._version:
+            return False
+        self._version = version  # A matrix that fails to compile is not retried
+        try:
+            matrix = CompiledMatrix.from_config(self.source.data)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return False
+        self.matrix = matrix
+        self.reloads += 1
+        return True
+
+    def weights(self, grading_mode: Optional[str] = None, grading_bias: Optional[dict] = None) -> np.ndarray:
+        """
+        Agent weights for a grading mode and teacher bias.
+
+        Args:
+            grading_mode: strict, balanced, creative or lenient (unknown
+                modes fall back to balanced)
+            grading_bias: Teacher's ``*_weight`` multipliers (missing keys
+                count as equal emphasis)
+
+        Returns:
+            (4,) weights summing to 1
+        """
+        self.maybe_reload()
+        modes = self.matrix.mode_weights
+        mode = (grading_mode or DEFAULT_MODE).removesuffix("_mode")
+        weights = modes.get(mode, modes.get(DEFAULT_MODE, next(iter(modes.values()))))
+        if grading_bias:
+            bias = np.array([float(grading_bias.get(key, 0.25)) for key in BIAS_KEYS])
+            if (weights * bias).sum() > 0:
+                weights = weights * bias
+        return weights / weights.sum()
+
+    def score(
+        self,
+        scores: np.ndarray,
+        confidences: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+    ) -> ConsensusResult:
+        """
+        Consensus for a block of council results.
+
+        Args:
+            scores: (N x 4) agent scores (0-100), columns in ``AGENTS`` order
+            confidences: (N x 4) agent confidences (0-1); None counts every vote
+            weights: (4,) shared or (N x 4) per-answer weights (defaults to
+                the balanced mode)
+        """
+        self.maybe_reload()
+        matrix = self.matrix
+        limits = matrix.thresholds
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1, len(AGENTS))
+        n = len(scores)
+        if confidences is None:
+            counted = np.ones(scores.shape, dtype=bool)
+        else:
+            counted = np.asarray(confidences, dtype=np.float64).reshape(n, len(AGENTS)) >= limits["minimum_confidence"]
+        if weights is None:
+            weights = self.weights()
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), scores.shape)
+
+        # Weighted average over the confident votes (all votes if none is)
+        effective = np.where(counted, weights, 0.0)
+        fallback = effective.sum(axis=1) <= 0
+        effective[fallback] = weights[fallback]
+        counted[fallback] = True
+        grades = (scores * effective).sum(axis=1) / effective.sum(axis=1)
+
+        # Agreement adjustments on the counted scores
+        lowest = np.where(counted, scores, np.inf).min(axis=1)
+        highest = np.where(counted, scores, -np.inf).max(axis=1)
+        grades = grades + np.where(lowest >= limits["passing_grade"], limits["unanimous_bonus"], 0.0)
+        spread_limit = limits["excellent_grade"] - limits["passing_grade"]
+        grades = grades - np.where(highest - lowest > spread_limit, limits["disagreement_penalty"], 0.0)
+
+        # Rule table: (N x R) hits, only on confident votes
+        rule_hits = (
+            (scores[:, matrix.rule_agents] < matrix.rule_thresholds)
+            & counted[:, matrix.rule_agents]
+        )
+        vetoed = (rule_hits & (matrix.rule_actions == ZERO_SCORE)).any(axis=1)
+        review = (rule_hits & (matrix.rule_actions == FLAG_REVIEW)).any(axis=1)
+        reduce = np.where(rule_hits & (matrix.rule_actions == REDUCE_SCORE), matrix.rule_factors, 1.0)
+        grades = np.clip(grades * reduce.prod(axis=1), 0.0, 100.0)
+        grades[vetoed] = 0.0
+
+        security = scores[:, SECURITY]
+        self.answers += n
+        return ConsensusResult(
+            grades=grades,
+            vetoed=vetoed,
+            review=review,
+            plagiarism_flags=vetoed | (security < PLAGIARISM_FLAG_BELOW),
+            ai_generated_flags=vetoed | review | (security < AI_FLAG_BELOW),
+            rule_hits=rule_hits,
+            rule_names=list(matrix.rule_names),
+            rule_messages=list(matrix.rule_messages),
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "modes": sorted(self.matrix.mode_weights),
+            "rules": list(self.matrix.rule_names),
+            "reloads": self.reloads,
+            "answers": self.answers,
+        }
+
+
+_engine: Optional[ConsensusEngine] = None
+
+
+def get_consensus_engine() -> ConsensusEngine:
+    """Process-wide engine (compiled on first use, e.g. at startup)."""
+    global _engine
+    if _engine is None:
+        _engine = ConsensusEngine.from_env()
+    return _engine
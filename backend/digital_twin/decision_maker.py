@@ -3,16 +3,21 @@ Decision Maker - Grade Synthesis
 =================================
 
 Synthesizes final grades using swarm votes and teacher persona bias.
+``synthesize_grade`` handles one answer; ``synthesize_grades`` handles a
+whole cohort as arrays, building feedback strings only when asked.
 
 Assigned to: Jatin (Digital Twin Architect)
 Branch: feat/jatin-twin
 """
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence
 import json
 import os
 
+import numpy as np
+
+from backend.digital_twin.consensus_engine import AGENTS, ConsensusResult, get_consensus_engine
 from backend.digital_twin.personality_loader import TeacherPersona
 
 
@@ -37,6 +42,31 @@ def _score_to_letter(score: float) -> str:
     return "F"
 
 
+# Lower bounds of D, C, B, A (vectorised _score_to_letter)
+_LETTER_BOUNDS = np.array([60.0, 70.0, 80.0, 90.0])
+_LETTERS = np.array(["F", "D", "C", "B", "A"])
+
+
+def _scores_to_letters(scores: np.ndarray) -> np.ndarray:
+    """Letter grade of every score in an array."""
+    return _LETTERS[np.searchsorted(_LETTER_BOUNDS, scores, side="right")]
+
+
+def _round_grade(grade: float) -> float:
+    """Round a grade to 0.1 (shared by the single and cohort paths)."""
+    return round(float(grade), 1)
+
+
+def _round_grades(grades: np.ndarray) -> np.ndarray:
+    """
+    ``_round_grade`` over an array.
+
+    ``np.round`` scales by 10 before rounding and can land on the other
+    side of a tie (50.15 -> 50.2), so round element-wise instead.
+    """
+    return np.array([_round_grade(g) for g in grades], dtype=float)
+
+
 async def synthesize_grade(
     council_votes,
     teacher_persona: TeacherPersona,
@@ -45,56 +75,145 @@ async def synthesize_grade(
     """
     Synthesize the final grade from swarm votes with teacher bias.
     
-    # TODO Jatin: Apply teacher personality weights to agent scores.
+    Weights, veto rules and thresholds come from the consensus matrix
+    (see ``consensus_engine``), so this matches the cohort path exactly.
+    
     # TODO Jatin: Generate feedback in the teacher's unique voice.
-    # TODO Jatin: Handle veto scenarios (plagiarism detected).
     
     Args:
         council_votes: Votes from all 4 swarm agents
         teacher_persona: Teacher's Digital Twin persona
-        grading_mode: strict, balanced, or creative
+        grading_mode: strict, balanced, creative or lenient
         
     Returns:
         FinalEvaluation with grade and personalized feedback
     """
     votes = council_votes.to_list()
-    bias = teacher_persona.grading_bias
-    
-    # Check for plagiarism veto
-    security_vote = votes[3]
-    if security_vote.score < 30:
-        return FinalEvaluation(
-            final_grade=0.0,
-            letter_grade="F",
-            teacher_feedback="Academic integrity violation detected.",
-            agent_votes=[_vote_to_dict(v) for v in votes],
-            consensus_method="veto",
-            plagiarism_flag=True,
-            ai_generated_flag=True,
-        )
-    
-    # Weighted average with teacher bias
-    weights = [
-        bias.get("fact_weight", 0.25),
-        bias.get("structure_weight", 0.25),
-        bias.get("critical_weight", 0.25),
-        bias.get("security_weight", 0.25),
-    ]
-    
-    weighted_sum = sum(v.score * w for v, w in zip(votes, weights))
-    final_grade = min(100.0, max(0.0, weighted_sum))
+    engine = get_consensus_engine()
+    consensus = engine.score(
+        np.array([[v.score for v in votes]]),
+        np.array([[v.confidence for v in votes]]),
+        engine.weights(grading_mode, teacher_persona.grading_bias),
+    )
+    final_grade = float(consensus.grades[0])
+    messages = consensus.messages(0)
     
-    # Generate teacher-style feedback
-    feedback = await _generate_teacher_feedback(votes, teacher_persona, final_grade)
+    if consensus.vetoed[0]:
+        feedback = " ".join(messages)
+        consensus_method = "veto"
+    else:
+        # Generate teacher-style feedback
+        feedback = await _generate_teacher_feedback(votes, teacher_persona, final_grade)
+        if messages:
+            feedback = f"{feedback} {' '.join(messages)}"
+        consensus_method = "weighted_average"
     
     return FinalEvaluation(
-        final_grade=round(final_grade, 1),
+        final_grade=_round_grade(final_grade),
         letter_grade=_score_to_letter(final_grade),
         teacher_feedback=feedback,
         agent_votes=[_vote_to_dict(v) for v in votes],
-        consensus_method="weighted_average",
-        plagiarism_flag=security_vote.score < 50,
-        ai_generated_flag=security_vote.score < 70,
+        consensus_method=consensus_method,
+        plagiarism_flag=bool(consensus.plagiarism_flags[0]),
+        ai_generated_flag=bool(consensus.ai_generated_flags[0]),
+    )
+
+
+@dataclass
+class GradeBatch:
+    """
+    Final grades of a cohort; every array has one entry per answer.
+
+    Feedback strings are built on demand by ``feedback()``.
+    """
+    final_grades: np.ndarray  # Rounded to 0.1, like FinalEvaluation.final_grade
+    letter_grades: np.ndarray
+    vetoed: np.ndarray
+    review: np.ndarray
+    plagiarism_flags: np.ndarray
+    ai_generated_flags: np.ndarray
+    consensus: ConsensusResult
+    agent_feedback: Optional[Sequence[Sequence[str]]] = None
+
+    def __len__(self) -> int:
+        return len(self.final_grades)
+
+    def consensus_method(self, index: int) -> str:
+        return "veto" if self.vetoed[index] else "weighted_average"
+
+    def feedback(self, index: int) -> str:
+        """
+        Teacher feedback for one answer (the text ``synthesize_grade``
+        would produce for the same votes).
+        """
+        messages = self.consensus.messages(index)
+        if self.vetoed[index]:
+            return " ".join(messages)
+        feedbacks = self.agent_feedback[index] if self.agent_feedback is not None else []
+        feedback = _compose_feedback(feedbacks, float(self.consensus.grades[index]))
+        if messages:
+            feedback = f"{feedback} {' '.join(messages)}"
+        return feedback
+
+
+def council_votes_to_arrays(council_votes: Sequence) -> tuple[np.ndarray, np.ndarray, list[list[str]]]:
+    """
+    Columnar form of a list of ``CouncilVotes``.
+
+    Returns:
+        (N x 4 scores, N x 4 confidences, per-answer agent feedback)
+    """
+    scores = np.empty((len(council_votes), len(AGENTS)))
+    confidences = np.empty((len(council_votes), len(AGENTS)))
+    feedback = []
+    for row, votes in enumerate(council_votes):
+        votes = votes.to_list()
+        scores[row] = [v.score for v in votes]
+        confidences[row] = [v.confidence for v in votes]
+        feedback.append([v.feedback for v in votes])
+    return scores, confidences, feedback
+
+
+def synthesize_grades(
+    scores: np.ndarray,
+    confidences: Optional[np.ndarray] = None,
+    teacher_persona: Optional[TeacherPersona] = None,
+    grading_mode: Optional[str] = "balanced",
+    weights: Optional[np.ndarray] = None,
+    agent_feedback: Optional[Sequence[Sequence[str]]] = None,
+) -> GradeBatch:
+    """
+    Synthesize final grades for a cohort in one vectorised pass.
+    
+    Args:
+        scores: (N x 4) agent scores, columns in fact/structure/critical/
+            security order (see ``council_votes_to_arrays``)
+        confidences: (N x 4) agent confidences (None counts every vote)
+        teacher_persona: Persona whose grading bias scales the mode weights
+        grading_mode: strict, balanced, creative or lenient
+        weights: (4,) or (N x 4) weights overriding mode and persona (e.g.
+            a cohort graded by several teachers)
+        agent_feedback: Per-answer agent feedback, only read by
+            ``GradeBatch.feedback()``
+        
+    Returns:
+        GradeBatch with the same grades and flags ``synthesize_grade``
+        gives each answer
+    """
+    engine = get_consensus_engine()
+    if weights is None:
+        bias = teacher_persona.grading_bias if teacher_persona is not None else None
+        weights = engine.weights(grading_mode, bias)
+    consensus = engine.score(scores, confidences, weights)
+    return GradeBatch(
+        final_grades=_round_grades(consensus.grades),
+        letter_grades=_scores_to_letters(consensus.grades),
+        vetoed=consensus.vetoed,
+        review=consensus.review,
+        plagiarism_flags=consensus.plagiarism_flags,
+        ai_generated_flags=consensus.ai_generated_flags,
+        consensus=consensus,
+        agent_feedback=agent_feedback,
     )
 
 
@@ -120,8 +239,12 @@ async def _generate_teacher_feedback(
     # TODO Jatin: Use LLM to generate personalized feedback.
     # TODO Jatin: Apply pet peeves and style preferences.
     """
-    feedbacks = [v.feedback for v in votes if v.feedback]
-    combined = " ".join(feedbacks[:3])
+    return _compose_feedback([v.feedback for v in votes], grade)
+
+
+def _compose_feedback(feedbacks: Sequence[str], grade: float) -> str:
+    """Template feedback: a grade-dependent opener plus the agents' comments."""
+    combined = " ".join([f for f in feedbacks if f][:3])
     
     if grade >= 80:
         prefix = "Excellent work! "
@@ -0,0 +1,310 @@
+"""
+Feedback Index - Per-Teacher Semantic Search over Past Feedback
+===============================================================
+
+Few-shot prompting works best with the teacher's comments on answers like
+the one being graded. Feedback a teacher has written or approved is added
+to their index; retrieval embeds the current answer and returns the most
+similar past comments.
+
+Each teacher has a directory under
+``data/feedback/<embedder name>/<teacher>/``:
+
+    - ``vectors.f32``: unit-length float32 rows, appended on insert
+    - ``comments.jsonl``: the comment text of each row
+
+A teacher's files are opened (and the vectors memory-mapped) the first
+time that teacher is queried, so startup reads nothing. Top-k is one
+matrix-vector product over the teacher's rows (tens of thousands of rows
+take a few milliseconds). Identical comments are stored once.
+
+Worker processes may share the directory: both files are appended under
+one file lock, and each process picks up rows the others appended before
+it searches.
+
+Assigned to: Jatin (Digital Twin Architect)
+Branch: feat/jatin-twin
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from backend.infra.metrics import RollingWindow
+from backend.vectors.indexes import normalize_rows, top_k
+from backend.vectors.service import EmbeddingService, content_key, get_embedding_service
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one worker per directory
+    fcntl = None
+
+
+DEFAULT_FEEDBACK_DIR = Path(__file__).resolve().parents[2] / "data" / "feedback"
+
+
+@dataclass
+class FeedbackMatch:
+    """A past comment and its similarity to the query."""
+    text: str
+    similarity: float
+
+
+def _safe_name(name: str) -> str:
+    # Readable, filesystem-safe and still unique ("a/b" and "a_b" differ)
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:8]
+    return f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)[:64]}-{digest}"
+
+
+class _TeacherFeedback:
+    """
+    One teacher's comments: memory-mapped rows plus their texts.
+
+    Several worker processes can share a directory. Appends (vectors
+    first, then comments) happen under an exclusive lock on ``.lock``, so
+    row ``i`` of ``vectors.f32`` is always line ``i`` of
+    ``comments.jsonl``; rows appended by other processes are picked up by
+    ``refresh()``.
+    """
+
+    def __init__(self, dim: int, directory: Optional[Path]):
+        self.dim = dim
+        self.directory = directory
+        self.comments: list[str] = []
+        self._keys: set[str] = set()
+        self._comments_read = 0  # Bytes of comments.jsonl read
+        self._sync_lock = threading.Lock()  # Appends run in worker threads
+        self._memory = np.zeros((0, dim), dtype=np.float32)  # In-memory mode only
+        self._mmap: Optional[np.memmap] = None
+        if directory is not None:
+            with self._locked():
+                self._sync()
+                self._repair()
+
+    def __len__(self) -> int:
+        return len(self.comments)
+
+    def _paths(self) -> tuple[Path, Path]:
+        return self.directory / "vectors.f32", self.directory / "comments.jsonl"
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock shared by every process (and thread) using the directory."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._sync_lock, open(self.directory / ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _sync(self) -> None:
+        """Read comments appended since the last sync."""
+        _, comments_path = self._paths()
+        try:
+            with open(comments_path, "rb") as f:
+                f.seek(self._comments_read)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # A writer may be mid-line; only complete lines are committed rows
+        for line in data[:data.rfind(b"\n") + 1].splitlines(keepends=True):
+            try:
+                comment = json.loads(line)
+            except ValueError:
+                break  # Corrupt line: _repair cuts it off
+            self.comments.append(comment)
+            self._keys.add(content_key(comment))
+            self._comments_read += len(line)
+
+    def _repair(self) -> None:
+        """
+        Cut both files back to the last complete row (a crash mid-append).
+        Only called under the lock, right after ``_sync``.
+        """
+        vectors_path, comments_path = self._paths()
+        if not comments_path.exists():
+            return
+        row_bytes = self.dim * 4
+        size = vectors_path.stat().st_size if vectors_path.exists() else 0
+        if size < len(self.comments) * row_bytes:
+            # Comments without vectors: keep the rows that have both
+            del self.comments[size // row_bytes:]
+            self._keys = {content_key(c) for c in self.comments}
+            self._comments_read = sum(len(json.dumps(c)) + 1 for c in self.comments)
+            self._mmap = None
+        if size > len(self.comments) * row_bytes:
+            os.truncate(vectors_path, len(self.comments) * row_bytes)
+        if comments_path.stat().st_size > self._comments_read:
+            os.truncate(comments_path, self._comments_read)
+
+    def refresh(self) -> None:
+        """Pick up comments other processes appended."""
+        if self.directory is not None:
+            with self._sync_lock:
+                self._sync()
+
+    def matrix(self) -> np.ndarray:
+        if self.directory is None:
+            return self._memory
+        if self._mmap is None or len(self._mmap) != len(self.comments):
+            # Re-map after appends (mapping is cheap; the data stays on disk)
+            vectors_path, _ = self._paths()
+            self._mmap = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(len(self.comments), self.dim))
+        return self._mmap
+
+    def new_comments(self, comments: list[str]) -> list[str]:
+        """Comments not stored yet (deduplicated, order kept)."""
+        fresh = {}
+        for comment in comments:
+            key = content_key(comment)
+            if comment and key not in self._keys:
+                fresh.setdefault(key, comment)
+        return list(fresh.values())
+
+    def append(self, comments: list[str], vectors: np.ndarray) -> int:
+        """
+        Store comments with their vectors, skipping ones stored meanwhile
+        (by a concurrent add or another process). Blocks on the file lock,
+        so call it off the event loop.
+
+        Returns:
+            Number of comments stored
+        """
+        if self.directory is None:
+            keep = set(self.new_comments(comments))
+            rows = [i for i, comment in enumerate(comments) if comment in keep]
+            self._memory = np.vstack([self._memory, normalize_rows(vectors[rows])])
+            self.comments.extend(comments[i] for i in rows)
+            self._keys.update(content_key(comments[i]) for i in rows)
+            return len(rows)
+
+        with self._locked():
+            self._sync()
+            self._repair()
+            keep = set(self.new_comments(comments))
+            rows = [i for i, comment in enumerate(comments) if comment in keep]
+            if rows:
+                vectors_path, comments_path = self._paths()
+                with open(vectors_path, "ab") as f:
+                    f.write(normalize_rows(vectors[rows]).tobytes())
+                with open(comments_path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(comments[i]) + "\n" for i in rows))
+                self._sync()
+            return len(rows)
+
+    def search(self, query: np.ndarray, k: int) -> list[FeedbackMatch]:
+        if not self.comments or k <= 0:
+            return []
+        scores = self.matrix() @ query
+        best_scores, best = top_k(scores[None, :], k)
+        return [FeedbackMatch(self.comments[row], float(score)) for score, row in zip(best_scores[0], best[0])]
+
+
+class FeedbackIndex:
+    """Per-teacher feedback indexes, opened lazily on first use."""
+
+    def __init__(
+        self,
+        directory: Optional[Path] = DEFAULT_FEEDBACK_DIR,
+        embeddings: Optional[EmbeddingService] = None,
+    ):
+        """
+        Args:
+            directory: Persistence root (None keeps every index in memory)
+            embeddings: Embedding service for comments and queries
+                (defaults to the shared service)
+        """
+        self.embeddings = embeddings or get_embedding_service()
+        self.directory = None
+        if directory is not None:
+            self.directory = Path(directory) / re.sub(r"[^A-Za-z0-9_.-]+", "_", self.embeddings.embedder.name)
+        self._teachers: dict[str, _TeacherFeedback] = {}
+        self.search_latency = RollingWindow()
+        self.inserts = 0
+
+    @classmethod
+    def from_env(cls) -> "FeedbackIndex":
+        """Read ``FEEDBACK_INDEX_DIR`` (empty keeps the index in memory)."""
+        directory = os.getenv("FEEDBACK_INDEX_DIR", str(DEFAULT_FEEDBACK_DIR))
+        return cls(directory=Path(directory) if directory else None)
+
+    def _teacher(self, teacher_id: str) -> _TeacherFeedback:
+        index = self._teachers.get(teacher_id)
+        if index is None:
+            directory = self.directory / _safe_name(teacher_id) if self.directory else None
+            index = _TeacherFeedback(self.embeddings.dim, directory)
+            self._teachers[teacher_id] = index
+        return index
+
+    def count(self, teacher_id: str) -> int:
+        """Number of stored comments for a teacher."""
+        index = self._teacher(teacher_id)
+        index.refresh()
+        return len(index)
+
+    def recent(self, teacher_id: str, n: int = 5) -> list[str]:
+        """The teacher's ``n`` most recently stored comments, newest first."""
+        index = self._teacher(teacher_id)
+        index.refresh()
+        return index.comments[-n:][::-1] if n > 0 else []
+
+    async def add(self, teacher_id: str, comments: list[str]) -> int:
+        """
+        Store new comments for a teacher (e.g. once the teacher approves them).
+
+        Returns:
+            Number of comments added (already stored ones are skipped)
+        """
+        index = self._teacher(teacher_id)
+        index.refresh()
+        fresh = index.new_comments(comments)
+        if not fresh:
+            return 0
+        vectors = await self.embeddings.embed_many(fresh)
+        if index.directory is None:
+            added = index.append(fresh, vectors)
+        else:
+            added = await asyncio.to_thread(index.append, fresh, vectors)
+        self.inserts += added
+        return added
+
+    async def search(self, teacher_id: str, query: str, k: int = 5) -> list[FeedbackMatch]:
+        """
+        The teacher's ``k`` past comments most similar to ``query``.
+
+        Args:
+            teacher_id: Teacher whose history is searched
+            query: Text to match (typically the student answer)
+            k: Number of comments to return
+        """
+        index = self._teacher(teacher_id)
+        index.refresh()
+        if not len(index):
+            return []
+        query_vector = normalize_rows(await self.embeddings.embed(query))[0]
+        start = time.perf_counter()
+        matches = index.search(query_vector, k)
+        self.search_latency.add(time.perf_counter() - start)
+        return matches
+
+    def get_stats(self) -> dict:
+        return {
+            "directory": str(self.directory) if self.directory else None,
+            "teachers_open": len(self._teachers),
+            "comments_open": sum(len(t) for t in self._teachers.values()),
+            "inserts": self.inserts,
+            "search_latency_ms": self.search_latency.summary(scale=1000),
+        }
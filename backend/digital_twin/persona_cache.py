@@ -0,0 +1,177 @@
+"""
+Persona Cache - TTL/LRU Cache for Teacher Personas
+==================================================
+
+Every evaluation loads the teacher's persona, and a batch job loads the
+same few personas thousands of times. The cache keeps recently used
+personas in memory:
+
+    - LRU-bounded (``max_entries``) with a time-to-live per entry
+    - concurrent misses for the same teacher share one load (single-flight)
+    - ``invalidate()`` drops a persona when it changes; a load already in
+      flight for it is not stored, so the old version cannot come back
+    - ``warm_up()`` preloads the active teachers at startup
+
+Cached personas are shared between callers and must be treated as
+read-only.
+
+Assigned to: Jatin (Digital Twin Architect)
+Branch: feat/jatin-twin
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from backend.infra.metrics import RollingWindow
+from backend.infra.singleflight import SingleFlight
+
+
+Loader = Callable[[str], Awaitable[Any]]
+
+
+class PersonaCache:
+    """Async read-through cache in front of a persona loader."""
+
+    def __init__(
+        self,
+        loader: Loader,
+        ttl: float = 300.0,
+        max_entries: int = 1024,
+        warm_up_concurrency: int = 8,
+    ):
+        """
+        Args:
+            loader: Coroutine function loading a persona by teacher ID
+            ttl: Seconds a persona stays fresh (0 disables caching)
+            max_entries: Personas kept before the least recently used is evicted
+            warm_up_concurrency: Parallel loads during ``warm_up()``
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.warm_up_concurrency = warm_up_concurrency
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        # Bumped on invalidation; loads started under an older version are discarded
+        self._versions: dict[str, int] = {}
+        self._generation = 0  # Bumped when the whole cache is cleared
+        self._flight = SingleFlight()
+        self.load_latency = RollingWindow()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.load_failures = 0
+
+    @classmethod
+    def from_env(cls, loader: Loader) -> "PersonaCache":
+        """Read ``PERSONA_CACHE_*`` environment variables."""
+        return cls(
+            loader,
+            ttl=float(os.getenv("PERSONA_CACHE_TTL", "300")),
+            max_entries=int(os.getenv("PERSONA_CACHE_MAX_ENTRIES", "1024")),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, teacher_id: str) -> Any:
+        """Return the cached persona, loading it on a miss or after expiry."""
+        entry = self._entries.get(teacher_id)
+        if entry is not None:
+            persona, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(teacher_id)
+                self.hits += 1
+                return persona
+            del self._entries[teacher_id]
+            self.expirations += 1
+
+        self.misses += 1
+        version = self._version(teacher_id)
+        return await self._flight.do(
+            f"{teacher_id}\x00{version[0]}.{version[1]}", lambda: self._load(teacher_id, version)
+        )
+
+    def _version(self, teacher_id: str) -> tuple[int, int]:
+        return self._generation, self._versions.get(teacher_id, 0)
+
+    async def _load(self, teacher_id: str, version: tuple[int, int]) -> Any:
+        start = time.perf_counter()
+        try:
+            persona = await self.loader(teacher_id)
+        except Exception:
+            self.load_failures += 1  # Failures are not cached
+            raise
+        self.load_latency.add(time.perf_counter() - start)
+        if self.ttl > 0 and self._version(teacher_id) == version:
+            self._put(teacher_id, persona)
+        return persona
+
+    def _put(self, teacher_id: str, persona: Any) -> None:
+        self._entries[teacher_id] = (persona, time.monotonic() + self.ttl)
+        self._entries.move_to_end(teacher_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, teacher_id: Optional[str] = None) -> None:
+        """
+        Drop one persona (or all of them) so the next ``get()`` reloads it.
+
+        Args:
+            teacher_id: Teacher whose persona changed (None clears the cache)
+        """
+        self.invalidations += 1
+        if teacher_id is None:
+            self._generation += 1
+            self._entries.clear()
+            return
+        self._versions[teacher_id] = self._versions.get(teacher_id, 0) + 1
+        self._entries.pop(teacher_id, None)
+
+    async def warm_up(self, teacher_ids: Iterable[str]) -> int:
+        """
+        Preload personas (e.g. the active teachers at startup).
+
+        Returns:
+            Number of personas loaded; failures are skipped so one bad
+            teacher record cannot block startup
+        """
+        semaphore = asyncio.Semaphore(max(1, self.warm_up_concurrency))
+
+        async def load(teacher_id: str) -> bool:
+            async with semaphore:
+                try:
+                    await self.get(teacher_id)
+                except Exception:
+                    return False
+                return True
+
+        loaded = await asyncio.gather(*(load(t) for t in dict.fromkeys(teacher_ids)))
+        return sum(loaded)
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "load_failures": self.load_failures,
+            "load_latency_ms": self.load_latency.summary(scale=1000),
+            "single_flight": self._flight.get_stats(),
+        }
+
+
+def active_teacher_ids() -> list[str]:
+    """Teachers to preload at startup (comma-separated ``ACTIVE_TEACHER_IDS``)."""
+    return [t.strip() for t in os.getenv("ACTIVE_TEACHER_IDS", "").split(",") if t.strip()]
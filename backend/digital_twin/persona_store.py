@@ -0,0 +1,322 @@
+"""
+Persona Store - Array-Backed Teacher Personas
+=============================================
+
+A university has thousands of teachers. Keeping each style vector as a list
+of 128 boxed Python floats wastes memory and makes similarity search a
+Python loop, so the store keeps:
+
+    - every style vector as one row of a contiguous float32 matrix, with a
+      teacher ID -> row map
+    - the remaining persona fields as small per-teacher records
+
+``TeacherPersona`` is a ``__slots__`` object; personas handed out by the
+store are views whose ``style_vector`` reads and writes the store's row.
+
+The store saves to a directory (``vectors.npy`` + ``personas.json``) and
+loads it back with the matrix memory-mapped, so startup does not read
+every vector into RAM.
+
+Assigned to: Jatin (Digital Twin Architect)
+Branch: feat/jatin-twin
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from backend.vectors.indexes import ArrayLike, normalize_rows, top_k
+
+
+# Style vectors live in their own 128-d space, independent of the
+# retrieval embedder (EMBEDDING_MODEL / EMBEDDING_DIM)
+STYLE_VECTOR_DIM = 128
+
+# Persona fields kept in the per-teacher records (everything but the vector)
+_RECORD_FIELDS = (
+    "name",
+    "subject",
+    "grading_bias",
+    "pet_peeves",
+    "past_feedback_examples",
+    "preferred_tone",
+    "strictness_level",
+)
+
+
+class TeacherPersona:
+    """
+    Teacher's Digital Twin persona.
+
+    A persona returned by ``PersonaStore`` shares its style vector with the
+    store; a persona built directly keeps its own copy until it is ``put``.
+    """
+
+    __slots__ = (
+        "teacher_id",
+        "name",
+        "subject",
+        "grading_bias",
+        "pet_peeves",
+        "past_feedback_examples",
+        "preferred_tone",
+        "strictness_level",
+        "_store",
+        "_row",
+        "_vector",
+    )
+
+    def __init__(
+        self,
+        teacher_id: str,
+        name: str,
+        subject: str,
+        style_vector: Optional[ArrayLike] = None,
+        grading_bias: Optional[dict] = None,
+        pet_peeves: Optional[list[str]] = None,
+        past_feedback_examples: Optional[list[str]] = None,
+        preferred_tone: str = "professional",
+        strictness_level: float = 0.7,
+    ):
+        self.teacher_id = teacher_id
+        self.name = name
+        self.subject = subject
+        self.grading_bias = grading_bias if grading_bias is not None else {}
+        self.pet_peeves = pet_peeves if pet_peeves is not None else []
+        self.past_feedback_examples = past_feedback_examples if past_feedback_examples is not None else []
+        self.preferred_tone = preferred_tone
+        self.strictness_level = strictness_level
+        self._store: Optional["PersonaStore"] = None
+        self._row = -1
+        self._vector: Optional[np.ndarray] = None
+        if style_vector is not None and len(style_vector):
+            self.style_vector = style_vector
+
+    @property
+    def style_array(self) -> np.ndarray:
+        """Style vector as float32 (a read-only view of the store row when attached)."""
+        if self._store is not None:
+            return self._store.vector(self._row)
+        if self._vector is None:
+            return np.zeros(0, dtype=np.float32)
+        return self._vector
+
+    @property
+    def style_vector(self) -> list[float]:
+        """Style vector as plain floats (empty until computed)."""
+        return self.style_array.tolist()
+
+    @style_vector.setter
+    def style_vector(self, value: ArrayLike) -> None:
+        vector = np.asarray(value, dtype=np.float32).reshape(-1)
+        if self._store is not None:
+            self._store.set_vector(self._row, vector)
+        else:
+            self._vector = vector.copy()
+
+    def to_dict(self) -> dict:
+        """JSON-serialisable form (the API response shape)."""
+        data = {"teacher_id": self.teacher_id, "style_vector": self.style_vector}
+        data.update((name, getattr(self, name)) for name in _RECORD_FIELDS)
+        return data
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TeacherPersona):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"TeacherPersona(teacher_id={self.teacher_id!r}, name={self.name!r}, subject={self.subject!r})"
+
+
+class PersonaStore:
+    """Teacher personas with their style vectors in one float32 matrix."""
+
+    def __init__(self, dim: int = STYLE_VECTOR_DIM):
+        """
+        Args:
+            dim: Style vector dimensionality
+        """
+        self.dim = dim
+        self.teacher_ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._records: list[dict] = []
+        self._data = np.zeros((0, dim), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.teacher_ids)
+
+    def __contains__(self, teacher_id: str) -> bool:
+        return teacher_id in self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The (N x dim) style matrix, one row per teacher (a view, not a copy)."""
+        return self._data[:len(self)]
+
+    # -------------------------------------------------------------------------
+    # Personas
+    # -------------------------------------------------------------------------
+
+    def put(self, persona: TeacherPersona) -> TeacherPersona:
+        """
+        Insert or replace a persona.
+
+        Returns:
+            The persona, now a view onto the store (its style vector is the
+            store's row)
+        """
+        vector = persona.style_array
+        row = self._rows.get(persona.teacher_id)
+        if row is None:
+            row = len(self)
+            self._reserve(row + 1)
+            self._rows[persona.teacher_id] = row
+            self.teacher_ids.append(persona.teacher_id)
+            self._records.append({})
+        self._records[row] = {name: getattr(persona, name) for name in _RECORD_FIELDS}
+        self.set_vector(row, vector if len(vector) else np.zeros(self.dim, dtype=np.float32))
+        persona._store, persona._row, persona._vector = self, row, None
+        return persona
+
+    def get(self, teacher_id: str) -> Optional[TeacherPersona]:
+        """A persona view for a stored teacher (None if unknown)."""
+        row = self._rows.get(teacher_id)
+        if row is None:
+            return None
+        persona = TeacherPersona(teacher_id, **self._records[row])
+        persona._store, persona._row = self, row
+        return persona
+
+    def vector(self, row: int) -> np.ndarray:
+        """Read-only view of one style vector."""
+        view = self._data[row]
+        view.flags.writeable = False
+        return view
+
+    def set_vector(self, row: int, vector: ArrayLike) -> None:
+        """Overwrite one style vector."""
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if len(vector) != self.dim:
+            raise ValueError(f"Expected a {self.dim}-dimensional style vector, got {len(vector)}")
+        self._reserve(len(self))  # Copies a memory-mapped matrix before the first write
+        self._data[row] = vector
+        self._norms[row] = np.linalg.norm(vector)
+
+    def _reserve(self, capacity: int) -> None:
+        """Grow the matrix geometrically (amortised O(1) inserts)."""
+        if capacity <= len(self._data) and self._data.flags.writeable:
+            return
+        size = max(capacity, 2 * len(self._data), 16) if capacity > len(self._data) else len(self._data)
+        grown = np.zeros((size, self.dim), dtype=np.float32)
+        grown[:len(self)] = self._data[:len(self)]
+        norms = np.zeros(size, dtype=np.float32)
+        norms[:len(self)] = self._norms[:len(self)]
+        self._data, self._norms = grown, norms
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def similar(
+        self,
+        query: Union[str, ArrayLike],
+        k: int = 5,
+        subject: Optional[str] = None,
+    ) -> list[tuple[str, float]]:
+        """
+        Teachers with the most similar grading style.
+
+        Args:
+            query: Teacher ID (excluded from the results) or a style vector
+            k: Number of teachers to return
+            subject: Only consider teachers of this subject
+
+        Returns:
+            (teacher_id, cosine similarity) pairs, best first
+        """
+        exclude = None
+        if isinstance(query, str):
+            exclude = self._rows.get(query)
+            if exclude is None:
+                return []
+            query = self._data[exclude]
+        q = normalize_rows(query)[0]
+        if len(q) != self.dim:
+            raise ValueError(f"Expected a {self.dim}-dimensional style vector, got {len(q)}")
+
+        norms = self._norms[:len(self)]
+        scores = np.zeros(len(self), dtype=np.float32)
+        np.divide(self.vectors @ q, norms, out=scores, where=norms > 0)
+        if exclude is not None:
+            scores[exclude] = -np.inf
+        if subject is not None:
+            scores[[r["subject"] != subject for r in self._records]] = -np.inf
+
+        best_scores, best = top_k(scores[None, :], k)
+        return [
+            (self.teacher_ids[row], float(score))
+            for score, row in zip(best_scores[0], best[0])
+            if np.isfinite(score)
+        ]
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write ``vectors.npy`` and ``personas.json`` to a directory.
+
+        Files are written beside the old ones and renamed into place, so a
+        store memory-mapped from the same directory stays valid.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        vectors_tmp = path / "vectors.tmp.npy"
+        meta_tmp = path / "personas.json.tmp"
+        np.save(vectors_tmp, np.ascontiguousarray(self.vectors))
+        meta = {
+            "dim": self.dim,
+            "teachers": [{"teacher_id": t, **r} for t, r in zip(self.teacher_ids, self._records)],
+        }
+        meta_tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(vectors_tmp, path / "vectors.npy")
+        os.replace(meta_tmp, path / "personas.json")
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "PersonaStore":
+        """
+        Open a store written by ``save``.
+
+        Args:
+            path: Store directory
+            mmap: Memory-map the style matrix read-only instead of reading
+                it into RAM (the first write copies it)
+        """
+        path = Path(path)
+        meta = json.loads((path / "personas.json").read_text(encoding="utf-8"))
+        store = cls(dim=meta["dim"])
+        vectors = np.load(path / "vectors.npy", mmap_mode="r" if mmap else None)
+        if len(vectors) != len(meta["teachers"]):
+            raise ValueError(f"{path}: {len(vectors)} style vectors for {len(meta['teachers'])} personas")
+        for row, teacher in enumerate(meta["teachers"]):
+            teacher_id = teacher.pop("teacher_id")
+            store._rows[teacher_id] = row
+            store.teacher_ids.append(teacher_id)
+            store._records.append({name: teacher[name] for name in _RECORD_FIELDS if name in teacher})
+        store._data = vectors
+        store._norms = np.linalg.norm(vectors, axis=1).astype(np.float32)
+        return store
+
+    def get_stats(self) -> dict:
+        return {
+            "teachers": len(self),
+            "dim": self.dim,
+            "memory_mapped": isinstance(self._data, np.memmap),
+            "matrix_bytes": int(self.vectors.nbytes),
+        }
@@ -10,32 +10,61 @@ Branch: feat/jatin-twin
 """
 
 import os
-from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Optional
 
+from backend.digital_twin.feedback_index import FeedbackIndex
+from backend.digital_twin.persona_cache import PersonaCache
+from backend.digital_twin.persona_store import STYLE_VECTOR_DIM, PersonaStore, TeacherPersona
+from backend.vectors.embeddings import HashingEmbedder
+from backend.vectors.service import EmbeddingService, get_embedding_service
+from backend.vectors.triangulation import centroid
 
-@dataclass
-class TeacherPersona:
-    """Teacher's Digital Twin persona."""
-    teacher_id: str
-    name: str
-    subject: str
-    style_vector: list[float] = field(default_factory=list)
-    grading_bias: dict = field(default_factory=dict)
-    pet_peeves: list[str] = field(default_factory=list)
-    past_feedback_examples: list[str] = field(default_factory=list)
-    preferred_tone: str = "professional"
-    strictness_level: float = 0.7
+
+_persona_store: Optional[PersonaStore] = None
+
+
+def get_persona_store() -> PersonaStore:
+    """
+    Process-wide persona store, memory-mapped from ``PERSONA_STORE_DIR``
+    when a saved store exists there.
+    """
+    global _persona_store
+    if _persona_store is None:
+        directory = os.getenv("PERSONA_STORE_DIR", "")
+        if directory and (Path(directory) / "personas.json").exists():
+            _persona_store = PersonaStore.load(directory)
+        else:
+            _persona_store = PersonaStore(dim=STYLE_VECTOR_DIM)
+    return _persona_store
+
+
+def save_persona_store() -> bool:
+    """Write the store to ``PERSONA_STORE_DIR`` (returns False if unset)."""
+    directory = os.getenv("PERSONA_STORE_DIR", "")
+    if not directory or _persona_store is None:
+        return False
+    _persona_store.save(directory)
+    return True
+
+
+_persona_cache: Optional[PersonaCache] = None
+
+
+def get_persona_cache() -> PersonaCache:
+    """Process-wide persona cache (configured from ``PERSONA_CACHE_*``)."""
+    global _persona_cache
+    if _persona_cache is None:
+        _persona_cache = PersonaCache.from_env(_fetch_teacher_persona)
+    return _persona_cache
 
 
 async def load_teacher_persona(teacher_id: str) -> TeacherPersona:
     """
-    Load a teacher's Digital Twin persona from ChromaDB.
+    Load a teacher's Digital Twin persona (served from the persona cache).
     
-    # TODO Jatin: Retrieve the teacher's 'Pet Peeves' (e.g., 'hates passive voice') 
-    # and inject them into the system prompt.
-    # TODO Jatin: Implement vector similarity search for style matching.
-    # TODO Jatin: Cache frequently accessed personas for performance.
+    The returned persona is shared with other callers: do not modify it;
+    update the stored persona and call ``invalidate_teacher_persona()``.
     
     Args:
         teacher_id: Unique identifier for the teacher
@@ -43,6 +72,52 @@ async def load_teacher_persona(teacher_id: str) -> TeacherPersona:
     Returns:
         TeacherPersona with style vectors and preferences
     """
+    return await get_persona_cache().get(teacher_id)
+
+
+def invalidate_teacher_persona(teacher_id: Optional[str] = None) -> None:
+    """Drop a teacher's cached persona (or all personas) after an update."""
+    get_persona_cache().invalidate(teacher_id)
+
+
+async def update_teacher_persona(persona: TeacherPersona) -> TeacherPersona:
+    """
+    Store a new version of a persona (recomputing its style vector) and
+    drop the cached copy.
+    """
+    persona.style_vector = await compute_style_vector(persona)
+    stored = get_persona_store().put(persona)
+    invalidate_teacher_persona(persona.teacher_id)
+    return stored
+
+
+async def find_similar_teachers(teacher_id: str, k: int = 5, same_subject: bool = False) -> list[tuple[str, float]]:
+    """
+    Teachers whose grading style is closest to this teacher's, among the
+    personas in the store.
+    """
+    persona = await load_teacher_persona(teacher_id)
+    subject = persona.subject if same_subject else None
+    store = get_persona_store()
+    # A teacher without a stored persona is matched by their default style
+    query = teacher_id if teacher_id in store else persona.style_vector
+    return store.similar(query, k=k, subject=subject)
+
+
+async def _fetch_teacher_persona(teacher_id: str) -> TeacherPersona:
+    """
+    Load a teacher's Digital Twin persona from ChromaDB (uncached).
+    
+    Unknown teachers get a default persona that is not stored: only
+    personas with real data (``update_teacher_persona``) enter the store.
+    
+    # TODO Jatin: Retrieve the teacher's 'Pet Peeves' (e.g., 'hates passive voice') 
+    # and inject them into the system prompt.
+    """
+    stored = get_persona_store().get(teacher_id)
+    if stored is not None:
+        return stored
+
     # TODO Jatin: Replace with actual ChromaDB retrieval
     
     # Default persona for development
@@ -50,7 +125,6 @@ async def load_teacher_persona(teacher_id: str) -> TeacherPersona:
         teacher_id=teacher_id,
         name=f"Teacher {teacher_id}",
         subject="General",
-        style_vector=[0.5] * 128,
         grading_bias={
             "fact_weight": 0.35,
             "structure_weight": 0.25,
@@ -70,29 +144,91 @@ async def load_teacher_persona(teacher_id: str) -> TeacherPersona:
         preferred_tone="constructive",
         strictness_level=0.7,
     )
+    persona.style_vector = await compute_style_vector(persona)
     
     return persona
 
 
+def _style_embeddings() -> EmbeddingService:
+    return get_embedding_service(HashingEmbedder(dim=STYLE_VECTOR_DIM))
+
+
+async def compute_style_vector(persona: TeacherPersona) -> list[float]:
+    """
+    Style vector of a teacher: the mean direction of the embeddings of their
+    past feedback and pet peeves (embedded once, via the shared cache).
+    """
+    texts = persona.past_feedback_examples + persona.pet_peeves
+    if not texts:
+        return [0.0] * STYLE_VECTOR_DIM
+    vectors = await _style_embeddings().embed_many(texts)
+    return centroid(vectors).tolist()
+
+
 async def get_teacher_style_vector(teacher_id: str) -> list[float]:
+    """Retrieve the teacher's style vector (a row of the persona store)."""
+    persona = await load_teacher_persona(teacher_id)
+    return persona.style_vector
+
+
+_feedback_index: Optional[FeedbackIndex] = None
+
+# Used until a teacher has approved enough feedback of their own
+DEFAULT_FEEDBACK_EXAMPLES = [
+    "Good effort, but the argument lacks depth.",
+    "Excellent use of examples to support your thesis.",
+    "The structure is clear, but grammar needs improvement.",
+    "Shows strong understanding of the material.",
+    "Please cite your sources properly next time.",
+]
+
+
+def get_feedback_index() -> FeedbackIndex:
+    """Process-wide feedback index (configured from ``FEEDBACK_INDEX_DIR``)."""
+    global _feedback_index
+    if _feedback_index is None:
+        _feedback_index = FeedbackIndex.from_env()
+    return _feedback_index
+
+
+async def record_teacher_feedback(teacher_id: str, feedback: str) -> int:
     """
-    Retrieve the teacher's style vector from ChromaDB.
+    Add a comment the teacher wrote, edited or approved to their feedback
+    index. Generated feedback must not be recorded until a teacher has
+    signed it off, or the few-shot examples drift towards the model's own
+    phrasing.
     
-    # TODO Jatin: Implement actual vector retrieval from ChromaDB.
+    Returns:
+        1 if the comment was stored, 0 if it is empty or already stored
     """
-    return [0.5] * 128
+    feedback = feedback.strip()
+    if not feedback:
+        return 0
+    return await get_feedback_index().add(teacher_id, [feedback])
 
 
-async def get_past_feedback_examples(teacher_id: str, n: int = 5) -> list[str]:
+async def get_past_feedback_examples(teacher_id: str, n: int = 5, query: Optional[str] = None) -> list[str]:
     """
     Retrieve N examples of past feedback for few-shot prompting.
     
-    # TODO Jatin: Implement semantic search for relevant past feedback.
-    """
-    return [
-        "Good effort, but the argument lacks depth.",
-        "Excellent use of examples to support your thesis.",
-        "The structure is clear, but grammar needs improvement.",
-        "Shows strong understanding of the material.",
-        "Please cite your sources properly next time.",
-    ][:n]
+    Args:
+        teacher_id: Teacher whose feedback history is searched
+        n: Number of examples
+        query: Text to match, typically the student answer (without one,
+            the most recent comments are returned)
+        
+    Returns:
+        Up to N comments, most relevant first, topped up with generic
+        examples while the teacher's history is short
+    """
+    index = get_feedback_index()
+    if query is not None:
+        examples = [match.text for match in await index.search(teacher_id, query, k=n)]
+    else:
+        examples = index.recent(teacher_id, n)
+    for default in DEFAULT_FEEDBACK_EXAMPLES:
+        if len(examples) >= n:
+            break
+        if default not in examples:
+            examples.append(default)
+    return examples[:n]
@@ -0,0 +1,263 @@
+"""
+Response Cache - Content-Addressed LLM Response Store
+=====================================================
+
+Two-tier cache for LLM responses keyed by a hash of
+(model, system_prompt, prompt):
+
+    1. In-process LRU with TTL (zero-latency hits)
+    2. On-disk store under ``data/cache`` (survives restarts, shared by workers)
+
+Both tiers are size-bounded and evict the least recently used entries.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "cache"
+
+
+def make_cache_key(model: str, prompt: str, system_prompt: str) -> str:
+    """Return the content address (SHA-256 hex) of an LLM request."""
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, prompt):
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") never collide
+        digest.update(len(encoded).to_bytes(8, "little"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for the response cache."""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class MemoryLRU:
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> int:
+        """Store a value, returning the number of entries evicted."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """
+    On-disk response store, one JSON file per key, sharded by key prefix.
+
+    Files older than ``ttl`` are treated as misses. When the directory grows
+    past ``max_bytes`` the least recently used files (by mtime) are removed.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 256 * 1024 * 1024, ttl: float = 7 * 86400.0):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._size_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)["response"]
+            os.utime(path)  # Touch: keeps LRU order for eviction
+            return value
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, value: str, backend: Optional[str] = None) -> int:
+        """Store a value atomically, returning the number of files evicted."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"response": value, "backend": backend, "created_at": time.time()}, f)
+        with self._lock:
+            os.replace(tmp_path, path)
+            if self._size_bytes is None:
+                self._size_bytes = self._scan_size()
+            else:
+                self._size_bytes += path.stat().st_size
+            if self._size_bytes > self.max_bytes:
+                return self._evict()
+        return 0
+
+    def _scan_size(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob("*/*.json"))
+
+    def _evict(self) -> int:
+        """Remove oldest files until the store is back under 90% of max_bytes."""
+        files = sorted(
+            ((p.stat().st_mtime, p.stat().st_size, p) for p in self.directory.glob("*/*.json")),
+            key=lambda item: item[0],
+        )
+        total = sum(size for _, size, _ in files)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self._size_bytes = total
+        return evicted
+
+
+class ResponseCache:
+    """
+    Two-tier (memory + disk) content-addressed cache for LLM responses.
+
+    Disk I/O runs in a worker thread so cache lookups never block the event loop.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        memory_entries: int = 2048,
+        memory_ttl: float = 3600.0,
+        disk_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+        disk_ttl: float = 7 * 86400.0,
+    ):
+        """
+        Args:
+            enabled: Master switch for the cache
+            memory_entries: Max entries in the in-process LRU
+            memory_ttl: TTL (seconds) for in-process entries
+            disk_dir: Directory of the on-disk tier (None disables it)
+            disk_max_bytes: Size bound of the on-disk tier
+            disk_ttl: TTL (seconds) for on-disk entries
+        """
+        self.enabled = enabled
+        self.memory = MemoryLRU(max_entries=memory_entries, ttl=memory_ttl)
+        self.disk = DiskCache(disk_dir, max_bytes=disk_max_bytes, ttl=disk_ttl) if disk_dir else None
+        self.stats = CacheStats()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build a cache from ``LLM_CACHE_*`` environment variables."""
+        disk_dir = os.getenv("LLM_CACHE_DIR", str(DEFAULT_CACHE_DIR))
+        return cls(
+            enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+            memory_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048")),
+            memory_ttl=float(os.getenv("LLM_CACHE_TTL", "3600")),
+            disk_dir=Path(disk_dir) if disk_dir else None,
+            disk_max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            disk_ttl=float(os.getenv("LLM_CACHE_DISK_TTL", str(7 * 86400))),
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a response in memory, then on disk (promoting disk hits)."""
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.stats.disk_hits += 1
+                self.stats.evictions += self.memory.set(key, value)
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: str, backend: Optional[str] = None) -> None:
+        """
+        Store a response in both tiers.
+
+        Args:
+            key: Content address of the request
+            value: Response text
+            backend: Backend that produced the response (kept in the disk entry)
+        """
+        self.stats.writes += 1
+        self.stats.evictions += self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.stats.evictions += await asyncio.to_thread(self.disk.set, key, value, backend)
+            except OSError:
+                pass  # Disk tier is best-effort; memory tier still serves hits
+
+    def clear_memory(self) -> None:
+        self.memory.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self.memory),
+            **self.stats.to_dict(),
+        }
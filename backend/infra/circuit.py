@@ -0,0 +1,146 @@
+"""
+Circuit Breakers & Backend Statistics
+=====================================
+
+Closed → Open → Half-Open circuit breaker with time-based recovery, plus
+rolling latency / error-rate statistics used to order the failover chain.
+
+    CLOSED     Requests flow; consecutive failures are counted.
+    OPEN       Requests are rejected until ``recovery_timeout`` elapses.
+    HALF_OPEN  A limited number of probe requests are let through: a success
+               closes the circuit, a failure re-opens it.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from backend.infra.metrics import RollingWindow
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreaker:
+    """Circuit breaker for service failover."""
+    failure_count: int = 0
+    threshold: int = 3
+    recovery_timeout: int = 60
+    last_failure_time: float = 0.0
+    state: CircuitState = CircuitState.CLOSED
+    half_open_max_calls: int = 1
+    half_open_in_flight: int = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == CircuitState.OPEN
+
+    def _recovery_elapsed(self) -> bool:
+        return time.monotonic() - self.last_failure_time >= self.recovery_timeout
+
+    def can_attempt(self) -> bool:
+        """Non-mutating check: would ``allow_request`` currently let a call through?"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            return self._recovery_elapsed()
+        return self.half_open_in_flight < self.half_open_max_calls
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a call may proceed, moving OPEN → HALF_OPEN once the
+        recovery timeout has elapsed. Calls allowed in HALF_OPEN are probes.
+        """
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            if not self._recovery_elapsed():
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self.half_open_in_flight = 0
+        if self.half_open_in_flight < self.half_open_max_calls:
+            self.half_open_in_flight += 1
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = CircuitState.CLOSED
+        self.failure_count = 0
+        self.half_open_in_flight = 0
+
+    def record_failure(self) -> None:
+        self.failure_count += 1
+        self.last_failure_time = time.monotonic()
+        if self.state == CircuitState.HALF_OPEN or self.failure_count >= self.threshold:
+            self.state = CircuitState.OPEN
+            self.half_open_in_flight = 0
+
+    def release_probe(self) -> None:
+        """Return an unused half-open probe slot (call never reached the backend)."""
+        if self.state == CircuitState.HALF_OPEN and self.half_open_in_flight > 0:
+            self.half_open_in_flight -= 1
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state.value,
+            "failure_count": self.failure_count,
+            "threshold": self.threshold,
+            "recovery_timeout": self.recovery_timeout,
+        }
+
+
+class BackendStats:
+    """Rolling latency percentiles and error rate for one backend."""
+
+    def __init__(self, window: int = 200):
+        self.latencies = RollingWindow(size=window)
+        self._outcomes: deque[bool] = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Record a completed call (latency in seconds)."""
+        self.latencies.add(latency)
+        self._outcomes.append(ok)
+
+    @property
+    def samples(self) -> int:
+        return len(self._outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def percentile(self, q: float) -> Optional[float]:
+        return self.latencies.percentile(q)
+
+    def routing_cost(self) -> Optional[float]:
+        """
+        Expected cost of routing to this backend (lower is better), or None
+        when there is no data yet. Blends p50 and p95 latency and inflates it
+        by the error rate, since a failed call costs a full retry elsewhere.
+        """
+        p50 = self.percentile(0.50)
+        p95 = self.percentile(0.95)
+        if p50 is None or p95 is None:
+            return None
+        return (0.5 * p50 + 0.5 * p95) * (1.0 + 5.0 * self.error_rate)
+
+    def to_dict(self) -> dict:
+        p50 = self.percentile(0.50)
+        p95 = self.percentile(0.95)
+        return {
+            "samples": self.samples,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 4),
+        }
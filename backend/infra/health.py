@@ -0,0 +1,155 @@
+"""
+Health Monitor - Background Backend Probing
+===========================================
+
+Probes every LLM backend concurrently on an interval and keeps a TTL-cached
+snapshot, so ``/health`` and ``/api/swarm/status`` read state from memory
+instead of doing network I/O on the request path. A local model that
+restarts (or dies) is picked up on the next probe.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+
+Probe = Callable[[], Awaitable[bool]]
+
+
+@dataclass
+class BackendProbe:
+    """Result of probing a single backend."""
+    name: str
+    ok: bool
+    latency_ms: float
+    checked_at: float
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "ok": self.ok,
+            "latency_ms": round(self.latency_ms, 1),
+            "checked_at": self.checked_at,
+            "error": self.error,
+        }
+
+
+@dataclass
+class HealthSnapshot:
+    """Point-in-time health of all backends."""
+    backends: dict[str, BackendProbe] = field(default_factory=dict)
+    taken_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+    def is_ok(self, name: str) -> bool:
+        probe = self.backends.get(name)
+        return probe.ok if probe else False
+
+    def to_dict(self) -> dict:
+        return {name: probe.to_dict() for name, probe in self.backends.items()}
+
+
+class HealthMonitor:
+    """
+    Runs all backend probes concurrently, on demand or from a background task.
+
+    ``get_snapshot()`` returns the cached snapshot while it is younger than
+    ``ttl``; otherwise it refreshes (concurrent callers share one refresh).
+    """
+
+    def __init__(
+        self,
+        probes: dict[str, Probe],
+        interval: float = 15.0,
+        ttl: float = 30.0,
+        probe_timeout: float = 5.0,
+    ):
+        self.probes = probes
+        self.interval = interval
+        self.ttl = ttl
+        self.probe_timeout = probe_timeout
+        self.snapshot: Optional[HealthSnapshot] = None
+        self.refreshes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._refreshing: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Take an initial snapshot and start the background refresh loop."""
+        await self.refresh()
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception:
+                pass  # Keep the last snapshot; next tick retries
+
+    async def get_snapshot(self) -> HealthSnapshot:
+        """Return a snapshot no older than ``ttl`` (refreshing if needed)."""
+        if self.snapshot is not None and self.snapshot.age < self.ttl:
+            return self.snapshot
+        return await self.refresh()
+
+    async def refresh(self) -> HealthSnapshot:
+        """Probe all backends concurrently and replace the snapshot."""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._probe_all())
+        return await asyncio.shield(self._refreshing)
+
+    async def _probe_all(self) -> HealthSnapshot:
+        results = await asyncio.gather(
+            *(self._probe(name, probe) for name, probe in self.probes.items())
+        )
+        self.snapshot = HealthSnapshot(backends={r.name: r for r in results})
+        self.refreshes += 1
+        return self.snapshot
+
+    async def _probe(self, name: str, probe: Probe) -> BackendProbe:
+        start = time.monotonic()
+        error = None
+        try:
+            ok = bool(await asyncio.wait_for(probe(), timeout=self.probe_timeout))
+        except asyncio.TimeoutError:
+            ok, error = False, "timeout"
+        except Exception as e:
+            ok, error = False, str(e) or type(e).__name__
+        return BackendProbe(
+            name=name,
+            ok=ok,
+            latency_ms=(time.monotonic() - start) * 1000,
+            checked_at=time.time(),
+            error=error,
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "ttl": self.ttl,
+            "refreshes": self.refreshes,
+            "snapshot_age": round(self.snapshot.age, 3) if self.snapshot else None,
+            "backends": self.snapshot.to_dict() if self.snapshot else {},
+        }
@@ -0,0 +1,79 @@
+"""
+Request Hedging - Tail-Latency Reduction
+========================================
+
+If the primary backend has not answered by its observed p90 latency, the
+router sends the same request to the next backend and takes whichever
+answers first. A budget caps hedges to a fraction of total requests so a
+global slowdown cannot double the load on every backend.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class HedgePolicy:
+    """When and how often to hedge."""
+    enabled: bool = False
+    quantile: float = 0.9
+    default_delay: float = 2.0
+    min_samples: int = 20
+    max_extra_load: float = 0.1
+    max_burst: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        """Read ``ROUTER_HEDGING*`` environment variables."""
+        return cls(
+            enabled=os.getenv("ROUTER_HEDGING", "false").lower() == "true",
+            quantile=float(os.getenv("ROUTER_HEDGING_QUANTILE", "0.9")),
+            default_delay=float(os.getenv("ROUTER_HEDGING_DEFAULT_DELAY", "2.0")),
+            min_samples=int(os.getenv("ROUTER_HEDGING_MIN_SAMPLES", "20")),
+            max_extra_load=float(os.getenv("ROUTER_HEDGING_MAX_EXTRA_LOAD", "0.1")),
+        )
+
+
+class HedgeBudget:
+    """
+    Token budget for hedged requests: every request earns ``max_extra_load``
+    tokens (capped at ``max_burst``) and every hedge spends one, so hedges
+    stay below ``max_extra_load`` of total traffic over time.
+    """
+
+    def __init__(self, policy: HedgePolicy):
+        self.policy = policy
+        self.tokens = 1.0
+        self.requests = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+        self.budget_denied = 0
+
+    def on_request(self) -> None:
+        self.requests += 1
+        self.tokens = min(self.policy.max_burst, self.tokens + self.policy.max_extra_load)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1.0:
+            self.budget_denied += 1
+            return False
+        self.tokens -= 1.0
+        self.hedges_sent += 1
+        return True
+
+    def get_stats(self) -> dict:
+        decided = self.hedge_wins + self.primary_wins
+        return {
+            "enabled": self.policy.enabled,
+            "requests": self.requests,
+            "hedges_sent": self.hedges_sent,
+            "hedge_rate": round(self.hedges_sent / self.requests, 4) if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "primary_wins": self.primary_wins,
+            "hedge_win_rate": round(self.hedge_wins / decided, 4) if decided else 0.0,
+            "budget_denied": self.budget_denied,
+        }
@@ -0,0 +1,298 @@
+"""
+Inference Service - Batched Local AI-Text Detection
+===================================================
+
+Serves the ``bert`` backend: AI-likelihood, perplexity and burstiness for
+student answers, computed on CPU in a process pool so the event loop never
+runs model code.
+
+Concurrent requests are grouped by length into buckets (64/128/256/512+
+tokens by default), and each bucket is micro-batched separately. Padded
+batches then contain texts of similar length, so little compute is spent
+on padding.
+
+Each worker process loads its detector once:
+
+    - ``INFERENCE_MODEL`` set and ``transformers`` installed: a small causal
+      LM (e.g. ``distilgpt2``) scores token-level perplexity
+    - otherwise: a statistical detector (sentence-length burstiness and
+      lexical perplexity), which is deliberately capped so it can only flag
+      answers for review, never veto them
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import asyncio
+import bisect
+import math
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from backend.infra.microbatch import MicroBatcher
+from backend.infra.scheduler import estimate_tokens
+
+try:  # Optional: model-based perplexity (pip install transformers torch)
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+
+_WORD_PATTERN = re.compile(r"[A-Za-z0-9']+")
+_SENTENCE_PATTERN = re.compile(r"[^.!?]+")
+
+# Without a language model, length statistics are weak evidence: cap the
+# likelihood so the security vote can flag (score < 70) but never veto
+STATISTICAL_MAX_LIKELIHOOD = 0.5
+
+
+# =============================================================================
+# Detectors (run inside worker processes)
+# =============================================================================
+
+class StatisticalDetector:
+    """Model-free fallback: burstiness of sentence lengths + lexical perplexity."""
+
+    name = "statistical"
+
+    def score(self, texts: list[str]) -> list[dict]:
+        return [self._score_one(text) for text in texts]
+
+    def _score_one(self, text: str) -> dict:
+        words = [w.lower() for w in _WORD_PATTERN.findall(text)]
+        lengths = [len(_WORD_PATTERN.findall(s)) for s in _SENTENCE_PATTERN.findall(text)]
+        lengths = [n for n in lengths if n]
+        if not words:
+            return {"ai_likelihood": 0.0, "perplexity": 0.0, "burstiness": 0.0, "tokens": 0, "model": self.name}
+
+        # Unigram perplexity of the text under its own word distribution
+        counts: dict[str, int] = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        entropy = -sum(c / len(words) * math.log(c / len(words)) for c in counts.values())
+        perplexity = math.exp(entropy)
+
+        # Coefficient of variation of sentence lengths: human writing mixes
+        # short and long sentences, generated text is markedly even
+        mean = sum(lengths) / len(lengths)
+        burstiness = math.sqrt(sum((n - mean) ** 2 for n in lengths) / len(lengths)) / mean
+
+        # Needs at least 3 sentences; full weight from 6
+        support = min(1.0, max(0, len(lengths) - 2) / 4)
+        uniformity = min(1.0, max(0.0, 1.0 - burstiness / 0.5))
+        repetition = min(1.0, max(0.0, (0.75 - perplexity / len(words)) / 0.35))
+        likelihood = STATISTICAL_MAX_LIKELIHOOD * support * (0.8 * uniformity + 0.2 * repetition)
+        return {
+            "ai_likelihood": round(likelihood, 4),
+            "perplexity": round(perplexity, 2),
+            "burstiness": round(burstiness, 4),
+            "tokens": len(words),
+            "model": self.name,
+        }
+
+
+class TransformerDetector:
+    """Causal-LM perplexity detector (low, even perplexity suggests generated text)."""
+
+    def __init__(self, model_name: str, max_tokens: int = 512, reference_perplexity: float = 30.0):
+        torch.set_num_threads(1)  # Parallelism comes from the process pool
+        self.name = model_name
+        self.max_tokens = max_tokens
+        self.reference_perplexity = reference_perplexity
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.model = AutoModelForCausalLM.from_pretrained(model_name).eval()
+
+    def score(self, texts: list[str]) -> list[dict]:
+        batch = self.tokenizer(
+            texts, return_tensors="pt", padding=True, truncation=True, max_length=self.max_tokens
+        )
+        with torch.inference_mode():
+            logits = self.model(**batch).logits
+        # Token t is predicted from positions < t
+        targets = batch["input_ids"][:, 1:]
+        mask = batch["attention_mask"][:, 1:].float()
+        nll = torch.nn.functional.cross_entropy(
+            logits[:, :-1].transpose(1, 2), targets, reduction="none"
+        ) * mask
+
+        results = []
+        for row in range(len(texts)):
+            count = int(mask[row].sum())
+            if not count:
+                results.append({"ai_likelihood": 0.0, "perplexity": 0.0, "burstiness": 0.0,
+                                "tokens": 0, "model": self.name})
+                continue
+            token_nll = nll[row][mask[row] > 0]
+            mean_nll = float(token_nll.mean())
+            burstiness = float(token_nll.std()) / mean_nll if count > 1 and mean_nll else 0.0
+            perplexity = math.exp(mean_nll)
+            likelihood = 1.0 / (1.0 + math.exp(2.0 * (mean_nll - math.log(self.reference_perplexity))))
+            results.append({
+                "ai_likelihood": round(likelihood, 4),
+                "perplexity": round(perplexity, 2),
+                "burstiness": round(burstiness, 4),
+                "tokens": count + 1,
+                "model": self.name,
+            })
+        return results
+
+
+_detector = None
+
+
+def _init_worker(model_name: str, max_tokens: int, reference_perplexity: float) -> None:
+    """Load the detector once per worker process."""
+    global _detector
+    if model_name and TRANSFORMERS_AVAILABLE:
+        _detector = TransformerDetector(model_name, max_tokens, reference_perplexity)
+    else:
+        _detector = StatisticalDetector()
+
+
+def score_batch(texts: list[str]) -> tuple[list[dict], float]:
+    """
+    Score a batch in the current process.
+
+    Returns:
+        (one result per text, CPU seconds spent)
+    """
+    if _detector is None:
+        _init_worker("", 0, 0.0)
+    start = time.process_time()
+    results = _detector.score(texts)
+    return results, time.process_time() - start
+
+
+# =============================================================================
+# Service (event-loop side)
+# =============================================================================
+
+class InferenceService:
+    """
+    Length-bucketed dynamic batching in front of a detector process pool.
+
+    ``workers=0`` runs the detector in a thread of this process instead
+    (development and tests).
+    """
+
+    def __init__(
+        self,
+        model_name: str = "",
+        workers: Optional[int] = None,
+        max_batch_size: int = 16,
+        max_wait: float = 0.01,
+        buckets: tuple[int, ...] = (64, 128, 256, 512),
+        max_tokens: int = 512,
+        reference_perplexity: float = 30.0,
+    ):
+        """
+        Args:
+            model_name: Hugging Face causal LM for perplexity ("" = statistical)
+            workers: Worker processes (default: min(2, CPU count))
+            max_batch_size: Texts per padded batch
+            max_wait: Seconds to wait for a batch to fill
+            buckets: Token-length upper bounds of the batching buckets
+            max_tokens: Tokens scored per text (longer texts are truncated)
+            reference_perplexity: Perplexity at which AI-likelihood is 0.5
+        """
+        self.model_name = model_name
+        self.workers = min(2, os.cpu_count() or 1) if workers is None else workers
+        self.buckets = tuple(sorted(buckets))
+        self.max_tokens = max_tokens
+        self.reference_perplexity = reference_perplexity
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # One batcher per bucket, plus one for texts longer than the last bound
+        self._batchers = [
+            MicroBatcher(self._run_batch, max_batch_size=max_batch_size, max_wait=max_wait)
+            for _ in range(len(self.buckets) + 1)
+        ]
+        self.answers = 0
+        self.cpu_seconds = 0.0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls) -> "InferenceService":
+        """Read ``INFERENCE_*`` environment variables."""
+        workers = os.getenv("INFERENCE_WORKERS", "")
+        buckets = os.getenv("INFERENCE_BUCKETS", "64,128,256,512")
+        return cls(
+            model_name=os.getenv("INFERENCE_MODEL", ""),
+            workers=int(workers) if workers else None,
+            max_batch_size=int(os.getenv("INFERENCE_MAX_BATCH", "16")),
+            max_wait=float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "10")) / 1000,
+            buckets=tuple(int(b) for b in buckets.split(",") if b.strip()),
+            max_tokens=int(os.getenv("INFERENCE_MAX_TOKENS", "512")),
+            reference_perplexity=float(os.getenv("INFERENCE_REFERENCE_PERPLEXITY", "30")),
+        )
+
+    @property
+    def backend(self) -> str:
+        return "transformers" if self.model_name and TRANSFORMERS_AVAILABLE else "statistical"
+
+    def _bucket(self, text: str) -> int:
+        return bisect.bisect_left(self.buckets, estimate_tokens(text, completion_tokens=0))
+
+    async def score(self, text: str) -> dict:
+        """
+        Score one answer (batched with concurrent answers of similar length).
+
+        Returns:
+            Dict with ``ai_likelihood`` (0-1), ``perplexity``, ``burstiness``,
+            ``tokens`` and ``model``
+        """
+        return await self._batchers[self._bucket(text)].submit(text)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and HTTP pools is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.max_tokens, self.reference_perplexity),
+            )
+        return self._executor
+
+    async def _run_batch(self, texts: list[str]) -> list[dict]:
+        try:
+            if self.workers <= 0:
+                results, cpu_seconds = await asyncio.to_thread(score_batch, texts)
+            else:
+                loop = asyncio.get_running_loop()
+                results, cpu_seconds = await loop.run_in_executor(self._get_executor(), score_batch, texts)
+        except Exception:
+            self.failures += 1
+            raise
+        self.answers += len(texts)
+        self.cpu_seconds += cpu_seconds
+        return results
+
+    async def aclose(self) -> None:
+        """Stop the worker processes (called from the router's shutdown)."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    def get_stats(self) -> dict:
+        bounds = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}" if self.buckets else "all"]
+        return {
+            "backend": self.backend,
+            "model": self.model_name or StatisticalDetector.name,
+            "workers": self.workers,
+            "answers": self.answers,
+            "failures": self.failures,
+            # Worker CPU time, so the rate is per core regardless of pool size
+            "answers_per_core_second": round(self.answers / self.cpu_seconds, 1) if self.cpu_seconds else 0.0,
+            "buckets": {
+                bound: {"batches": b.batches, "mean_batch_size": round(b.batch_sizes.mean(), 2)}
+                for bound, b in zip(bounds, self._batchers)
+            },
+        }
@@ -0,0 +1,59 @@
+"""
+Router Metrics - Rolling Latency Windows
+========================================
+
+Small helpers for the rolling statistics reported by the router
+(queue wait times, backend latencies, time-to-first-token).
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+from collections import deque
+from typing import Optional
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (``q`` in 0-1)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class RollingWindow:
+    """Fixed-size window of recent samples with summary statistics."""
+
+    def __init__(self, size: int = 1000):
+        self._samples: deque[float] = deque(maxlen=size)
+        self.count = 0
+        self.max_value = 0.0
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+        self.max_value = max(self.max_value, value)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def mean(self) -> float:
+        return sum(self._samples) / len(self._samples) if self._samples else 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the ``q`` percentile of the window, or None if empty."""
+        if not self._samples:
+            return None
+        return percentile(sorted(self._samples), q)
+
+    def summary(self, scale: float = 1.0) -> dict:
+        """Summarise the window (values multiplied by ``scale``, e.g. 1000 for ms)."""
+        values = sorted(self._samples)
+        return {
+            "count": self.count,
+            "mean": round(self.mean() * scale, 3),
+            "p50": round(percentile(values, 0.50) * scale, 3),
+            "p95": round(percentile(values, 0.95) * scale, 3),
+            "p99": round(percentile(values, 0.99) * scale, 3),
+            "max": round(self.max_value * scale, 3),
+        }
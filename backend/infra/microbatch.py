@@ -0,0 +1,112 @@
+"""
+Micro-Batcher - Collect Concurrent Calls into One Backend Request
+=================================================================
+
+Callers ``submit()`` single items; the batcher gathers them for up to
+``max_wait`` seconds (or until ``max_batch_size`` items are waiting), runs
+one handler call for the whole batch, and fans the results back to each
+awaiting caller. Used in front of the local model, which handles one
+multi-answer prompt far more efficiently than many single-answer ones.
+The handler runs at the highest ``REQUEST_PRIORITY`` among the batch's
+callers, so an interactive answer never waits in the batch lane because
+a cohort job happened to open the window.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from backend.infra.metrics import RollingWindow
+from backend.infra.scheduler import REQUEST_PRIORITY, Priority
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Receives the batch; returns one result (or Exception) per item, in order
+BatchHandler = Callable[[list[T]], Awaitable[list[R]]]
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Time/size-windowed request collector.
+
+    If the handler raises, every caller in the batch receives the error; a
+    handler may also return an ``Exception`` instance for a single item to
+    fail only that caller.
+    """
+
+    def __init__(self, handler: BatchHandler, max_batch_size: int = 8, max_wait: float = 0.02):
+        """
+        Args:
+            handler: Async callable processing a list of items
+            max_batch_size: Flush as soon as this many items are waiting
+            max_wait: Seconds to wait for more items after the first arrives
+        """
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._pending: list[tuple[T, asyncio.Future, Priority]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes = RollingWindow()
+
+    async def submit(self, item: T) -> R:
+        """Queue an item and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, REQUEST_PRIORITY.get()))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future, Priority]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        self.batch_sizes.add(len(batch))
+        # Runs in its own task, so this only affects the batch's backend call
+        REQUEST_PRIORITY.set(min(priority for _, _, priority in batch))
+        try:
+            results = await self.handler([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch handler returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue  # Caller went away
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def get_stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.batch_sizes.mean(), 2),
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,196 @@
+"""
+Connection Pool - Long-lived HTTP Clients per Backend
+=====================================================
+
+Owns one pooled, keep-alive ``httpx.AsyncClient`` per LLM backend so that
+agents reuse TCP/TLS connections instead of paying a fresh handshake on
+every call. HTTP/2 is enabled when the optional ``h2`` package is installed.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import httpx
+
+try:  # HTTP/2 support is optional (pip install "httpx[http2]")
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Default base URLs for each backend (overridable via <BACKEND>_BASE_URL)
+DEFAULT_BASE_URLS = {
+    "local": "http://localhost:11434",
+    "gemini": "https://generativelanguage.googleapis.com",
+    "claude": "https://api.anthropic.com",
+    "openai": "https://api.openai.com",
+}
+
+
+@dataclass
+class PoolConfig:
+    """Connection pool limits for a single backend."""
+    base_url: str
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    timeout: float = 60.0
+    connect_timeout: float = 5.0
+    http2: bool = True
+
+    @classmethod
+    def from_env(cls, backend: str) -> "PoolConfig":
+        """
+        Build the pool config for a backend from environment variables.
+
+        Reads ``POOL_<BACKEND>_MAX_CONNECTIONS``, ``POOL_<BACKEND>_MAX_KEEPALIVE``,
+        ``POOL_<BACKEND>_KEEPALIVE_EXPIRY`` and ``POOL_<BACKEND>_TIMEOUT``,
+        falling back to the backend-agnostic ``POOL_*`` variables.
+        """
+        prefix = f"POOL_{backend.upper()}_"
+
+        def _env(name: str, default: str) -> str:
+            return os.getenv(prefix + name, os.getenv(f"POOL_{name}", default))
+
+        if backend == "local":
+            base_url = os.getenv("OLLAMA_HOST", DEFAULT_BASE_URLS["local"])
+            # Local inference is slow and memory-bound: fewer, longer-lived connections
+            default_timeout = os.getenv("OLLAMA_TIMEOUT", "120")
+            default_max = "8"
+        else:
+            base_url = os.getenv(f"{backend.upper()}_BASE_URL", DEFAULT_BASE_URLS.get(backend, ""))
+            default_timeout = "60"
+            default_max = "100"
+
+        return cls(
+            base_url=base_url,
+            max_connections=int(_env("MAX_CONNECTIONS", default_max)),
+            max_keepalive_connections=int(_env("MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(_env("KEEPALIVE_EXPIRY", "30")),
+            timeout=float(_env("TIMEOUT", default_timeout)),
+            connect_timeout=float(_env("CONNECT_TIMEOUT", "5")),
+            http2=_env("HTTP2", "true").lower() == "true",
+        )
+
+
+class ConnectionPool:
+    """
+    Registry of pooled ``httpx.AsyncClient`` instances, one per backend.
+
+    Clients are created by ``open()`` (called from the FastAPI lifespan) or
+    lazily on first use, and live until ``aclose()``.
+    """
+
+    def __init__(
+        self,
+        configs: Optional[dict[str, PoolConfig]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            configs: Per-backend pool configs (defaults to ``PoolConfig.from_env``)
+            transport: Optional transport shared by all clients (tests/benchmarks)
+        """
+        self.configs = configs or {
+            backend: PoolConfig.from_env(backend) for backend in DEFAULT_BASE_URLS
+        }
+        self._transport = transport
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._in_flight: dict[str, int] = {backend: 0 for backend in self.configs}
+        self._total_requests: dict[str, int] = {backend: 0 for backend in self.configs}
+
+    async def open(self) -> None:
+        """Eagerly create a client for every configured backend."""
+        for backend in self.configs:
+            self.client(backend)
+
+    def client(self, backend: str) -> httpx.AsyncClient:
+        """Return the long-lived client for a backend, creating it if needed."""
+        client = self._clients.get(backend)
+        if client is None or client.is_closed:
+            client = self._create_client(backend)
+            self._clients[backend] = client
+        return client
+
+    def _create_client(self, backend: str) -> httpx.AsyncClient:
+        """Create a pooled client honouring the backend's limits."""
+        config = self.configs.get(backend)
+        if config is None:
+            raise ValueError(f"No pool configured for backend: {backend}")
+
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(config.timeout, connect=config.connect_timeout)
+
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            limits=limits,
+            timeout=timeout,
+            http2=config.http2 and HTTP2_AVAILABLE and self._transport is None,
+            transport=self._transport,
+        )
+
+    async def request(self, backend: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the backend's pooled client, tracking occupancy."""
+        client = self.client(backend)
+        self._in_flight[backend] = self._in_flight.get(backend, 0) + 1
+        self._total_requests[backend] = self._total_requests.get(backend, 0) + 1
+        try:
+            return await client.request(method, url, **kwargs)
+        finally:
+            self._in_flight[backend] -= 1
+
+    @asynccontextmanager
+    async def stream(self, backend: str, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Open a streaming response on the backend's pooled client, tracking occupancy."""
+        client = self.client(backend)
+        self._in_flight[backend] = self._in_flight.get(backend, 0) + 1
+        self._total_requests[backend] = self._total_requests.get(backend, 0) + 1
+        try:
+            async with client.stream(method, url, **kwargs) as response:
+                yield response
+        finally:
+            self._in_flight[backend] -= 1
+
+    async def aclose(self) -> None:
+        """Close every client and release pooled connections."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    def stats(self) -> dict:
+        """Return pool occupancy per backend."""
+        result = {}
+        for backend, config in self.configs.items():
+            client = self._clients.get(backend)
+            connections = self._connection_states(client)
+            result[backend] = {
+                "open": client is not None and not client.is_closed,
+                "http2": config.http2 and HTTP2_AVAILABLE,
+                "max_connections": config.max_connections,
+                "max_keepalive_connections": config.max_keepalive_connections,
+                "in_flight": self._in_flight.get(backend, 0),
+                "total_requests": self._total_requests.get(backend, 0),
+                "connections": len(connections),
+                "idle_connections": sum(1 for c in connections if c),
+            }
+        return result
+
+    @staticmethod
+    def _connection_states(client: Optional[httpx.AsyncClient]) -> list[bool]:
+        """List idle-state of each pooled connection (empty if not introspectable)."""
+        if client is None or client.is_closed:
+            return []
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None) or []
+        return [conn.is_idle() for conn in connections]
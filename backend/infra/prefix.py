@@ -0,0 +1,135 @@
+"""
+Prefix Cache - Reuse of Shared Prompt Prefixes
+==============================================
+
+Every answer in an exam is graded with the same system prompt and reference
+material; only the student's answer changes. Agents therefore put the shared
+part in the system prompt (a stable prefix) and the router asks each backend
+to reuse it instead of re-processing it for every student:
+
+    - Ollama:  ``context`` tokens from a one-off priming call
+    - Gemini:  an explicit ``cachedContents`` resource
+    - Claude:  ``cache_control`` on the system block
+    - OpenAI:  automatic prefix caching (system message first)
+
+This module keeps the provider handles (context tokens, cache names) and the
+tokens-saved counters.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from backend.infra.cache import make_cache_key
+from backend.infra.scheduler import estimate_tokens
+from backend.infra.singleflight import SingleFlight
+
+
+@dataclass
+class PrefixStats:
+    """Per-backend prefix reuse counters."""
+    requests: int = 0  # Requests with a prefix large enough to reuse
+    reused: int = 0  # Requests that hit a provider-side prefix cache
+    prefix_tokens: int = 0  # Estimated prefix tokens across those requests
+    tokens_saved: int = 0  # Prefix tokens the backend did not re-process
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "reused": self.reused,
+            "reuse_rate": round(self.reused / self.requests, 4) if self.requests else 0.0,
+            "prefix_tokens": self.prefix_tokens,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+
+
+class PrefixCache:
+    """
+    TTL + LRU store of provider-side prefix handles, keyed by (backend, prefix).
+
+    Handles are created once per prefix (concurrent callers share the
+    creation). A failed or unsupported creation is cached as ``None`` so the
+    router falls back to sending the full prompt without retrying each time.
+    """
+
+    def __init__(self, enabled: bool = True, min_tokens: int = 1024, ttl: float = 3600.0, max_entries: int = 128):
+        self.enabled = enabled
+        self.min_tokens = min_tokens
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._flight = SingleFlight()
+        self.created = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls) -> "PrefixCache":
+        """Read ``PREFIX_CACHE_*`` environment variables."""
+        return cls(
+            enabled=os.getenv("PREFIX_CACHE_ENABLED", "true").lower() == "true",
+            min_tokens=int(os.getenv("PREFIX_CACHE_MIN_TOKENS", "1024")),
+            ttl=float(os.getenv("PREFIX_CACHE_TTL", "3600")),
+            max_entries=int(os.getenv("PREFIX_CACHE_MAX_ENTRIES", "128")),
+        )
+
+    def eligible(self, prefix: str) -> bool:
+        """Whether a prefix is worth caching (providers reject tiny ones)."""
+        return self.enabled and estimate_tokens(prefix, completion_tokens=0) >= self.min_tokens
+
+    async def get_or_create(
+        self,
+        backend: str,
+        prefix: str,
+        create: Callable[[], Awaitable[Optional[Any]]],
+    ) -> Optional[Any]:
+        """
+        Return the handle for ``prefix`` on ``backend``, creating it if needed.
+
+        Returns:
+            The handle, or None if the backend could not cache this prefix
+        """
+        key = make_cache_key(backend, "", prefix)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry.value
+        return await self._flight.do(key, lambda: self._create(key, create))
+
+    async def _create(self, key: str, create: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        try:
+            value = await create()
+        except Exception:
+            value = None
+        if value is None:
+            self.failed += 1
+        else:
+            self.created += 1
+        self._entries[key] = _Entry(value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, backend: str, prefix: str) -> None:
+        """Forget a handle (e.g. the provider expired it early)."""
+        self._entries.pop(make_cache_key(backend, "", prefix), None)
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "min_tokens": self.min_tokens,
+            "entries": len(self._entries),
+            "created": self.created,
+            "failed": self.failed,
+        }
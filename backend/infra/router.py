@@ -11,10 +11,21 @@ Branch: feat/anshuman-hybrid
 
 import os
 import asyncio
-from dataclasses import dataclass
+import json
+import time
 from enum import Enum
-from typing import Optional
-import httpx
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from backend.infra.cache import ResponseCache, make_cache_key
+from backend.infra.circuit import BackendStats, CircuitBreaker, CircuitState
+from backend.infra.health import HealthMonitor
+from backend.infra.hedging import HedgeBudget, HedgePolicy
+from backend.infra.inference import InferenceService
+from backend.infra.pool import ConnectionPool
+from backend.infra.prefix import PrefixCache, PrefixStats
+from backend.infra.scheduler import REQUEST_PRIORITY, Priority, QueueFullError, RequestScheduler, estimate_tokens
+from backend.infra.singleflight import SingleFlight
+from backend.infra.streaming import JsonObjectScanner, StreamStats
 
 
 class ModelType(Enum):
@@ -25,112 +36,590 @@ class ModelType(Enum):
     BERT = "bert"
 
 
-@dataclass
-class CircuitBreaker:
-    """Circuit breaker for service failover."""
-    failure_count: int = 0
-    threshold: int = 3
-    recovery_timeout: int = 60
-    last_failure_time: float = 0.0
-    is_open: bool = False
+class PlaceholderResponse(str):
+    """Canned response from a cloud backend without an API key (never cached)."""
 
 
 class HybridRouter:
     """
     Hybrid router for Cloud ↔ Local LLM traffic.
     
-    # TODO Anshuman: Implement circuit breakers. If Gemini API fails, 
-    # failover to GPT-4o or Claude automatically.
-    # TODO Anshuman: Add request queuing for rate limiting.
-    # TODO Anshuman: Implement health checks for all backends.
+    Each backend has a closed/open/half-open circuit breaker; the failover
+    order is recomputed on every request from rolling latency and error rate.
+    A background HealthMonitor probes all backends so health reads never
+    block on the network.
     """
     
+    # Static failover order, used until backends have latency samples
+    FALLBACK_CHAIN = [
+        ModelType.GEMINI,
+        ModelType.CLAUDE,
+        ModelType.OPENAI,
+        ModelType.LOCAL,
+    ]
+    
     def __init__(self):
         self.ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
         self.ollama_model = os.getenv("OLLAMA_MODEL", "llama3")
         self.gemini_key = os.getenv("GEMINI_API_KEY", "")
         self.claude_key = os.getenv("ANTHROPIC_API_KEY", "")
         self.openai_key = os.getenv("OPENAI_API_KEY", "")
+        self.gemini_model = os.getenv("GEMINI_MODEL", "gemini-pro")
+        self.claude_model = os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-20241022")
+        self.openai_model = os.getenv("OPENAI_MODEL", "gpt-4o")
+        self.max_output_tokens = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "512"))
         
         # Circuit breakers for each service
+        threshold = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "3"))
+        recovery_timeout = int(os.getenv("CIRCUIT_BREAKER_RECOVERY_TIMEOUT", "60"))
         self.circuit_breakers = {
-            ModelType.GEMINI: CircuitBreaker(),
-            ModelType.CLAUDE: CircuitBreaker(),
-            ModelType.OPENAI: CircuitBreaker(),
-            ModelType.LOCAL: CircuitBreaker(),
+            model: CircuitBreaker(threshold=threshold, recovery_timeout=recovery_timeout)
+            for model in self.FALLBACK_CHAIN
         }
         
-        self._local_available: Optional[bool] = None
-    
-    async def health_check(self) -> dict:
-        """Check health of all LLM backends."""
-        # TODO Anshuman: Run parallel health checks
-        local_ok = await self.is_local_available()
+        # Rolling latency / error-rate per backend (drives failover ordering)
+        self.backend_stats = {model: BackendStats() for model in self.FALLBACK_CHAIN}
+        
+        # Long-lived, keep-alive HTTP clients (one pool per backend)
+        self.pool = ConnectionPool()
+        
+        # Content-addressed response cache (memory LRU + data/cache on disk)
+        self.cache = ResponseCache.from_env()
+        
+        # Coalesces concurrent identical requests into one backend call
+        self.singleflight = SingleFlight()
+        
+        # Per-backend token buckets and priority queues (interactive > batch)
+        self.scheduler = RequestScheduler.from_env()
+        
+        # Optional hedging of slow primaries to the next backend
+        self.hedge_policy = HedgePolicy.from_env()
+        self.hedge_budget = HedgeBudget(self.hedge_policy)
+        
+        # Token streaming (agents use it when ROUTER_STREAMING=true or when
+        # a caller asks for partial results)
+        self.streaming_enabled = os.getenv("ROUTER_STREAMING", "false").lower() == "true"
+        self.stream_stats = {model: StreamStats() for model in self.FALLBACK_CHAIN}
+        
+        # Provider-side reuse of large, stable system prompts (system +
+        # reference material shared by every answer in an exam)
+        self.prefix_cache = PrefixCache.from_env()
+        self.prefix_stats = {model: PrefixStats() for model in self.FALLBACK_CHAIN}
         
+        # Local CPU detector behind the "bert" backend (process pool,
+        # length-bucketed batching)
+        self.inference = InferenceService.from_env()
+        
+        # Concurrent, TTL-cached backend probes (refreshed in the background)
+        self.health_monitor = HealthMonitor(
+            probes={
+                "local": self._probe_local,
+                "gemini": self._probe_gemini,
+                "claude": self._probe_claude,
+                "openai": self._probe_openai,
+            },
+            interval=float(os.getenv("HEALTH_CHECK_INTERVAL", "15")),
+            ttl=float(os.getenv("HEALTH_CHECK_TTL", "30")),
+            probe_timeout=float(os.getenv("HEALTH_CHECK_TIMEOUT", "5")),
+        )
+    
+    async def startup(self) -> None:
+        """
+        Open pooled HTTP clients and start background health monitoring.
+        Called from the FastAPI lifespan.
+        """
+        await self.pool.open()
+        await self.health_monitor.start()
+    
+    async def aclose(self) -> None:
+        """Stop health monitoring, close pooled HTTP clients and inference workers."""
+        await self.health_monitor.stop()
+        await self.pool.aclose()
+        await self.inference.aclose()
+    
+    def get_stats(self) -> dict:
+        """Return router runtime statistics (pool occupancy, etc.)."""
         return {
-            "local": local_ok,
-            "gemini": bool(self.gemini_key),
-            "claude": bool(self.claude_key),
-            "openai": bool(self.openai_key),
+            "pools": self.pool.stats(),
+            "cache": self.cache.get_stats(),
+            "singleflight": self.singleflight.get_stats(),
+            "scheduler": self.scheduler.get_stats(),
+            "backends": {
+                model.value: {
+                    "circuit": self.circuit_breakers[model].to_dict(),
+                    **self.backend_stats[model].to_dict(),
+                }
+                for model in self.FALLBACK_CHAIN
+            },
+            "fallback_order": [m.value for m in self._fallback_order()],
+            "hedging": self.hedge_budget.get_stats(),
+            "streaming": {
+                model.value: self.stream_stats[model].get_stats()
+                for model in self.FALLBACK_CHAIN
+            },
+            "health": self.health_monitor.get_stats(),
+            "prefix": {
+                **self.prefix_cache.get_stats(),
+                "backends": {
+                    model.value: self.prefix_stats[model].to_dict()
+                    for model in self.FALLBACK_CHAIN
+                },
+            },
+            "inference": self.inference.get_stats(),
         }
     
+    def prefix_tokens_saved(self) -> int:
+        """Total prompt-prefix tokens backends did not have to re-process."""
+        return sum(stats.tokens_saved for stats in self.prefix_stats.values())
+    
+    async def health_check(self) -> dict:
+        """
+        Check health of all LLM backends.
+        
+        Served from the monitor's TTL-cached snapshot; probes run (in
+        parallel) only if the snapshot is stale.
+        """
+        snapshot = await self.health_monitor.get_snapshot()
+        return {name: snapshot.is_ok(name) for name in self.health_monitor.probes}
+    
+    async def health_snapshot(self) -> dict:
+        """Per-backend health including probe latency (``HealthSnapshot.to_dict``)."""
+        snapshot = await self.health_monitor.get_snapshot()
+        return snapshot.to_dict()
+    
     async def is_local_available(self) -> bool:
+        """Check if local Ollama is available (from the TTL-cached snapshot)."""
+        snapshot = await self.health_monitor.get_snapshot()
+        return snapshot.is_ok("local")
+    
+    async def _probe_local(self) -> bool:
+        resp = await self.pool.request(
+            "local", "GET", "/api/tags", timeout=self.health_monitor.probe_timeout,
+        )
+        return resp.status_code == 200
+    
+    async def _probe_gemini(self) -> bool:
+        if not self.gemini_key:
+            return False
+        resp = await self.pool.request(
+            "gemini", "GET", "/v1beta/models", params={"key": self.gemini_key},
+        )
+        return resp.status_code == 200
+    
+    async def _probe_claude(self) -> bool:
+        if not self.claude_key:
+            return False
+        resp = await self.pool.request(
+            "claude", "GET", "/v1/models",
+            headers={"x-api-key": self.claude_key, "anthropic-version": "2023-06-01"},
+        )
+        return resp.status_code == 200
+    
+    async def _probe_openai(self) -> bool:
+        if not self.openai_key:
+            return False
+        resp = await self.pool.request(
+            "openai", "GET", "/v1/models",
+            headers={"Authorization": f"Bearer {self.openai_key}"},
+        )
+        return resp.status_code == 200
+    
+    async def route_request(
+        self,
+        prompt: str,
+        system_prompt: str,
+        preferred_model: str = "gemini",
+        use_cache: bool = True,
+        priority: Optional[Priority] = None,
+        hedge: Optional[bool] = None,
+    ) -> str:
         """
-        Check if local Ollama is available.
+        Route request to appropriate LLM backend.
+        
+        Byte-identical (model, prompt, system_prompt) requests are served from
+        the response cache without touching any backend; identical requests
+        that arrive while one is in flight at the same priority await that
+        call (single-flight); ``use_cache=False`` calls only join each other.
+        Only answers from the preferred backend itself are cached: fallback
+        and hedge answers, and placeholders from backends without an API
+        key, are returned but not stored.
         
-        # TODO Anshuman: Implement caching with TTL.
+        Args:
+            prompt: User prompt
+            system_prompt: System prompt
+            preferred_model: Backend to try first
+            use_cache: Set False to bypass the response cache (e.g. re-grades
+                that must hit the model again)
+            priority: Queue priority; defaults to the caller's REQUEST_PRIORITY
+            hedge: Hedge a slow primary to the next backend (defaults to
+                the ROUTER_HEDGING policy)
         """
-        if self._local_available is not None:
-            return self._local_available
+        async def _dispatch(priority: Priority) -> tuple[ModelType, str]:
+            if hedge if hedge is not None else self.hedge_policy.enabled:
+                return await self._dispatch_hedged(prompt, system_prompt, preferred_model, priority)
+            return await self._dispatch(prompt, system_prompt, preferred_model, priority)
         
+        return await self._cached_flight("call", prompt, system_prompt, preferred_model, use_cache, priority, _dispatch)
+    
+    async def _cached_flight(
+        self,
+        kind: str,
+        prompt: str,
+        system_prompt: str,
+        preferred_model: str,
+        use_cache: bool,
+        priority: Optional[Priority],
+        dispatch: Callable[[Priority], Awaitable[tuple[Optional[ModelType], str]]],
+    ) -> str:
+        """
+        Response cache and single-flight in front of a dispatch: a cache hit
+        returns at once, otherwise identical requests share one ``dispatch``
+        call, whose answer is cached if ``_cacheable`` allows it.
+        
+        Args:
+            kind: Dispatch flavour ("call", "stream"); flights of different
+                kinds are never shared
+            dispatch: Called with the effective priority; returns (backend
+                that answered, response text)
+        """
+        # Keyed by the concrete model, so answers cached on disk by a
+        # previous GEMINI_MODEL / CLAUDE_MODEL / ... are not served after a switch
+        request_key = make_cache_key(self._model_name(preferred_model), prompt, system_prompt)
+        use_cache = use_cache and self.cache.enabled
+        priority = priority if priority is not None else REQUEST_PRIORITY.get()
+        
+        if use_cache:
+            cached = await self.cache.get(request_key)
+            if cached is not None:
+                return cached
+        elif self.cache.enabled:
+            self.cache.stats.bypassed += 1
+        
+        async def _work() -> str:
+            served, response = await dispatch(priority)
+            if use_cache and self._cacheable(preferred_model, served, response):
+                await self.cache.set(request_key, response, backend=served.value)
+            return response
+        
+        # Identical requests already in flight share one backend call
+        flight_key = f"{kind}:{self._flight_key(request_key, priority, use_cache)}"
+        return await self.singleflight.do(flight_key, _work)
+    
+    async def stream_request(
+        self,
+        prompt: str,
+        system_prompt: str,
+        preferred_model: str = "gemini",
+        priority: Optional[Priority] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream response tokens from the preferred backend.
+        
+        Failover to the next backend only happens before the first token;
+        once text has been yielded the stream is committed to its backend.
+        Closing the iterator early (``aclose()``/``break``) closes the HTTP
+        stream, which stops generation on the backend.
+        
+        Yields:
+            Response text chunks as they arrive
+        """
+        stream = self._stream_from(prompt, system_prompt, preferred_model, priority)
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{self.ollama_host}/api/tags")
-                self._local_available = resp.status_code == 200
-        except Exception:
-            self._local_available = False
+            async for _, chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    async def _stream_from(
+        self,
+        prompt: str,
+        system_prompt: str,
+        preferred_model: str,
+        priority: Optional[Priority] = None,
+    ) -> AsyncIterator[tuple[ModelType, str]]:
+        """``stream_request`` chunks paired with the backend streaming them."""
+        model_type = self._get_model_type(preferred_model)
+        candidates = [model_type] + [m for m in self._fallback_order() if m != model_type]
         
-        return self._local_available
+        for candidate in candidates:
+            if not self._allow_request(candidate):
+                continue
+            tokens = estimate_tokens(prompt, system_prompt)
+            stats = self.stream_stats.get(candidate) or StreamStats()
+            started = False
+            try:
+                async with self.scheduler.slot(candidate.value, tokens, priority):
+                    start = time.monotonic()
+                    stats.streams += 1
+                    async for chunk in self._stream_model(candidate, prompt, system_prompt):
+                        if not chunk:
+                            continue
+                        if not started:
+                            started = True
+                            stats.ttft.add(time.monotonic() - start)
+                        stats.chunks += 1
+                        yield candidate, chunk
+                    self._record_latency(candidate, time.monotonic() - start, ok=True)
+                    self._record_success(candidate)
+                return
+            except GeneratorExit:
+                # Consumer stopped early (e.g. JSON object complete): a success
+                if started:
+                    self._record_latency(candidate, time.monotonic() - start, ok=True)
+                    self._record_success(candidate)
+                else:
+                    self._release_probe(candidate)
+                raise
+            except asyncio.CancelledError:
+                self._release_probe(candidate)
+                raise
+            except QueueFullError:
+                self._release_probe(candidate)
+            except Exception:
+                self._record_failure(candidate)
+                if started:
+                    raise
+        
+        raise RuntimeError("All LLM backends unavailable")
     
-    async def route_request(
+    async def stream_json(
         self,
         prompt: str,
         system_prompt: str,
         preferred_model: str = "gemini",
+        on_partial: Optional[Callable[[dict], None]] = None,
+        priority: Optional[Priority] = None,
+        use_cache: bool = True,
     ) -> str:
         """
-        Route request to appropriate LLM backend.
+        Stream a response until its JSON object is complete, then stop.
+        
+        Shares ``route_request``'s response cache and caching rules; identical
+        streams in flight are coalesced the same way. Cache hits and callers
+        that join another caller's stream get the final text only, without
+        ``on_partial`` updates.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: System prompt
+            preferred_model: Backend to try first
+            on_partial: Called with the fields parsed so far whenever a new
+                field arrives (e.g. ``{"score": 72}`` before the feedback)
+            priority: Queue priority; defaults to the caller's REQUEST_PRIORITY
+            use_cache: Set False to bypass the response cache
+            
+        Returns:
+            The JSON object text (or the raw text if no object was found)
+        """
+        async def _dispatch(priority: Priority) -> tuple[Optional[ModelType], str]:
+            return await self._stream_json_once(prompt, system_prompt, preferred_model, on_partial, priority)
+        
+        return await self._cached_flight("stream", prompt, system_prompt, preferred_model, use_cache, priority, _dispatch)
+    
+    async def _stream_json_once(
+        self,
+        prompt: str,
+        system_prompt: str,
+        preferred_model: str,
+        on_partial: Optional[Callable[[dict], None]],
+        priority: Priority,
+    ) -> tuple[Optional[ModelType], str]:
+        """Run one stream for ``stream_json``; returns (backend that answered, text)."""
+        scanner = JsonObjectScanner()
+        raw: list[str] = []
+        seen_fields = 0
+        served: Optional[ModelType] = None
+        placeholder = False
+        stream = self._stream_from(prompt, system_prompt, preferred_model, priority)
+        try:
+            async for served, chunk in stream:
+                placeholder = placeholder or isinstance(chunk, PlaceholderResponse)
+                raw.append(chunk)
+                done = scanner.feed(chunk)
+                if on_partial is not None:
+                    fields = scanner.partial()
+                    if len(fields) > seen_fields:
+                        seen_fields = len(fields)
+                        on_partial(fields)
+                if done:
+                    # Stop generation: the score object is all agents need
+                    if served in self.stream_stats:
+                        self.stream_stats[served].early_terminations += 1
+                    break
+        finally:
+            await stream.aclose()
+        
+        response = scanner.text if scanner.complete else "".join(raw)
+        return served, PlaceholderResponse(response) if placeholder else response
+    
+    def _flight_key(self, request_key: str, priority: Priority, use_cache: bool) -> str:
+        """
+        Single-flight key: a batch call must not hold up an interactive one
+        (each waits in its own queue lane), and a call that bypasses the
+        cache (e.g. a re-grade) wants its own answer, not a cacheable one.
+        """
+        return f"{request_key}:{int(priority)}:{'cached' if use_cache else 'fresh'}"
+    
+    def _cacheable(self, preferred_model: str, served: Optional[ModelType], response: str) -> bool:
+        """
+        Whether a response may be cached under the preferred model's key: it
+        must come from that backend, and not be a missing-key placeholder.
+        """
+        return served == self._get_model_type(preferred_model) and not isinstance(response, PlaceholderResponse)
+    
+    async def _dispatch(
+        self,
+        prompt: str,
+        system_prompt: str,
+        preferred_model: str,
+        priority: Optional[Priority] = None,
+    ) -> tuple[ModelType, str]:
+        """
+        Call the preferred backend, walking the fallback chain on failure.
         
-        # TODO Anshuman: Implement circuit breakers. If Gemini API fails, 
-        # failover to GPT-4o or Claude automatically.
-        # TODO Anshuman: Add latency-based routing.
+        Returns:
+            (backend that answered, response text)
         """
-        # Try preferred model first
+        # Try preferred model first, then the fastest healthy fallbacks
         model_type = self._get_model_type(preferred_model)
+        candidates = [model_type] + [m for m in self._fallback_order() if m != model_type]
         
-        if not self._is_circuit_open(model_type):
+        queues_full = False
+        for candidate in candidates:
+            if not self._allow_request(candidate):
+                continue
             try:
-                return await self._call_model(model_type, prompt, system_prompt)
-            except Exception as e:
-                self._record_failure(model_type)
-        
-        # Fallback chain
-        # TODO Anshuman: Implement circuit breakers for automatic failover
-        fallback_chain = [
-            ModelType.GEMINI,
-            ModelType.CLAUDE,
-            ModelType.OPENAI,
-            ModelType.LOCAL,
+                return candidate, await self._call_scheduled(candidate, prompt, system_prompt, priority)
+            except asyncio.CancelledError:
+                # e.g. the losing side of a hedge: free any half-open probe slot
+                self._release_probe(candidate)
+                raise
+            except QueueFullError:
+                # Back-pressure, not a backend fault: try the next backend
+                self._release_probe(candidate)
+                queues_full = True
+            except Exception:
+                self._record_failure(candidate)
+        
+        if queues_full:
+            raise QueueFullError("All LLM backend queues are full")
+        raise RuntimeError("All LLM backends unavailable")
+    
+    async def _dispatch_hedged(
+        self,
+        prompt: str,
+        system_prompt: str,
+        preferred_model: str,
+        priority: Optional[Priority] = None,
+    ) -> tuple[ModelType, str]:
+        """
+        Dispatch to the primary backend and, if it has not answered by its
+        observed p90 latency, race the same request on the next backend.
+        The first successful answer wins and the other call is cancelled.
+        
+        Returns:
+            (backend that answered, response text)
+        """
+        primary = self._get_model_type(preferred_model)
+        backups = [
+            m for m in self._fallback_order()
+            if m != primary and self.circuit_breakers[m].can_attempt()
         ]
+        self.hedge_budget.on_request()
         
-        for fallback in fallback_chain:
-            if fallback != model_type and not self._is_circuit_open(fallback):
-                try:
-                    return await self._call_model(fallback, prompt, system_prompt)
-                except Exception:
-                    self._record_failure(fallback)
+        primary_task = asyncio.create_task(
+            self._dispatch(prompt, system_prompt, primary.value, priority)
+        )
+        tasks = [primary_task]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(primary))
+            if done or not backups or not self.hedge_budget.try_spend():
+                return await primary_task
+            
+            hedge_task = asyncio.create_task(
+                self._dispatch(prompt, system_prompt, backups[0].value, priority)
+            )
+            tasks.append(hedge_task)
+            pending = set(tasks)
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        first_error = first_error or task.exception()
+                        continue
+                    if task is hedge_task:
+                        self.hedge_budget.hedge_wins += 1
+                    else:
+                        self.hedge_budget.primary_wins += 1
+                    return task.result()
+            raise first_error
+        finally:
+            # Cancel the loser (or everything, if the caller was cancelled)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _hedge_delay(self, model: ModelType) -> float:
+        """Seconds to wait for the primary before hedging (its rolling p90)."""
+        stats = self.backend_stats.get(model)
+        if stats is None or stats.samples < self.hedge_policy.min_samples:
+            return self.hedge_policy.default_delay
+        return stats.percentile(self.hedge_policy.quantile) or self.hedge_policy.default_delay
+    
+    async def _call_scheduled(
+        self,
+        model: ModelType,
+        prompt: str,
+        system_prompt: str,
+        priority: Optional[Priority] = None,
+    ) -> str:
+        """
+        Call a backend once the scheduler grants it a rate-limited slot.
+        Latency (excluding queue wait) and outcome feed the backend stats.
+        """
+        tokens = estimate_tokens(prompt, system_prompt)
+        async with self.scheduler.slot(model.value, tokens, priority):
+            start = time.monotonic()
+            try:
+                response = await self._call_model(model, prompt, system_prompt)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._record_latency(model, time.monotonic() - start, ok=False)
+                raise
+            self._record_latency(model, time.monotonic() - start, ok=True)
+            self._record_success(model)
+            return response
+    
+    def _fallback_order(self) -> list[ModelType]:
+        """
+        Order backends for failover: those with latency samples by routing
+        cost (p50/p95 blended, inflated by error rate), then the rest in the
+        static FALLBACK_CHAIN order. Backends whose circuit is open sort last.
+        """
+        def sort_key(item: tuple[int, ModelType]):
+            index, model = item
+            cb = self.circuit_breakers.get(model)
+            blocked = cb is not None and not cb.can_attempt()
+            cost = self.backend_stats[model].routing_cost()
+            if cost is None:
+                return (blocked, 1, float(index))
+            return (blocked, 0, cost)
         
-        raise RuntimeError("All LLM backends unavailable")
+        return [m for _, m in sorted(enumerate(self.FALLBACK_CHAIN), key=sort_key)]
+    
+    def _model_name(self, preferred: str) -> str:
+        """Backend and concrete model a preference resolves to (e.g. ``gemini/gemini-pro``)."""
+        model_type = self._get_model_type(preferred)
+        names = {
+            ModelType.GEMINI: self.gemini_model,
+            ModelType.CLAUDE: self.claude_model,
+            ModelType.OPENAI: self.openai_model,
+            ModelType.LOCAL: self.ollama_model,
+        }
+        name = names.get(model_type)
+        return f"{model_type.value}/{name}" if name else model_type.value
     
     def _get_model_type(self, preferred: str) -> ModelType:
         """Map preference string to ModelType."""
@@ -148,13 +637,32 @@ class HybridRouter:
         cb = self.circuit_breakers.get(model)
         return cb.is_open if cb else False
     
+    def _allow_request(self, model: ModelType) -> bool:
+        """Ask the circuit breaker whether a call (or half-open probe) may proceed."""
+        cb = self.circuit_breakers.get(model)
+        return cb.allow_request() if cb else True
+    
+    def _release_probe(self, model: ModelType) -> None:
+        cb = self.circuit_breakers.get(model)
+        if cb:
+            cb.release_probe()
+    
     def _record_failure(self, model: ModelType) -> None:
         """Record a failure for circuit breaker."""
         cb = self.circuit_breakers.get(model)
         if cb:
-            cb.failure_count += 1
-            if cb.failure_count >= cb.threshold:
-                cb.is_open = True
+            cb.record_failure()
+    
+    def _record_success(self, model: ModelType) -> None:
+        """Record a success, closing a half-open circuit."""
+        cb = self.circuit_breakers.get(model)
+        if cb:
+            cb.record_success()
+    
+    def _record_latency(self, model: ModelType, latency: float, ok: bool) -> None:
+        stats = self.backend_stats.get(model)
+        if stats:
+            stats.record(latency, ok)
     
     async def _call_model(
         self,
@@ -162,11 +670,7 @@ class HybridRouter:
         prompt: str,
         system_prompt: str,
     ) -> str:
-        """
-        Call specific model backend.
-        
-        # TODO Anshuman: Implement actual API calls.
-        """
+        """Call specific model backend."""
         if model == ModelType.LOCAL:
             return await self._call_ollama(prompt, system_prompt)
         elif model == ModelType.GEMINI:
@@ -175,35 +679,257 @@ class HybridRouter:
             return await self._call_claude(prompt, system_prompt)
         elif model == ModelType.OPENAI:
             return await self._call_openai(prompt, system_prompt)
+        elif model == ModelType.BERT:
+            # Not a chat model: the prompt is the text to score
+            return json.dumps(await self.inference.score(prompt))
         else:
             raise ValueError(f"Unknown model: {model}")
     
+    async def _stream_model(
+        self,
+        model: ModelType,
+        prompt: str,
+        system_prompt: str,
+    ) -> AsyncIterator[str]:
+        """
+        Stream tokens from a specific backend.
+        
+        # TODO Anshuman: Native streaming for Gemini and Claude; until then
+        # they yield their full response as a single chunk.
+        """
+        if model == ModelType.LOCAL:
+            async for chunk in self._stream_ollama(prompt, system_prompt):
+                yield chunk
+        elif model == ModelType.OPENAI and self.openai_key:
+            async for chunk in self._stream_openai(prompt, system_prompt):
+                yield chunk
+        else:
+            yield await self._call_model(model, prompt, system_prompt)
+    
+    async def _stream_ollama(self, prompt: str, system_prompt: str) -> AsyncIterator[str]:
+        """Stream tokens from local Ollama (newline-delimited JSON)."""
+        payload = await self._ollama_payload(prompt, system_prompt, stream=True)
+        async with self.pool.stream("local", "POST", "/api/generate", json=payload) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                yield data.get("response", "")
+                if data.get("done"):
+                    break
+    
     async def _call_ollama(self, prompt: str, system_prompt: str) -> str:
         """Call local Ollama."""
-        # TODO Anshuman: Implement Ollama API call
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            resp = await client.post(
-                f"{self.ollama_host}/api/generate",
-                json={
-                    "model": self.ollama_model,
-                    "prompt": f"{system_prompt}\n\n{prompt}",
-                    "stream": False,
-                },
-            )
-            resp.raise_for_status()
-            return resp.json().get("response", "")
+        payload = await self._ollama_payload(prompt, system_prompt, stream=False)
+        resp = await self.pool.request("local", "POST", "/api/generate", json=payload)
+        resp.raise_for_status()
+        return resp.json().get("response", "")
+    
+    async def _ollama_payload(self, prompt: str, system_prompt: str, stream: bool) -> dict:
+        """
+        Build an /api/generate payload, reusing the evaluated system prompt
+        through Ollama's ``context`` tokens when it is large enough.
+        """
+        payload = {"model": self.ollama_model, "prompt": f"{system_prompt}\n\n{prompt}", "stream": stream}
+        if not self.prefix_cache.eligible(system_prompt):
+            return payload
+        
+        stats = self.prefix_stats[ModelType.LOCAL]
+        prefix_tokens = estimate_tokens(system_prompt, completion_tokens=0)
+        stats.requests += 1
+        stats.prefix_tokens += prefix_tokens
+        context = await self.prefix_cache.get_or_create(
+            "local", system_prompt, lambda: self._ollama_prime(system_prompt),
+        )
+        if context:
+            payload["prompt"] = prompt
+            payload["context"] = context
+            stats.reused += 1
+            stats.tokens_saved += prefix_tokens
+        return payload
+    
+    async def _ollama_prime(self, system_prompt: str) -> Optional[list]:
+        """Evaluate the prefix once (no generation) and keep its context tokens."""
+        resp = await self.pool.request(
+            "local",
+            "POST",
+            "/api/generate",
+            json={
+                "model": self.ollama_model,
+                "prompt": system_prompt,
+                "stream": False,
+                "options": {"num_predict": 0},
+            },
+        )
+        resp.raise_for_status()
+        return resp.json().get("context") or None
     
     async def _call_gemini(self, prompt: str, system_prompt: str) -> str:
-        """Call Google Gemini."""
-        # TODO Anshuman: Implement Gemini API call with langchain
-        return '{"score": 75, "confidence": 0.8, "feedback": "Gemini placeholder", "reasoning": "Mock"}'
+        """Call Google Gemini (generateContent). Returns a placeholder without an API key."""
+        if not self.gemini_key:
+            return PlaceholderResponse(
+                '{"score": 75, "confidence": 0.8, "feedback": "Gemini placeholder", "reasoning": "Mock"}'
+            )
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {"maxOutputTokens": self.max_output_tokens},
+        }
+        cached_content = None
+        if self.prefix_cache.eligible(system_prompt):
+            stats = self.prefix_stats[ModelType.GEMINI]
+            stats.requests += 1
+            stats.prefix_tokens += estimate_tokens(system_prompt, completion_tokens=0)
+            cached_content = await self.prefix_cache.get_or_create(
+                "gemini", system_prompt, lambda: self._gemini_cache_prefix(system_prompt),
+            )
+        if cached_content:
+            payload["cachedContent"] = cached_content
+        else:
+            payload["systemInstruction"] = {"parts": [{"text": system_prompt}]}
+        
+        resp = await self.pool.request(
+            "gemini",
+            "POST",
+            f"/v1beta/models/{self.gemini_model}:generateContent",
+            params={"key": self.gemini_key},
+            json=payload,
+        )
+        if cached_content and resp.status_code in (400, 403, 404):
+            # Cache expired or was deleted provider-side: resend inline once
+            self.prefix_cache.invalidate("gemini", system_prompt)
+            del payload["cachedContent"]
+            payload["systemInstruction"] = {"parts": [{"text": system_prompt}]}
+            resp = await self.pool.request(
+                "gemini",
+                "POST",
+                f"/v1beta/models/{self.gemini_model}:generateContent",
+                params={"key": self.gemini_key},
+                json=payload,
+            )
+        resp.raise_for_status()
+        data = resp.json()
+        cached_tokens = data.get("usageMetadata", {}).get("cachedContentTokenCount", 0)
+        if cached_tokens:
+            self.prefix_stats[ModelType.GEMINI].reused += 1
+            self.prefix_stats[ModelType.GEMINI].tokens_saved += cached_tokens
+        parts = data["candidates"][0]["content"]["parts"]
+        return "".join(part.get("text", "") for part in parts)
+    
+    async def _gemini_cache_prefix(self, system_prompt: str) -> Optional[str]:
+        """Create a ``cachedContents`` resource for the prefix; returns its name."""
+        resp = await self.pool.request(
+            "gemini",
+            "POST",
+            "/v1beta/cachedContents",
+            params={"key": self.gemini_key},
+            json={
+                "model": f"models/{self.gemini_model}",
+                "systemInstruction": {"parts": [{"text": system_prompt}]},
+                "ttl": f"{int(self.prefix_cache.ttl)}s",
+            },
+        )
+        resp.raise_for_status()
+        return resp.json().get("name")
     
     async def _call_claude(self, prompt: str, system_prompt: str) -> str:
-        """Call Anthropic Claude."""
-        # TODO Anshuman: Implement Claude API call
-        return '{"score": 75, "confidence": 0.8, "feedback": "Claude placeholder", "reasoning": "Mock"}'
+        """Call Anthropic Claude (Messages API). Returns a placeholder without an API key."""
+        if not self.claude_key:
+            return PlaceholderResponse(
+                '{"score": 75, "confidence": 0.8, "feedback": "Claude placeholder", "reasoning": "Mock"}'
+            )
+        system: object = system_prompt
+        if self.prefix_cache.eligible(system_prompt):
+            # Mark the shared prefix cacheable; later calls read it at a discount
+            system = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+            stats = self.prefix_stats[ModelType.CLAUDE]
+            stats.requests += 1
+            stats.prefix_tokens += estimate_tokens(system_prompt, completion_tokens=0)
+        resp = await self.pool.request(
+            "claude",
+            "POST",
+            "/v1/messages",
+            headers={"x-api-key": self.claude_key, "anthropic-version": "2023-06-01"},
+            json={
+                "model": self.claude_model,
+                "max_tokens": self.max_output_tokens,
+                "system": system,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        cached_tokens = data.get("usage", {}).get("cache_read_input_tokens", 0)
+        if cached_tokens:
+            self.prefix_stats[ModelType.CLAUDE].reused += 1
+            self.prefix_stats[ModelType.CLAUDE].tokens_saved += cached_tokens
+        blocks = data["content"]
+        return "".join(block.get("text", "") for block in blocks if block.get("type") == "text")
     
     async def _call_openai(self, prompt: str, system_prompt: str) -> str:
-        """Call OpenAI."""
-        # TODO Anshuman: Implement OpenAI API call
-        return '{"score": 75, "confidence": 0.8, "feedback": "OpenAI placeholder", "reasoning": "Mock"}'
+        """Call OpenAI (Chat Completions). Returns a placeholder without an API key."""
+        if not self.openai_key:
+            return PlaceholderResponse(
+                '{"score": 75, "confidence": 0.8, "feedback": "OpenAI placeholder", "reasoning": "Mock"}'
+            )
+        resp = await self.pool.request(
+            "openai",
+            "POST",
+            "/v1/chat/completions",
+            headers={"Authorization": f"Bearer {self.openai_key}"},
+            json=self._openai_payload(prompt, system_prompt, stream=False),
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        self._record_openai_prefix(system_prompt, data.get("usage") or {})
+        return data["choices"][0]["message"]["content"] or ""
+    
+    async def _stream_openai(self, prompt: str, system_prompt: str) -> AsyncIterator[str]:
+        """Stream tokens from OpenAI (server-sent events)."""
+        async with self.pool.stream(
+            "openai",
+            "POST",
+            "/v1/chat/completions",
+            headers={"Authorization": f"Bearer {self.openai_key}"},
+            json=self._openai_payload(prompt, system_prompt, stream=True),
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if event.get("usage"):
+                    self._record_openai_prefix(system_prompt, event["usage"])
+                if not event.get("choices"):
+                    continue
+                yield event["choices"][0].get("delta", {}).get("content") or ""
+    
+    def _openai_payload(self, prompt: str, system_prompt: str, stream: bool) -> dict:
+        # The system message (the shared prefix) goes first so OpenAI's
+        # automatic prefix caching can match it across students
+        payload = {
+            "model": self.openai_model,
+            "max_tokens": self.max_output_tokens,
+            "stream": stream,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+        }
+        if stream:
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+    
+    def _record_openai_prefix(self, system_prompt: str, usage: dict) -> None:
+        if not self.prefix_cache.eligible(system_prompt):
+            return
+        stats = self.prefix_stats[ModelType.OPENAI]
+        stats.requests += 1
+        stats.prefix_tokens += estimate_tokens(system_prompt, completion_tokens=0)
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+        if cached_tokens:
+            stats.reused += 1
+            stats.tokens_saved += cached_tokens
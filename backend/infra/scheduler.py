@@ -0,0 +1,335 @@
+"""
+Request Scheduler - Rate Limiting & Priority Queuing
+====================================================
+
+Per-backend admission control for the Hybrid Router:
+
+    - A token bucket for requests/second and one for tokens/minute
+    - A concurrency cap (protects the local model from OOM)
+    - A bounded priority queue: interactive requests (``/api/evaluate``)
+      are granted before batch work waiting on the same backend
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import AsyncIterator, Iterable, Optional
+
+from backend.infra.metrics import RollingWindow
+
+
+class Priority(IntEnum):
+    """Request priority (lower value is served first)."""
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+# Priority of LLM calls made by the current task. Batch workers set this to
+# BATCH so every agent call they trigger queues behind interactive traffic.
+REQUEST_PRIORITY: ContextVar[Priority] = ContextVar("request_priority", default=Priority.INTERACTIVE)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a backend's request queue is at capacity."""
+
+
+def estimate_tokens(*texts: str, completion_tokens: int = 256) -> int:
+    """Rough token estimate (~4 characters per token) plus expected completion."""
+    return sum(len(t) for t in texts) // 4 + completion_tokens
+
+
+@dataclass
+class RateLimit:
+    """Rate limits for a single backend (0 disables a limit)."""
+    requests_per_second: float = 10.0
+    tokens_per_minute: float = 1_000_000.0
+    max_concurrent: int = 64
+    max_queue: int = 1000
+
+    @classmethod
+    def from_env(cls, backend: str, default: "RateLimit") -> "RateLimit":
+        """Read ``RATE_<BACKEND>_RPS/_TPM/_CONCURRENCY/_MAX_QUEUE`` overrides."""
+        prefix = f"RATE_{backend.upper()}_"
+        return cls(
+            requests_per_second=float(os.getenv(prefix + "RPS", default.requests_per_second)),
+            tokens_per_minute=float(os.getenv(prefix + "TPM", default.tokens_per_minute)),
+            max_concurrent=int(os.getenv(prefix + "CONCURRENCY", default.max_concurrent)),
+            max_queue=int(os.getenv(prefix + "MAX_QUEUE", default.max_queue)),
+        )
+
+
+# Conservative defaults; tune per account tier via environment variables
+DEFAULT_RATE_LIMITS = {
+    "gemini": RateLimit(requests_per_second=10.0, tokens_per_minute=1_000_000.0),
+    "claude": RateLimit(requests_per_second=5.0, tokens_per_minute=400_000.0),
+    "openai": RateLimit(requests_per_second=10.0, tokens_per_minute=800_000.0),
+    "local": RateLimit(requests_per_second=0.0, tokens_per_minute=0.0, max_concurrent=4, max_queue=500),
+}
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens/second, up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self.tokens -= min(amount, self.capacity)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = 0
+    enqueued_at: float = 0.0
+    future: Optional[asyncio.Future] = None
+
+
+class BackendLane:
+    """Rate-limited priority queue in front of a single backend."""
+
+    def __init__(self, name: str, limit: RateLimit):
+        self.name = name
+        self.limit = limit
+        self.request_bucket = TokenBucket(
+            limit.requests_per_second, capacity=max(1.0, limit.requests_per_second),
+        )
+        self.token_bucket = TokenBucket(
+            limit.tokens_per_minute / 60.0, capacity=limit.tokens_per_minute,
+        )
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_times = RollingWindow()
+        self._heap: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._heap)
+
+    async def acquire(self, tokens: int, priority: Priority) -> None:
+        """Wait for a slot; raises QueueFullError if the queue is at capacity."""
+        if self.limit.max_queue and self.depth >= self.limit.max_queue:
+            self.rejected += 1
+            raise QueueFullError(f"{self.name} request queue is full ({self.depth} waiting)")
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(int(priority), next(self._seq), tokens, time.monotonic(), loop.create_future())
+        heapq.heappush(self._heap, waiter)
+        self._pump()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release()  # Slot was granted just before cancellation
+            else:
+                self._discard(waiter)
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        self._pump()
+
+    def _discard(self, waiter: _Waiter) -> None:
+        try:
+            self._heap.remove(waiter)
+            heapq.heapify(self._heap)
+        except ValueError:
+            pass
+
+    def _pump(self) -> None:
+        """Grant queued waiters in priority order while limits allow."""
+        while self._heap:
+            waiter = self._heap[0]
+            if waiter.future.done():
+                heapq.heappop(self._heap)
+                continue
+            if self.limit.max_concurrent and self.active >= self.limit.max_concurrent:
+                return  # release() pumps again
+            delay = max(
+                self.request_bucket.wait_time(1),
+                self.token_bucket.wait_time(waiter.tokens),
+            )
+            if delay > 0:
+                self._schedule_pump(delay)
+                return
+            heapq.heappop(self._heap)
+            self.request_bucket.take(1)
+            self.token_bucket.take(waiter.tokens)
+            self.active += 1
+            self.admitted += 1
+            self.wait_times.add(time.monotonic() - waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+    def _schedule_pump(self, delay: float) -> None:
+        if self._timer is not None and not self._timer.cancelled():
+            return
+        loop = asyncio.get_running_loop()
+
+        def _fire() -> None:
+            self._timer = None
+            self._pump()
+
+        self._timer = loop.call_later(delay, _fire)
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_depth": self.depth,
+            "active": self.active,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "max_queue": self.limit.max_queue,
+            "max_concurrent": self.limit.max_concurrent,
+            "requests_per_second": self.limit.requests_per_second,
+            "tokens_per_minute": self.limit.tokens_per_minute,
+            "wait_ms": self.wait_times.summary(scale=1000.0),
+        }
+
+
+class RequestScheduler:
+    """
+    Per-backend rate limiting and priority queuing for the Hybrid Router.
+
+    Admission control is decided per lane, on the lanes a request would
+    queue on: batch work is shed first (``shed_batch_ratio`` of a lane's
+    ``max_queue``), interactive work only when a lane is nearly full
+    (``shed_interactive_ratio``). Lanes without a queue bound never shed.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[dict[str, RateLimit]] = None,
+        shed_batch_ratio: float = 0.5,
+        shed_interactive_ratio: float = 0.9,
+    ):
+        self.lanes = {
+            name: BackendLane(name, limit)
+            for name, limit in (limits or DEFAULT_RATE_LIMITS).items()
+        }
+        self.shed_batch_ratio = shed_batch_ratio
+        self.shed_interactive_ratio = shed_interactive_ratio
+        self.shed_count = 0
+
+    @classmethod
+    def from_env(cls) -> "RequestScheduler":
+        """Build a scheduler from ``RATE_*`` / ``SCHEDULER_*`` environment variables."""
+        limits = {
+            name: RateLimit.from_env(name, default)
+            for name, default in DEFAULT_RATE_LIMITS.items()
+        }
+        return cls(
+            limits=limits,
+            shed_batch_ratio=float(os.getenv("SCHEDULER_SHED_BATCH_RATIO", "0.5")),
+            shed_interactive_ratio=float(os.getenv("SCHEDULER_SHED_INTERACTIVE_RATIO", "0.9")),
+        )
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        backend: str,
+        tokens: int,
+        priority: Optional[Priority] = None,
+    ) -> AsyncIterator[None]:
+        """
+        Hold a rate-limited slot on ``backend`` for the duration of a call.
+
+        Backends without a lane (e.g. BERT) are not limited.
+        """
+        lane = self.lanes.get(backend)
+        if lane is None:
+            yield
+            return
+        await lane.acquire(tokens, priority if priority is not None else REQUEST_PRIORITY.get())
+        try:
+            yield
+        finally:
+            lane.release()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(lane.depth for lane in self.lanes.values())
+
+    @property
+    def queue_capacity(self) -> int:
+        return sum(lane.limit.max_queue for lane in self.lanes.values())
+
+    def is_shedding(
+        self,
+        priority: Priority = Priority.INTERACTIVE,
+        backends: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        Return True if new work at ``priority`` would be shed now (no side
+        effects, so callers may poll it).
+
+        Args:
+            priority: Priority the work would queue at
+            backends: Lanes the work would queue on (default: every lane);
+                names without a lane (e.g. ``bert``) are ignored
+        """
+        ratio = self.shed_batch_ratio if priority == Priority.BATCH else self.shed_interactive_ratio
+        lanes = self.lanes.values() if backends is None else [
+            self.lanes[name] for name in backends if name in self.lanes
+        ]
+        return any(
+            lane.limit.max_queue and lane.depth >= lane.limit.max_queue * ratio
+            for lane in lanes
+        )
+
+    def should_shed(
+        self,
+        priority: Priority = Priority.INTERACTIVE,
+        backends: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        Admission check for one request: like ``is_shedding``, but a True
+        result counts the request as shed, so only call it where the
+        request is then rejected.
+        """
+        shed = self.is_shedding(priority, backends)
+        if shed:
+            self.shed_count += 1
+        return shed
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "queue_capacity": self.queue_capacity,
+            "shed": self.shed_count,
+            "backends": {name: lane.get_stats() for name, lane in self.lanes.items()},
+        }
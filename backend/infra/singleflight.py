@@ -0,0 +1,102 @@
+"""
+Single-Flight - Concurrent Request Deduplication
+================================================
+
+Coalesces concurrent identical calls: the first caller for a key runs the
+work, later callers with the same key await the same result instead of
+hitting the backend again.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters for coalesced calls."""
+    leaders: int = 0
+    coalesced: int = 0
+    abandoned: int = 0  # Calls cancelled because every caller went away
+
+    def to_dict(self) -> dict:
+        total = self.leaders + self.coalesced
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "coalesced_ratio": round(self.coalesced / total, 4) if total else 0.0,
+        }
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Per-key in-flight call registry.
+
+    The work for a key runs in its own task, so a cancelled caller (e.g. a
+    client disconnect) does not cancel the result other callers are awaiting.
+    When the last waiting caller is cancelled (e.g. a cancelled batch job
+    was the only one asking) the work is cancelled too.
+    The task is dropped from the registry as soon as it finishes, so results
+    are never reused after the fact (that is the response cache's job).
+    """
+
+    def __init__(self):
+        self._in_flight: dict[str, _Flight] = {}
+        self.stats = SingleFlightStats()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn`` for ``key``, or join the identical call already in flight.
+
+        Args:
+            key: Request identity (e.g. the response-cache key)
+            fn: Zero-argument coroutine factory doing the actual work
+
+        Returns:
+            The shared result (exceptions are propagated to every caller)
+        """
+        flight = self._in_flight.get(key)
+        if flight is None:
+            self.stats.leaders += 1
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda _t, k=key: self._forget(k, _t))
+        else:
+            self.stats.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()  # Nobody else is waiting for it
+                self.stats.abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        flight = self._in_flight.get(key)
+        if flight is not None and flight.task is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved; callers already received it
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def get_stats(self) -> dict:
+        return {"in_flight": self.in_flight, **self.stats.to_dict()}
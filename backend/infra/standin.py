@@ -0,0 +1,376 @@
+"""
+Stand-in LLM Server - Local Fake Backends for Load Testing
+==========================================================
+
+A small FastAPI app that speaks the protocols the Hybrid Router uses, with
+configurable latency distributions, error rates, 429s and token streaming:
+
+    - Ollama:     GET /api/tags, POST /api/generate (NDJSON streaming)
+    - OpenAI:     GET /v1/models, POST /v1/chat/completions (SSE streaming)
+    - Anthropic:  POST /v1/messages
+    - Gemini:     GET /v1beta/models, POST /v1beta/models/{model}:generateContent
+
+Prompt-prefix caching is emulated too (Ollama ``context`` tokens, Gemini
+``cachedContents``, Claude ``cache_control`` and OpenAI's automatic prefix
+cache), with provider-style cached-token counts in the usage fields.
+
+Use it in-process (``StandinServer.attach(router)`` wires the router's
+connection pools to it through an ASGI transport) or over TCP:
+
+    python -m backend.infra.standin --port 11434 --latency-ms 300
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from backend.infra.pool import ConnectionPool, PoolConfig
+
+
+BACKENDS = ("local", "gemini", "claude", "openai")
+
+
+@dataclass
+class LatencyProfile:
+    """Latency distribution for the time before the first token."""
+    distribution: str = "lognormal"  # fixed, uniform or lognormal
+    mean_ms: float = 300.0
+    sigma: float = 0.5  # lognormal shape (higher = heavier tail)
+    spread_ms: float = 100.0  # uniform: mean ± spread
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a latency in seconds."""
+        if self.distribution == "fixed":
+            ms = self.mean_ms
+        elif self.distribution == "uniform":
+            ms = rng.uniform(self.mean_ms - self.spread_ms, self.mean_ms + self.spread_ms)
+        else:
+            # Parameterised so the distribution's mean equals mean_ms
+            mu = math.log(max(self.mean_ms, 1e-3)) - self.sigma ** 2 / 2
+            ms = rng.lognormvariate(mu, self.sigma)
+        return max(ms, 0.0) / 1000.0
+
+
+@dataclass
+class StandinProfile:
+    """Behaviour of one fake backend."""
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    token_delay_ms: float = 5.0
+    trailing_tokens: int = 20  # Chatter after the JSON object (tests early stop)
+
+
+@dataclass
+class StandinStats:
+    """Per-backend request counters kept by the stand-in."""
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+        }
+
+
+_TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+_BATCH_PATTERN = re.compile(r"JSON array of (\d+) objects")
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text)
+
+
+def _prompt_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def _fake_result(seed: str) -> dict:
+    digest = int(hashlib.sha256(seed.encode("utf-8")).hexdigest()[:8], 16)
+    return {
+        "score": 50 + digest % 50,
+        "confidence": round(0.6 + (digest % 40) / 100, 2),
+        "feedback": "[STANDIN] Reasonable answer; add supporting detail.",
+        "reasoning": "Stand-in backend response",
+    }
+
+
+def fake_completion(prompt: str, trailing_tokens: int = 0) -> str:
+    """
+    Deterministic agent-style JSON answer for a prompt.
+
+    Multi-answer prompts ("... JSON array of N objects") get an array of N
+    results, like the micro-batched structure analysis expects.
+    """
+    batch = _BATCH_PATTERN.search(prompt)
+    if batch:
+        count = int(batch.group(1))
+        body = json.dumps([{"index": i, **_fake_result(f"{prompt}#{i}")} for i in range(1, count + 1)])
+    else:
+        body = json.dumps(_fake_result(prompt))
+    return body + " Hope this helps!" * trailing_tokens
+
+
+class StandinServer:
+    """Fake LLM backends served by one ASGI app."""
+
+    def __init__(self, profiles: Optional[dict[str, StandinProfile]] = None, seed: int = 0):
+        self.profiles = {name: StandinProfile() for name in BACKENDS}
+        self.profiles.update(profiles or {})
+        self.stats = {name: StandinStats() for name in BACKENDS}
+        self._rng = random.Random(seed)
+        self._seen_prefixes: dict[str, set[str]] = {name: set() for name in BACKENDS}
+        self._cached_contents: dict[str, str] = {}
+        self.app = self._build_app()
+
+    # ------------------------------------------------------------------
+    # Wiring
+    # ------------------------------------------------------------------
+
+    def attach(self, router) -> None:
+        """
+        Point a HybridRouter's backends at this stand-in (in-process).
+
+        Replaces the router's connection pool with one that uses an ASGI
+        transport and sets dummy API keys so cloud calls leave placeholder mode.
+        """
+        transport = httpx.ASGITransport(app=self.app)
+        configs = {name: PoolConfig(base_url=f"http://standin-{name}") for name in BACKENDS}
+        router.pool = ConnectionPool(configs=configs, transport=transport)
+        router.gemini_key = router.gemini_key or "standin"
+        router.claude_key = router.claude_key or "standin"
+        router.openai_key = router.openai_key or "standin"
+
+    def reset_stats(self) -> None:
+        self.stats = {name: StandinStats() for name in BACKENDS}
+
+    def _prefix_seen(self, backend: str, prefix: str) -> bool:
+        """Record a cacheable prefix; True if it was already cached."""
+        seen = prefix in self._seen_prefixes[backend]
+        self._seen_prefixes[backend].add(prefix)
+        return seen
+
+    # ------------------------------------------------------------------
+    # Behaviour
+    # ------------------------------------------------------------------
+
+    async def _begin(self, backend: str) -> Optional[JSONResponse]:
+        """Apply latency and fault injection; returns an error response or None."""
+        profile = self.profiles[backend]
+        stats = self.stats[backend]
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+
+        await asyncio.sleep(profile.latency.sample(self._rng))
+
+        roll = self._rng.random()
+        if roll < profile.rate_limit_rate:
+            stats.rate_limited += 1
+            stats.in_flight -= 1
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "1"})
+        if roll < profile.rate_limit_rate + profile.error_rate:
+            stats.errors += 1
+            stats.in_flight -= 1
+            return JSONResponse({"error": "injected failure"}, status_code=500)
+        return None
+
+    async def _complete(self, backend: str, prompt: str) -> str:
+        """Non-streaming completion: pay for every token, then answer."""
+        profile = self.profiles[backend]
+        text = fake_completion(prompt, profile.trailing_tokens)
+        try:
+            await asyncio.sleep(len(_tokenize(text)) * profile.token_delay_ms / 1000.0)
+        finally:
+            self.stats[backend].in_flight -= 1
+        return text
+
+    async def _tokens(self, backend: str, prompt: str) -> AsyncIterator[str]:
+        """Streamed completion: one token every ``token_delay_ms``."""
+        profile = self.profiles[backend]
+        try:
+            for token in _tokenize(fake_completion(prompt, profile.trailing_tokens)):
+                yield token
+                await asyncio.sleep(profile.token_delay_ms / 1000.0)
+        finally:
+            self.stats[backend].in_flight -= 1
+
+    # ------------------------------------------------------------------
+    # Protocols
+    # ------------------------------------------------------------------
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="SmartEvaluator-Omni LLM Stand-in")
+
+        @app.get("/api/tags")
+        async def ollama_tags():
+            return {"models": [{"name": "llama3:latest"}]}
+
+        @app.post("/api/generate")
+        async def ollama_generate(request: Request):
+            body = await request.json()
+            error = await self._begin("local")
+            if error is not None:
+                return error
+            prompt = body.get("prompt", "")
+            context = list(body.get("context") or [])
+            if (body.get("options") or {}).get("num_predict") == 0:
+                # Prompt evaluation only: hand back the context tokens
+                self.stats["local"].in_flight -= 1
+                context += list(range(_prompt_tokens(prompt)))
+                return {"model": body.get("model"), "response": "", "done": True, "context": context}
+            if not body.get("stream", True):
+                text = await self._complete("local", prompt)
+                return {
+                    "model": body.get("model"),
+                    "response": text,
+                    "done": True,
+                    "context": context + list(range(_prompt_tokens(prompt + text))),
+                    "prompt_eval_count": _prompt_tokens(prompt),
+                }
+
+            async def ndjson():
+                async for token in self._tokens("local", prompt):
+                    yield json.dumps({"response": token, "done": False}) + "\n"
+                yield json.dumps({"response": "", "done": True}) + "\n"
+
+            return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+        @app.get("/v1/models")
+        async def list_models():
+            return {"data": [{"id": "standin"}]}
+
+        @app.post("/v1/chat/completions")
+        async def openai_chat(request: Request):
+            body = await request.json()
+            error = await self._begin("openai")
+            if error is not None:
+                return error
+            messages = body.get("messages", [])
+            prompt = "\n".join(m.get("content", "") for m in messages)
+            system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+            # Automatic prefix caching applies to prompts of 1024+ tokens
+            cached = _prompt_tokens(system) if _prompt_tokens(system) >= 1024 and self._prefix_seen("openai", system) else 0
+            usage = {"prompt_tokens": _prompt_tokens(prompt), "prompt_tokens_details": {"cached_tokens": cached}}
+            if not body.get("stream"):
+                content = await self._complete("openai", prompt)
+                return {
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                    "usage": usage,
+                }
+
+            async def sse():
+                async for token in self._tokens("openai", prompt):
+                    chunk = {"choices": [{"index": 0, "delta": {"content": token}}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(sse(), media_type="text/event-stream")
+
+        @app.post("/v1/messages")
+        async def anthropic_messages(request: Request):
+            body = await request.json()
+            error = await self._begin("claude")
+            if error is not None:
+                return error
+            system = body.get("system", "")
+            usage = {"cache_read_input_tokens": 0, "cache_creation_input_tokens": 0}
+            if isinstance(system, list):
+                for block in system:
+                    if block.get("cache_control"):
+                        key = "cache_read_input_tokens" if self._prefix_seen("claude", block["text"]) \
+                            else "cache_creation_input_tokens"
+                        usage[key] += _prompt_tokens(block["text"])
+                system = "".join(block.get("text", "") for block in system)
+            prompt = system + json.dumps(body.get("messages", []))
+            content = await self._complete("claude", prompt)
+            return {"type": "message", "content": [{"type": "text", "text": content}], "usage": usage}
+
+        @app.get("/v1beta/models")
+        async def gemini_models():
+            return {"models": [{"name": "models/standin"}]}
+
+        @app.post("/v1beta/models/{model_action}")
+        async def gemini_generate(model_action: str, request: Request):
+            body = await request.json()
+            error = await self._begin("gemini")
+            if error is not None:
+                return error
+            usage = {"cachedContentTokenCount": 0}
+            if body.get("cachedContent"):
+                cached = self._cached_contents.get(body["cachedContent"])
+                if cached is None:
+                    self.stats["gemini"].in_flight -= 1
+                    return JSONResponse({"error": "cached content not found"}, status_code=404)
+                usage["cachedContentTokenCount"] = _prompt_tokens(cached)
+            prompt = json.dumps(body.get("contents", []))
+            content = await self._complete("gemini", prompt)
+            return {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": content}]}}],
+                "usageMetadata": usage,
+            }
+
+        @app.post("/v1beta/cachedContents")
+        async def gemini_cache(request: Request):
+            body = await request.json()
+            name = f"cachedContents/{len(self._cached_contents) + 1}"
+            parts = (body.get("systemInstruction") or {}).get("parts", [])
+            self._cached_contents[name] = "".join(part.get("text", "") for part in parts)
+            return {"name": name, "model": body.get("model")}
+
+        @app.get("/_standin/stats")
+        async def standin_stats():
+            return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+        return app
+
+
+def main() -> None:
+    """Serve the stand-in over TCP (requires uvicorn)."""
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake LLM backends for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--distribution", default="lognormal", choices=["fixed", "uniform", "lognormal"])
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--token-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    profile = StandinProfile(
+        latency=LatencyProfile(args.distribution, args.latency_ms, args.sigma),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        token_delay_ms=args.token_delay_ms,
+    )
+    server = StandinServer(profiles={name: profile for name in BACKENDS})
+    uvicorn.run(server.app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
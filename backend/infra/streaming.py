@@ -0,0 +1,114 @@
+"""
+Streaming Helpers - Incremental JSON Parsing & TTFT Metrics
+===========================================================
+
+Agents only need the small JSON object described in
+``BaseAgent._build_system_prompt``. When responses are streamed, the
+scanner below tracks the object as tokens arrive so the router can stop
+generation as soon as the closing brace is seen, and so agents can surface
+fields (e.g. ``score``) before the object is complete.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import json
+import re
+from typing import Optional
+
+from backend.infra.metrics import RollingWindow
+
+
+# Top-level "key": <number | string | bool> pairs whose value is complete
+_FIELD_PATTERN = re.compile(
+    r'"(?P<key>[A-Za-z_][A-Za-z0-9_]*)"\s*:\s*'
+    r'(?P<value>"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?=[\s,}])|true|false|null)'
+)
+
+
+class JsonObjectScanner:
+    """
+    Incremental scanner for the first top-level JSON object in a text stream.
+
+    String literals and escapes are tracked so braces inside feedback text do
+    not confuse the depth count. Text before the opening brace (e.g. a model's
+    preamble or a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self._chars: list[str] = []
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self.complete = False
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; returns True once the object is complete."""
+        for char in chunk:
+            if self.complete:
+                break
+            if not self._started:
+                if char != "{":
+                    continue
+                self._started = True
+            self._chars.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+        return self.complete
+
+    @property
+    def text(self) -> str:
+        """The object text seen so far."""
+        return "".join(self._chars)
+
+    def result(self) -> Optional[dict]:
+        """Parsed object once complete, otherwise None."""
+        if not self.complete:
+            return None
+        try:
+            return json.loads(self.text)
+        except json.JSONDecodeError:
+            return None
+
+    def partial(self) -> dict:
+        """Fields whose values have fully arrived (best effort, top level)."""
+        fields = {}
+        for match in _FIELD_PATTERN.finditer(self.text):
+            try:
+                fields[match.group("key")] = json.loads(match.group("value"))
+            except json.JSONDecodeError:
+                continue
+        return fields
+
+
+class StreamStats:
+    """Per-backend streaming counters and time-to-first-token window."""
+
+    def __init__(self):
+        self.streams = 0
+        self.early_terminations = 0
+        self.chunks = 0
+        self.ttft = RollingWindow()
+
+    def get_stats(self) -> dict:
+        return {
+            "streams": self.streams,
+            "early_terminations": self.early_terminations,
+            "chunks": self.chunks,
+            "ttft_ms": self.ttft.summary(scale=1000.0),
+        }
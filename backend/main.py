@@ -10,14 +10,27 @@ import asyncio
 from contextlib import asynccontextmanager
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
 from backend.swarm.orchestrator import SwarmCouncil
-from backend.digital_twin.personality_loader import load_teacher_persona
+from backend.swarm.batch import BatchEngine
+from backend.digital_twin.personality_loader import (
+    find_similar_teachers,
+    get_persona_cache,
+    get_feedback_index,
+    get_persona_store,
+    invalidate_teacher_persona,
+    load_teacher_persona,
+    record_teacher_feedback,
+    save_persona_store,
+)
+from backend.digital_twin.persona_cache import active_teacher_ids
+from backend.digital_twin.consensus_engine import get_consensus_engine
 from backend.digital_twin.decision_maker import synthesize_grade
 from backend.infra.router import HybridRouter
+from backend.infra.scheduler import Priority
 
 
 # =============================================================================
@@ -33,11 +46,20 @@ async def lifespan(app: FastAPI):
     # Startup: Initialize components
     print("🚀 Initializing SmartEvaluator-Omni...")
     
-    app.state.swarm_council = SwarmCouncil()
+    # One router (and one set of pooled HTTP clients) shared by every agent
     app.state.hybrid_router = HybridRouter()
-    
-    # Pre-warm local LLM if available
-    await app.state.hybrid_router.health_check()
+    # Opens connection pools and takes the first health snapshot (warming
+    # the local LLM probe), then keeps probing in the background
+    await app.state.hybrid_router.startup()
+    app.state.swarm_council = SwarmCouncil(router=app.state.hybrid_router)
+    app.state.batch_engine = BatchEngine(app.state.swarm_council)
+    # Compile the consensus matrix now rather than on the first grade
+    get_consensus_engine()
+    # Preload the personas of the teachers expected to grade today
+    teacher_ids = active_teacher_ids()
+    if teacher_ids:
+        loaded = await get_persona_cache().warm_up(teacher_ids)
+        print(f"👩‍🏫 Preloaded {loaded}/{len(teacher_ids)} teacher personas")
     
     print("✅ SmartEvaluator-Omni is ready!")
     
@@ -45,6 +67,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown: Cleanup
     print("👋 Shutting down SmartEvaluator-Omni...")
+    await app.state.batch_engine.shutdown()
+    await app.state.hybrid_router.aclose()
+    save_persona_store()
 
 
 # =============================================================================
@@ -80,6 +105,13 @@ class EvaluationRequest(BaseModel):
     pdf_context: Optional[str] = Field(None, description="Reference PDF content for fact-checking")
     teacher_id: str = Field(..., description="Teacher ID for Digital Twin persona loading")
     grading_mode: Optional[str] = Field("balanced", description="Grading mode: strict, balanced, creative")
+    question_id: Optional[str] = Field(None, description="Question ID; enables cross-submission plagiarism checks")
+    student_id: Optional[str] = Field(None, description="Student ID, used as the submission ID in those checks")
+
+
+class TeacherFeedbackRequest(BaseModel):
+    """Feedback a teacher wrote, edited or approved for a graded answer."""
+    feedback: str = Field(..., min_length=1, description="Final feedback text as signed off by the teacher")
 
 
 class AgentVote(BaseModel):
@@ -108,6 +140,7 @@ class HealthResponse(BaseModel):
     version: str
     swarm_status: dict
     local_llm_available: bool
+    backends: dict = Field(default_factory=dict, description="Per-backend probe status and latency")
 
 
 # =============================================================================
@@ -130,6 +163,7 @@ async def health_check():
     """
     Health check endpoint.
     Returns status of all swarm agents and infrastructure.
+    Reads the router's background health snapshot (no network I/O).
     """
     swarm_council: SwarmCouncil = app.state.swarm_council
     hybrid_router: HybridRouter = app.state.hybrid_router
@@ -139,6 +173,7 @@ async def health_check():
         version="1.0.0",
         swarm_status=await swarm_council.get_agent_status(),
         local_llm_available=await hybrid_router.is_local_available(),
+        backends=await hybrid_router.health_snapshot(),
     )
 
 
@@ -154,12 +189,23 @@ async def evaluate_answer(request: EvaluationRequest):
     4. Returns the final grade with personalized feedback
     """
     swarm_council: SwarmCouncil = app.state.swarm_council
+    hybrid_router: HybridRouter = app.state.hybrid_router
+    
+    # Admission control: shed load when a queue the agents use is nearly full
+    if hybrid_router.scheduler.should_shed(Priority.INTERACTIVE, swarm_council.backends):
+        raise HTTPException(
+            status_code=503,
+            detail="Evaluation queue is full, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
     
     try:
         # Step 1: Gather votes from all 4 agents (async parallel execution)
         council_votes = await swarm_council.gather_council_votes(
             student_answer=request.student_answer,
             pdf_context=request.pdf_context,
+            question_id=request.question_id,
+            submission_id=request.student_id,
         )
         
         # Step 2: Load teacher's Digital Twin persona
@@ -179,22 +225,50 @@ async def evaluate_answer(request: EvaluationRequest):
 
 
 @app.post("/api/evaluate/batch", tags=["Evaluation"])
-async def evaluate_batch(
-    requests: list[EvaluationRequest],
-    background_tasks: BackgroundTasks,
-):
+async def evaluate_batch(requests: list[EvaluationRequest]):
     """
     Batch evaluation endpoint for processing multiple answers.
-    Uses background tasks for long-running batch operations.
+    Starts a background job and returns its ID; poll the progress and
+    results endpoints below.
     """
-    # TODO: Implement batch processing with progress tracking
+    batch_engine: BatchEngine = app.state.batch_engine
+    job = batch_engine.submit([request.model_dump() for request in requests])
     return {
         "message": "Batch evaluation started",
-        "total_items": len(requests),
-        "status": "processing",
+        "job_id": job.job_id,
+        "total_items": job.total_items,
+        "status": job.status.value,
     }
 
 
+@app.get("/api/evaluate/batch/{job_id}", tags=["Evaluation"])
+async def get_batch_progress(job_id: str):
+    """Progress of a batch job: completed/failed counts, throughput and ETA."""
+    return _get_batch_job(job_id).progress()
+
+
+@app.get("/api/evaluate/batch/{job_id}/results", tags=["Evaluation"])
+async def get_batch_results(job_id: str, offset: int = 0, limit: int = 100):
+    """Results finished so far (available while the job is still running)."""
+    return _get_batch_job(job_id).partial_results(offset=offset, limit=limit)
+
+
+@app.delete("/api/evaluate/batch/{job_id}", tags=["Evaluation"])
+async def cancel_batch(job_id: str):
+    """Cancel a batch job. Results finished before cancellation are kept."""
+    _get_batch_job(job_id)
+    batch_engine: BatchEngine = app.state.batch_engine
+    job = await batch_engine.cancel(job_id)
+    return job.progress()
+
+
+def _get_batch_job(job_id: str):
+    job = app.state.batch_engine.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job not found: {job_id}")
+    return job
+
+
 @app.get("/api/teachers/{teacher_id}/persona", tags=["Digital Twin"])
 async def get_teacher_persona(teacher_id: str):
     """
@@ -202,7 +276,45 @@ async def get_teacher_persona(teacher_id: str):
     Returns the personality vectors and style preferences.
     """
     persona = await load_teacher_persona(teacher_id)
-    return persona
+    return persona.to_dict()
+
+
+@app.post("/api/teachers/{teacher_id}/persona/refresh", tags=["Digital Twin"])
+async def refresh_teacher_persona(teacher_id: str):
+    """
+    Reload a teacher's persona after it was updated.
+    Drops the cached copy and returns the freshly loaded persona.
+    """
+    invalidate_teacher_persona(teacher_id)
+    persona = await load_teacher_persona(teacher_id)
+    return persona.to_dict()
+
+
+@app.post("/api/teachers/{teacher_id}/feedback", tags=["Digital Twin"])
+async def approve_teacher_feedback(teacher_id: str, request: TeacherFeedbackRequest):
+    """
+    Record feedback the teacher approved or edited.
+    Only approved feedback becomes a few-shot example for future grading;
+    generated feedback is never recorded on its own.
+    """
+    try:
+        added = await record_teacher_feedback(teacher_id, request.feedback)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Could not record feedback: {str(e)}")
+    return {"teacher_id": teacher_id, "recorded": bool(added)}
+
+
+@app.get("/api/teachers/{teacher_id}/similar", tags=["Digital Twin"])
+async def get_similar_teachers(teacher_id: str, k: int = 5, same_subject: bool = False):
+    """
+    Find the teachers with the most similar grading style.
+    Compares style vectors against every persona in the store.
+    """
+    matches = await find_similar_teachers(teacher_id, k=k, same_subject=same_subject)
+    return {
+        "teacher_id": teacher_id,
+        "similar": [{"teacher_id": t, "similarity": round(s, 4)} for t, s in matches],
+    }
 
 
 @app.get("/api/swarm/status", tags=["Swarm"])
@@ -215,6 +327,29 @@ async def get_swarm_status():
     return await swarm_council.get_agent_status()
 
 
+@app.get("/api/infra/stats", tags=["Infrastructure"])
+async def get_infra_stats():
+    """
+    Get Hybrid Router runtime statistics.
+    Covers the router (pool, caches, queues) and batch jobs.
+    Also reports retrieval, plagiarism, embedding, persona, feedback
+    and consensus stats.
+    """
+    hybrid_router: HybridRouter = app.state.hybrid_router
+    stats = hybrid_router.get_stats()
+    stats["batch"] = app.state.batch_engine.get_stats()
+    stats["local_batching"] = app.state.swarm_council.structure_agent.batcher.get_stats()
+    stats["retrieval"] = app.state.swarm_council.retriever.get_stats()
+    stats["plagiarism"] = app.state.swarm_council.security_agent.peer_index.get_stats()
+    stats["phrases"] = app.state.swarm_council.security_agent.phrases.get_stats()
+    stats["embeddings"] = app.state.swarm_council.security_agent.embeddings.get_stats()
+    stats["personas"] = get_persona_cache().get_stats()
+    stats["persona_store"] = get_persona_store().get_stats()
+    stats["feedback_index"] = get_feedback_index().get_stats()
+    stats["consensus"] = get_consensus_engine().get_stats()
+    return stats
+
+
 # =============================================================================
 # Run with Uvicorn (Development)
 # =============================================================================
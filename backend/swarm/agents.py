@@ -10,12 +10,23 @@ Branch: feat/kaustuv-swarm
 """
 
 import asyncio
+import json
+import os
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 
+from backend.infra.microbatch import MicroBatcher
 from backend.infra.router import HybridRouter
+from backend.swarm.phrases import PhraseLibrary
+from backend.vectors.indexes import VectorIndex
+from backend.vectors.minhash import MinHashIndex, PeerMatch
+from backend.vectors.service import EmbeddingService, get_embedding_service
+
+
+# Receives (agent_name, fields parsed so far) while a response streams in
+PartialCallback = Callable[[str, dict], None]
 
 
 # =============================================================================
@@ -55,13 +66,61 @@ class BaseAgent(ABC):
         self,
         student_answer: str,
         pdf_context: Optional[str] = None,
+        on_partial: Optional[PartialCallback] = None,
     ) -> AgentVote:
         """Evaluate the student answer and return a vote."""
         pass
     
-    def _build_system_prompt(self) -> str:
-        """Build the system prompt for the agent."""
-        return f"""You are an expert {self.role} agent in an AI-powered examination grading system.
+    async def _request(
+        self,
+        prompt: str,
+        preferred_model: str,
+        on_partial: Optional[PartialCallback] = None,
+        reference: Optional[str] = None,
+        per_answer_reference: bool = False,
+    ) -> str:
+        """
+        Send the evaluation prompt through the router.
+        
+        Streams the response (stopping generation once the score object is
+        complete) when the router has streaming enabled or the caller wants
+        partial results; otherwise makes a plain call. Both paths share the
+        router's response cache and single-flight.
+        
+        A whole reference document goes into the system prompt, so the large
+        part of the request is an identical prefix for every student and
+        the router can have backends reuse it instead of re-reading it.
+        Chunks retrieved for this answer (``per_answer_reference``) differ
+        per student, so they go into the user prompt instead: a unique
+        system prompt would create a prefix-cache entry that is never reused.
+        """
+        if reference and per_answer_reference:
+            prompt = f"""REFERENCE MATERIAL (excerpts relevant to this answer):
+{reference}
+---
+
+{prompt}"""
+            reference = None
+        system_prompt = self._build_system_prompt(reference)
+        if on_partial is not None or self.router.streaming_enabled:
+            callback = None
+            if on_partial is not None:
+                callback = lambda fields: on_partial(self.name, fields)
+            return await self.router.stream_json(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                preferred_model=preferred_model,
+                on_partial=callback,
+            )
+        return await self.router.route_request(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            preferred_model=preferred_model,
+        )
+    
+    def _build_system_prompt(self, reference: Optional[str] = None) -> str:
+        """Build the system prompt for the agent (optionally with the exam's reference material)."""
+        system_prompt = f"""You are an expert {self.role} agent in an AI-powered examination grading system.
 
 Your task is to evaluate student answers based on your specialty area.
 Be fair, objective, and provide constructive feedback.
@@ -73,6 +132,13 @@ Respond in the following JSON format:
     "feedback": "<constructive feedback for the student>",
     "reasoning": "<your internal reasoning process>"
 }}"""
+        if reference:
+            system_prompt += f"""
+
+REFERENCE MATERIAL (PDF Context):
+{reference}
+---"""
+        return system_prompt
 
 
 # =============================================================================
@@ -101,11 +167,15 @@ class FactCheckerAgent(BaseAgent):
         self,
         student_answer: str,
         pdf_context: Optional[str] = None,
+        on_partial: Optional[PartialCallback] = None,
+        per_answer_context: bool = False,
     ) -> AgentVote:
         """
         Evaluate the factual accuracy of the student's answer.
         
-        # TODO Kaustuv: Add chunk-based fact verification for long PDF contexts.
+        For long PDFs, ``pdf_context`` is already reduced to the chunks most
+        relevant to this answer (see ``SwarmCouncil.retriever``) and
+        ``per_answer_context`` is set.
         """
         start_time = asyncio.get_event_loop().time()
         
@@ -113,10 +183,8 @@ class FactCheckerAgent(BaseAgent):
         
         try:
             # Route to Gemini for fact checking
-            response = await self.router.route_request(
-                prompt=prompt,
-                system_prompt=self._build_system_prompt(),
-                preferred_model="gemini",
+            response = await self._request(
+                prompt, "gemini", on_partial, reference=pdf_context, per_answer_reference=per_answer_context
             )
             
             end_time = asyncio.get_event_loop().time()
@@ -151,18 +219,14 @@ class FactCheckerAgent(BaseAgent):
         student_answer: str,
         pdf_context: Optional[str],
     ) -> str:
-        """Build the evaluation prompt for fact checking."""
-        context_section = ""
-        if pdf_context:
-            context_section = f"""
-REFERENCE MATERIAL (PDF Context):
-{pdf_context}
----"""
+        """
+        Build the evaluation prompt for fact checking.
         
+        The reference material is added by ``BaseAgent._request`` (system
+        prompt for a whole document, user prompt for retrieved excerpts).
+        """
         return f"""You are a strict fact-checker. Evaluate whether the student's answer is factually correct.
 
-{context_section}
-
 STUDENT'S ANSWER:
 {student_answer}
 
@@ -204,6 +268,10 @@ class StructureAgent(BaseAgent):
     Runs on local Ollama for privacy and cost efficiency.
     Falls back to cloud if local is unavailable.
     
+    Concurrent evaluations are micro-batched: answers arriving within
+    LOCAL_BATCH_WINDOW_MS are graded by one multi-answer prompt, which the
+    local model processes far more efficiently than one prompt per answer.
+    
     # TODO Kaustuv: Add grammar-specific rules for different subjects.
     """
     
@@ -212,11 +280,19 @@ class StructureAgent(BaseAgent):
         self.name = "StructureAnalyzer"
         self.role = "Structure & Grammar Analysis"
         self.model_preference = "local"
+        self.batching_enabled = os.getenv("LOCAL_BATCH_ENABLED", "true").lower() == "true"
+        self.batcher = MicroBatcher(
+            self._evaluate_batch,
+            max_batch_size=int(os.getenv("LOCAL_BATCH_MAX_SIZE", "8")),
+            max_wait=float(os.getenv("LOCAL_BATCH_WINDOW_MS", "20")) / 1000,
+        )
+        self.batch_fallbacks = 0
     
     async def evaluate(
         self,
         student_answer: str,
         pdf_context: Optional[str] = None,
+        on_partial: Optional[PartialCallback] = None,
     ) -> AgentVote:
         """
         Evaluate the structure and grammar of the student's answer.
@@ -228,12 +304,12 @@ class StructureAgent(BaseAgent):
         prompt = self._build_evaluation_prompt(student_answer)
         
         try:
-            # Route to local Llama 3 (with cloud fallback)
-            response = await self.router.route_request(
-                prompt=prompt,
-                system_prompt=self._build_system_prompt(),
-                preferred_model="local",
-            )
+            # Route to local Llama 3 (with cloud fallback); streamed requests
+            # bypass the batcher so partial scores still arrive early
+            if self.batching_enabled and on_partial is None and not self.router.streaming_enabled:
+                response = await self.batcher.submit(student_answer)
+            else:
+                response = await self._request(prompt, "local", on_partial)
             
             end_time = asyncio.get_event_loop().time()
             latency = (end_time - start_time) * 1000
@@ -279,6 +355,87 @@ Evaluate:
 
 Provide your evaluation in JSON format with score (0-100), confidence (0-1), feedback, and reasoning."""
     
+    async def _evaluate_batch(self, answers: list[str]) -> list:
+        """
+        Grade several answers with one multi-answer prompt.
+        
+        Returns one raw JSON response per answer. If the batched response
+        cannot be split (malformed JSON, wrong length, backend error), each
+        answer is re-sent on its own.
+        """
+        if len(answers) == 1:
+            return await self._evaluate_each(answers)
+        try:
+            response = await self.router.route_request(
+                prompt=self._build_batch_prompt(answers),
+                system_prompt=self._build_batch_system_prompt(len(answers)),
+                preferred_model="local",
+            )
+            return self._split_batch_response(response, len(answers))
+        except Exception:
+            self.batch_fallbacks += 1
+            return await self._evaluate_each(answers)
+    
+    async def _evaluate_each(self, answers: list[str]) -> list:
+        return await asyncio.gather(
+            *(self._request(self._build_evaluation_prompt(answer), "local") for answer in answers),
+            return_exceptions=True,
+        )
+    
+    def _build_batch_system_prompt(self, count: int) -> str:
+        """System prompt asking for one result object per answer."""
+        return f"""You are an expert {self.role} agent in an AI-powered examination grading system.
+
+Your task is to evaluate {count} independent student answers based on your specialty area.
+Be fair, objective, and provide constructive feedback. Grade each answer on its own.
+
+Respond with a JSON array of {count} objects, one per answer, in the same order:
+[
+    {{
+        "index": <answer number>,
+        "score": <0-100>,
+        "confidence": <0.0-1.0>,
+        "feedback": "<constructive feedback for the student>",
+        "reasoning": "<your internal reasoning process>"
+    }}
+]"""
+    
+    def _build_batch_prompt(self, answers: list[str]) -> str:
+        """Build one structure-analysis prompt covering several answers."""
+        sections = "\n\n".join(
+            f"STUDENT ANSWER {i}:\n{answer}" for i, answer in enumerate(answers, start=1)
+        )
+        return f"""You are an expert in academic writing and grammar.
+Evaluate the structure and grammar of each of these {len(answers)} student answers.
+
+{sections}
+
+TASK: For each answer, is it well-structured and grammatically sound?
+
+Evaluate:
+1. Is the answer logically organized with clear flow?
+2. Are paragraphs well-formed with topic sentences?
+3. Is the grammar correct (subject-verb agreement, tense consistency)?
+4. Is the spelling and punctuation accurate?
+5. Is the vocabulary appropriate for the academic context?
+
+Respond with a JSON array of {len(answers)} objects with index, score (0-100), confidence (0-1), feedback, and reasoning."""
+    
+    @staticmethod
+    def _split_batch_response(response: str, count: int) -> list[str]:
+        """Split a JSON-array response into per-answer JSON strings."""
+        start, end = response.find("["), response.rfind("]")
+        if start == -1 or end < start:
+            raise ValueError("No JSON array in batched response")
+        results = json.loads(response[start:end + 1])
+        if not isinstance(results, list) or len(results) != count:
+            raise ValueError(f"Expected {count} results in batched response")
+        if not all(isinstance(r, dict) for r in results):
+            raise ValueError("Batched response items must be objects")
+        if all(isinstance(r.get("index"), int) for r in results):
+            results = sorted(results, key=lambda r: r["index"])
+        return [json.dumps(r) for r in results]
+    
     def _parse_response(self, response: str) -> dict:
         """Parse the LLM response."""
         import json
@@ -319,10 +476,15 @@ class CriticalAgent(BaseAgent):
         self,
         student_answer: str,
         pdf_context: Optional[str] = None,
+        on_partial: Optional[PartialCallback] = None,
+        per_answer_context: bool = False,
     ) -> AgentVote:
         """
         Evaluate whether the student is bluffing or hallucinating.
         
+        ``per_answer_context`` marks ``pdf_context`` as excerpts retrieved
+        for this answer rather than the whole document.
+        
         # TODO Kaustuv: Add detection for common bluffing patterns.
         """
         start_time = asyncio.get_event_loop().time()
@@ -331,10 +493,8 @@ class CriticalAgent(BaseAgent):
         
         try:
             # Route to Claude or Mistral
-            response = await self.router.route_request(
-                prompt=prompt,
-                system_prompt=self._build_system_prompt(),
-                preferred_model="claude",
+            response = await self._request(
+                prompt, "claude", on_partial, reference=pdf_context, per_answer_reference=per_answer_context
             )
             
             end_time = asyncio.get_event_loop().time()
@@ -367,18 +527,14 @@ class CriticalAgent(BaseAgent):
         student_answer: str,
         pdf_context: Optional[str],
     ) -> str:
-        """Build the evaluation prompt for bluff detection."""
-        context_section = ""
-        if pdf_context:
-            context_section = f"""
-REFERENCE MATERIAL:
-{pdf_context}
----"""
+        """
+        Build the evaluation prompt for bluff detection.
         
+        The reference material is added by ``BaseAgent._request`` (system
+        prompt for a whole document, user prompt for retrieved excerpts).
+        """
         return f"""You are an expert at detecting academic dishonesty and bluffing in student answers.
 
-{context_section}
-
 STUDENT'S ANSWER:
 {student_answer}
 
@@ -434,34 +590,76 @@ class SecurityAgent(BaseAgent):
         self.name = "SecurityGuard"
         self.role = "AI/Plagiarism Detection"
         self.model_preference = "bert"
+        # Known-source corpus for the semantic plagiarism check; loaded from
+        # PLAGIARISM_SOURCE_INDEX (a saved VectorIndex) or filled via
+        # add_known_sources()
+        self.embeddings: EmbeddingService = get_embedding_service()
+        self.source_index = VectorIndex(dim=self.embeddings.dim)
+        source_path = os.getenv("PLAGIARISM_SOURCE_INDEX", "")
+        if source_path and os.path.exists(os.path.join(source_path, "meta.json")):
+            self.source_index = VectorIndex.load(source_path)
+        self.similarity_floor = float(os.getenv("PLAGIARISM_SIMILARITY_FLOOR", "0.5"))
+        # Near-duplicates among earlier submissions to the same question
+        self.peer_index = MinHashIndex.from_env()
+        # LLM-typical phrases (config/suspicious_phrases.json, hot-reloaded)
+        self.phrases = PhraseLibrary.from_env()
+
+    def add_known_sources(self, texts: list[str], source_ids: Optional[list[str]] = None) -> None:
+        """Index known source texts (web pages, textbooks, past papers)."""
+        self.source_index.add(self.embeddings.embedder.embed(texts), keys=source_ids)
     
     async def evaluate(
         self,
         student_answer: str,
         pdf_context: Optional[str] = None,
+        on_partial: Optional[PartialCallback] = None,
+        question_id: Optional[str] = None,
+        submission_id: Optional[str] = None,
     ) -> AgentVote:
         """
         Evaluate whether the answer is AI-generated or plagiarized.
         
+        Args:
+            question_id: Enables the cross-submission check against earlier
+                answers to the same question
+            submission_id: Identifies this answer in that index (e.g. the
+                student ID, so a resubmission never matches itself)
+        
         # TODO Kaustuv: Implement BERT-based detection with confidence scoring.
-        # TODO Kaustuv: Add database of known AI-generated patterns.
         """
         start_time = asyncio.get_event_loop().time()
         
         try:
             # Perform AI detection
-            ai_score = await self._detect_ai_generated(student_answer)
+            ai_score, detection = await self._detect_ai_generated(student_answer)
             
             # Perform plagiarism check
             plagiarism_score = await self._check_plagiarism(student_answer)
             
+            # Compare with earlier submissions to the same question
+            peer_matches = await self._check_peer_submissions(student_answer, question_id, submission_id)
+            if peer_matches:
+                plagiarism_score = max(plagiarism_score, round(peer_matches[0].jaccard * 100.0, 1))
+            
             end_time = asyncio.get_event_loop().time()
             latency = (end_time - start_time) * 1000
             
             # Combined security score (100 = safe, 0 = flagged)
             combined_score = 100.0 - max(ai_score, plagiarism_score)
             
-            feedback = self._generate_feedback(ai_score, plagiarism_score)
+            feedback = self._generate_feedback(ai_score, plagiarism_score, peer_matches)
+            reasoning = (
+                f"AI detection: {ai_score}% (perplexity {detection['perplexity']}, "
+                f"burstiness {detection['burstiness']}), Plagiarism: {plagiarism_score}%"
+            )
+            if detection["phrase_counts"]:
+                reasoning += ", Phrases: " + ", ".join(
+                    f"{category} x{count}" for category, count in sorted(detection["phrase_counts"].items())
+                )
+            if peer_matches:
+                reasoning += ", Peer matches: " + ", ".join(
+                    f"{m.submission_id} (Jaccard {m.jaccard:.2f})" for m in peer_matches[:5]
+                )
             
             return AgentVote(
                 agent_name=self.name,
@@ -469,7 +667,7 @@ class SecurityAgent(BaseAgent):
                 score=combined_score,
                 confidence=0.85,  # TODO: Calculate actual confidence
                 feedback=feedback,
-                reasoning=f"AI detection: {ai_score}%, Plagiarism: {plagiarism_score}%",
+                reasoning=reasoning,
                 latency_ms=latency,
             )
             
@@ -483,33 +681,23 @@ class SecurityAgent(BaseAgent):
                 reasoning="Error during security analysis",
             )
     
-    async def _detect_ai_generated(self, text: str) -> float:
+    async def _detect_ai_generated(self, text: str) -> tuple[float, dict]:
         """
-        Detect AI-generated content using statistical analysis.
-        
-        Returns a score from 0-100 indicating likelihood of AI generation.
+        Detect AI-generated content with the local detector (perplexity and
+        burstiness, see backend/infra/inference.py) and known LLM phrases.
         
-        # TODO Kaustuv: Implement actual BERT-based AI detection.
-        # TODO Kaustuv: Use perplexity and burstiness metrics.
+        Returns:
+            (score from 0-100 indicating likelihood of AI generation,
+            detector output)
         """
-        # Placeholder implementation
-        # TODO: Implement actual BERT-based detection
+        detection = await self.router.inference.score(text)
         
-        # Simple heuristics for now
-        suspicious_patterns = [
-            "as a large language model",
-            "i cannot provide",
-            "it's worth noting",
-            "in conclusion,",
-            "furthermore,",
-        ]
+        # Boilerplate phrases are strong evidence on their own
+        phrase_matches = self.phrases.find(text)
+        detection = {**detection, "phrase_counts": phrase_matches.counts}
         
-        text_lower = text.lower()
-        pattern_count = sum(1 for p in suspicious_patterns if p in text_lower)
-        
-        # Basic scoring (placeholder)
-        base_score = pattern_count * 15.0
-        return min(base_score, 100.0)
+        pattern_score = self.phrases.score(phrase_matches)
+        return max(pattern_score, round(detection["ai_likelihood"] * 100.0, 1)), detection
     
     async def _check_plagiarism(self, text: str) -> float:
         """
@@ -517,15 +705,46 @@ class SecurityAgent(BaseAgent):
         
         Returns a score from 0-100 indicating likelihood of plagiarism.
         
+        Scores the closest known source by cosine similarity: anything below
+        ``similarity_floor`` is treated as topical overlap (0), and the rest
+        is scaled linearly up to 100 for a verbatim copy.
+        
         # TODO Kaustuv: Integrate with plagiarism databases.
-        # TODO Kaustuv: Use semantic similarity with known sources.
         """
-        # Placeholder implementation
-        # TODO: Implement actual plagiarism detection
+        if not len(self.source_index):
+            return 0.0  # Default to no plagiarism detected
         
-        return 0.0  # Default to no plagiarism detected
+        scores, _ = self.source_index.search(await self.embeddings.embed(text), k=1)
+        similarity = float(scores[0, 0])
+        if similarity <= self.similarity_floor:
+            return 0.0
+        return round(min(1.0, (similarity - self.similarity_floor) / (1.0 - self.similarity_floor)) * 100.0, 1)
     
-    def _generate_feedback(self, ai_score: float, plagiarism_score: float) -> str:
+    async def _check_peer_submissions(
+        self,
+        text: str,
+        question_id: Optional[str],
+        submission_id: Optional[str],
+    ) -> list[PeerMatch]:
+        """
+        Match the answer against earlier submissions to the same question
+        (MinHash/LSH, see backend/vectors/minhash.py) and index it. Answers
+        without a submission ID are checked but not indexed.
+        
+        Returns:
+            Near-duplicate peers, most similar first
+        """
+        if not question_id:
+            return []
+        # Shingling and the index's file append stay off the event loop
+        return await asyncio.to_thread(self.peer_index.check_and_add, question_id, submission_id, text)
+    
+    def _generate_feedback(
+        self,
+        ai_score: float,
+        plagiarism_score: float,
+        peer_matches: Optional[list[PeerMatch]] = None,
+    ) -> str:
         """Generate human-readable feedback based on detection scores."""
         messages = []
         
@@ -543,4 +762,7 @@ class SecurityAgent(BaseAgent):
         else:
             messages.append("✅ No significant plagiarism detected.")
         
+        if peer_matches:
+            messages.append(f"🚨 Near-duplicate of {len(peer_matches)} earlier submission(s) to this question.")
+        
         return " ".join(messages)
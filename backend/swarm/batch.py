@@ -0,0 +1,274 @@
+"""
+Batch Engine - Background Evaluation of Whole Exam Sittings
+===========================================================
+
+Runs ``SwarmCouncil.gather_council_votes`` + ``synthesize_grade`` over many
+answers with a bounded worker pool. Each job has an ID, progress/ETA,
+partial results (available while the job runs) and can be cancelled.
+
+Batch work runs at ``Priority.BATCH``: the router's scheduler serves
+interactive requests first, enforces every backend's rate limit, and the
+workers pause while any lane the council queues on is shedding batch
+traffic. The pool size defaults to the largest per-backend concurrency
+limit (every item calls each backend once), so the busiest lane stays full
+without piling up queues.
+
+Assigned to: Kaustuv (AI Swarm Engineer)
+Branch: feat/kaustuv-swarm
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Optional
+
+from backend.digital_twin.decision_maker import synthesize_grade
+from backend.digital_twin.personality_loader import load_teacher_persona
+from backend.infra.scheduler import REQUEST_PRIORITY, Priority, RequestScheduler
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a batch job."""
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+@dataclass
+class BatchJob:
+    """State of one batch evaluation job."""
+    job_id: str
+    items: list[dict]
+    concurrency: int
+    status: JobStatus = JobStatus.PROCESSING
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    results: dict[int, dict] = field(default_factory=dict)
+    errors: dict[int, str] = field(default_factory=dict)
+    # Router-wide prefix-cache savings while the job ran (approximate if
+    # other traffic runs concurrently)
+    prefix_tokens_saved: int = 0
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def total_items(self) -> int:
+        return len(self.items)
+
+    @property
+    def done_items(self) -> int:
+        return len(self.results) + len(self.errors)
+
+    @property
+    def finished(self) -> bool:
+        return self.status != JobStatus.PROCESSING
+
+    def eta_seconds(self) -> Optional[float]:
+        """Remaining time at the observed completion rate (None until measurable)."""
+        if self.finished:
+            return 0.0
+        if not self.done_items:
+            return None
+        elapsed = time.time() - self.created_at
+        return round(elapsed / self.done_items * (self.total_items - self.done_items), 1)
+
+    def progress(self) -> dict:
+        elapsed = (self.finished_at or time.time()) - self.created_at
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "total_items": self.total_items,
+            "completed": len(self.results),
+            "failed": len(self.errors),
+            "percent": round(100 * self.done_items / self.total_items, 1) if self.total_items else 100.0,
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": self.eta_seconds(),
+            "items_per_second": round(self.done_items / elapsed, 2) if elapsed > 0 else 0.0,
+            "concurrency": self.concurrency,
+            "prefix_tokens_saved": self.prefix_tokens_saved,
+        }
+
+    def partial_results(self, offset: int = 0, limit: int = 100) -> dict:
+        """Results finished so far, in item order."""
+        indexes = sorted(set(self.results) | set(self.errors))[offset:offset + limit]
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "offset": offset,
+            "results": [
+                {"index": i, "result": self.results[i]} if i in self.results
+                else {"index": i, "error": self.errors[i]}
+                for i in indexes
+            ],
+        }
+
+
+class BatchEngine:
+    """
+    Owns batch jobs and their worker pools.
+
+    ``submit()`` starts a job in the background and returns immediately;
+    finished jobs are kept (up to ``max_jobs``) so results can be fetched.
+    """
+
+    def __init__(
+        self,
+        council,
+        concurrency: Optional[int] = None,
+        max_jobs: int = 100,
+        shed_backoff: float = 0.5,
+    ):
+        """
+        Args:
+            council: SwarmCouncil (or MockSwarmCouncil) used for every item
+            concurrency: Workers per job (defaults to ``BATCH_CONCURRENCY`` or
+                the router scheduler's capacity)
+            max_jobs: Finished jobs retained for result retrieval
+            shed_backoff: Seconds a worker waits while batch traffic is shed
+        """
+        self.council = council
+        self.concurrency = concurrency or int(os.getenv("BATCH_CONCURRENCY", "0")) or self._auto_concurrency()
+        self.max_jobs = max_jobs
+        self.shed_backoff = shed_backoff
+        self.jobs: OrderedDict[str, BatchJob] = OrderedDict()
+
+    @property
+    def scheduler(self) -> Optional[RequestScheduler]:
+        router = getattr(self.council, "hybrid_router", None)
+        return getattr(router, "scheduler", None)
+
+    def _prefix_tokens_saved(self) -> int:
+        router = getattr(self.council, "hybrid_router", None)
+        return router.prefix_tokens_saved() if router is not None else 0
+
+    def _auto_concurrency(self) -> int:
+        """
+        Enough workers to keep the busiest backend lane full.
+
+        Every item sends one request to each LLM backend the council uses,
+        so the pool only needs to match the largest per-backend concurrency
+        limit; rate limits themselves are enforced by the scheduler.
+        """
+        scheduler = self.scheduler
+        if scheduler is None:
+            return 8
+        limits = [lane.limit.max_concurrent for lane in scheduler.lanes.values() if lane.limit.max_concurrent]
+        return max(limits) if limits else 32
+
+    # -------------------------------------------------------------------------
+    # Job Control
+    # -------------------------------------------------------------------------
+
+    def submit(self, items: list[dict], concurrency: Optional[int] = None) -> BatchJob:
+        """
+        Start evaluating ``items`` in the background.
+
+        Args:
+            items: Dicts with ``student_answer``, ``teacher_id`` and optional
+                ``pdf_context`` / ``grading_mode`` / ``question_id`` / ``student_id``
+            concurrency: Override the engine's worker count for this job
+        """
+        job = BatchJob(
+            job_id=uuid.uuid4().hex,
+            items=items,
+            concurrency=max(1, min(concurrency or self.concurrency, len(items) or 1)),
+        )
+        self.jobs[job.job_id] = job
+        self._evict_finished()
+        job.task = asyncio.create_task(self._run_job(job))
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self.jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[BatchJob]:
+        """
+        Cancel a running job; results finished so far are kept.
+
+        Backend calls the job alone was waiting for are cancelled with it;
+        calls shared with other requests through single-flight keep running
+        for those requests (and still fill the response cache).
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+            try:
+                await job.task
+            except asyncio.CancelledError:
+                pass
+        return job
+
+    async def shutdown(self) -> None:
+        """Cancel every running job (called from the FastAPI lifespan)."""
+        for job_id in list(self.jobs):
+            await self.cancel(job_id)
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job_id]
+
+    # -------------------------------------------------------------------------
+    # Workers
+    # -------------------------------------------------------------------------
+
+    async def _run_job(self, job: BatchJob) -> None:
+        # Child tasks inherit this context, so every LLM call queues as batch work
+        REQUEST_PRIORITY.set(Priority.BATCH)
+        pending = iter(range(job.total_items))
+        saved_at_start = self._prefix_tokens_saved()
+        try:
+            await asyncio.gather(*(self._worker(job, pending, saved_at_start) for _ in range(job.concurrency)))
+            job.status = JobStatus.COMPLETED
+        except asyncio.CancelledError:
+            job.status = JobStatus.CANCELLED
+            raise
+        except Exception:
+            job.status = JobStatus.FAILED
+        finally:
+            job.prefix_tokens_saved = self._prefix_tokens_saved() - saved_at_start
+            job.finished_at = time.time()
+
+    async def _worker(self, job: BatchJob, pending, saved_at_start: int) -> None:
+        for index in pending:
+            scheduler = self.scheduler
+            # Back off while any lane this council queues on is shedding batch work
+            while scheduler is not None and scheduler.is_shedding(Priority.BATCH, self.council.backends):
+                await asyncio.sleep(self.shed_backoff)
+            try:
+                job.results[index] = await self._evaluate(job.items[index])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.errors[index] = str(e) or type(e).__name__
+            job.prefix_tokens_saved = self._prefix_tokens_saved() - saved_at_start
+
+    async def _evaluate(self, item: dict) -> dict:
+        council_votes = await self.council.gather_council_votes(
+            student_answer=item["student_answer"],
+            pdf_context=item.get("pdf_context"),
+            question_id=item.get("question_id"),
+            submission_id=item.get("student_id"),
+        )
+        teacher_persona = await load_teacher_persona(item["teacher_id"])
+        result = await synthesize_grade(
+            council_votes=council_votes,
+            teacher_persona=teacher_persona,
+            grading_mode=item.get("grading_mode") or "balanced",
+        )
+        return asdict(result)
+
+    def get_stats(self) -> dict:
+        running = [job for job in self.jobs.values() if not job.finished]
+        return {
+            "concurrency": self.concurrency,
+            "jobs": len(self.jobs),
+            "running_jobs": len(running),
+            "queued_items": sum(job.total_items - job.done_items for job in running),
+        }
@@ -15,12 +15,14 @@ from typing import Optional
 from datetime import datetime
 
 from backend.swarm.agents import (
+    PartialCallback,
     FactCheckerAgent,
     StructureAgent,
     CriticalAgent,
     SecurityAgent,
 )
 from backend.infra.router import HybridRouter
+from backend.vectors.retrieval import ReferenceRetriever
 
 
 # =============================================================================
@@ -92,19 +94,34 @@ class SwarmCouncil:
     # TODO Kaustuv: Use asyncio.gather to run these 4 LLM calls in parallel to reduce latency.
     """
     
-    def __init__(self):
-        """Initialize the Swarm Council with all 4 agents."""
-        self.hybrid_router = HybridRouter()
+    def __init__(self, router: Optional[HybridRouter] = None):
+        """
+        Initialize the Swarm Council with all 4 agents.
+        
+        Args:
+            router: Shared HybridRouter (and its connection pools). A private
+                router is created when omitted.
+        """
+        self.hybrid_router = router or HybridRouter()
         
         # Initialize agents
-        # TODO Kaustuv: Consider using dependency injection for better testability
         self.fact_agent = FactCheckerAgent(router=self.hybrid_router)
         self.structure_agent = StructureAgent(router=self.hybrid_router)
         self.critical_agent = CriticalAgent(router=self.hybrid_router)
         self.security_agent = SecurityAgent(router=self.hybrid_router)
         
+        # Long PDF contexts are chunked/indexed once per exam; agents get
+        # only the chunks relevant to each answer
+        self.retriever = ReferenceRetriever.from_env()
+        
         self._initialized = False
     
+    @property
+    def backends(self) -> list[str]:
+        """Router backends the agents send their calls to (their scheduler lanes)."""
+        agents = (self.fact_agent, self.structure_agent, self.critical_agent, self.security_agent)
+        return [agent.model_preference for agent in agents]
+    
     async def initialize(self) -> None:
         """
         Initialize all agents and verify connectivity.
@@ -118,6 +135,9 @@ class SwarmCouncil:
         self,
         student_answer: str,
         pdf_context: Optional[str] = None,
+        on_partial: Optional[PartialCallback] = None,
+        question_id: Optional[str] = None,
+        submission_id: Optional[str] = None,
     ) -> CouncilVotes:
         """
         Gather evaluation votes from all 4 agents in parallel.
@@ -129,6 +149,11 @@ class SwarmCouncil:
         Args:
             student_answer: The student's answer text to evaluate
             pdf_context: Optional reference PDF content for fact-checking
+            on_partial: Optional callback receiving (agent_name, fields) as
+                LLM agents stream their scores, before votes are final
+            question_id: Optional question ID; enables the security agent's
+                check against earlier submissions to the same question
+            submission_id: Optional ID of this submission (e.g. student ID)
             
         Returns:
             CouncilVotes containing all 4 agent evaluations
@@ -139,6 +164,12 @@ class SwarmCouncil:
         """
         start_time = asyncio.get_event_loop().time()
         
+        # Top-k reference chunks for this answer (short contexts pass through)
+        reference = await self.retriever.select_context(pdf_context, student_answer)
+        # Retrieved excerpts differ per answer and must stay out of the
+        # shared (prefix-cached) system prompt
+        per_answer = reference is not None and reference != pdf_context
+        
         # =====================================================================
         # PARALLEL ASYNC DISPATCH - All 4 agents execute simultaneously
         # =====================================================================
@@ -148,23 +179,30 @@ class SwarmCouncil:
             # Agent 1 (Fact - Gemini): "Is this factually strictly true based on PDF?"
             self.fact_agent.evaluate(
                 student_answer=student_answer,
-                pdf_context=pdf_context,
+                pdf_context=reference,
+                on_partial=on_partial,
+                per_answer_context=per_answer,
             ),
             
             # Agent 2 (Structure - Local Llama 3): "Is the answer well-structured and grammatically sound?"
             self.structure_agent.evaluate(
                 student_answer=student_answer,
+                on_partial=on_partial,
             ),
             
             # Agent 3 (Critical - Claude/Mistral): "Is the student bluffing or hallucinating?"
             self.critical_agent.evaluate(
                 student_answer=student_answer,
-                pdf_context=pdf_context,
+                pdf_context=reference,
+                on_partial=on_partial,
+                per_answer_context=per_answer,
             ),
             
             # Agent 4 (Security - BERT): "Is this text AI-generated or Plagiarized?"
             self.security_agent.evaluate(
                 student_answer=student_answer,
+                question_id=question_id,
+                submission_id=submission_id,
             ),
             
             return_exceptions=True,  # Don't fail if one agent errors
@@ -215,18 +253,23 @@ class SwarmCouncil:
         """
         Get the current status of all swarm agents.
         
-        Returns a dictionary with each agent's availability and health.
+        Returns a dictionary with each agent's availability and health,
+        read from the router's cached health snapshot (no network I/O).
         
         # TODO Kaustuv: Add detailed metrics (avg latency, success rate, etc.)
         """
-        local_available = await self.hybrid_router.is_local_available()
+        backends = await self.hybrid_router.health_snapshot()
+        local_available = backends.get("local", {}).get("ok", False)
+        
+        def cloud_status(name: str) -> str:
+            return "available" if backends.get(name, {}).get("ok") else "fallback"
         
         return {
             "agents": {
                 "fact_checker": {
                     "name": "Gemini Pro",
                     "type": "cloud",
-                    "status": "available",  # TODO: Add actual health check
+                    "status": cloud_status("gemini"),
                     "role": "Fact Verification",
                 },
                 "structure_analyzer": {
@@ -238,7 +281,7 @@ class SwarmCouncil:
                 "critical_detector": {
                     "name": "Claude 3.5 / Mistral",
                     "type": "cloud",
-                    "status": "available",
+                    "status": cloud_status("claude"),
                     "role": "Bluff & Hallucination Detection",
                 },
                 "security_guard": {
@@ -248,6 +291,7 @@ class SwarmCouncil:
                     "role": "AI/Plagiarism Detection",
                 },
             },
+            "backends": backends,
             "swarm_ready": True,
             "parallel_execution": True,
         }
@@ -271,6 +315,9 @@ class MockSwarmCouncil(SwarmCouncil):
         self,
         student_answer: str,
         pdf_context: Optional[str] = None,
+        on_partial: Optional[PartialCallback] = None,
+        question_id: Optional[str] = None,
+        submission_id: Optional[str] = None,
     ) -> CouncilVotes:
         """Return mock votes without calling real APIs."""
         
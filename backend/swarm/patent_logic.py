@@ -1,7 +1,9 @@
 import asyncio
 import random
-from typing import List, Dict
-import math
+from typing import List, Dict, Optional
+
+from backend.vectors.indexes import cosine_similarity
+from backend.vectors.triangulation import get_triangulation_engine
 
 # Placeholder for the Cognitive Inference Engine
 class CognitiveGapAnalyzer:
@@ -52,23 +54,22 @@ class TriVectorContext:
     """
     Feature #3: Tri-Vector Contextual Alignment (TVCA)
     Aligns Student Vector (S) against Course (C) and World (W).
+    Whole cohorts are scored at once by backend/vectors/triangulation.py.
     """
+    def __init__(self, penalty_weight: Optional[float] = None):
+        # World-similarity penalty; None follows consensus_matrix.json ("tvca"
+        # section), including edits made while the service runs
+        self.penalty_weight = penalty_weight
+
     def calculate_alignment(self, vec_s: List[float], vec_c: List[float], vec_w: List[float]) -> Dict[str, float]:
-        # Simulating Cosine Similarity
-        sim_c = self._cosine_sim(vec_s, vec_c)
-        sim_w = self._cosine_sim(vec_s, vec_w)
-        
         # We want High C, Neutral W. 
         # High W + Low C = "Internet Cheating"
-        adherence_score = sim_c - (0.5 * sim_w)
-        return {"adherence": adherence_score, "internet_drift": sim_w}
+        engine = get_triangulation_engine([vec_c], [vec_w], penalty_weight=self.penalty_weight)
+        return engine.align([vec_s]).to_dicts()[0]
 
     def _cosine_sim(self, v1, v2) -> float:
-        # Standard cosine similarity
-        dot = sum(a*b for a, b in zip(v1, v2))
-        norm1 = math.sqrt(sum(a*a for a in v1))
-        norm2 = math.sqrt(sum(b*b for b in v2))
-        return dot / (norm1 * norm2) if norm1 and norm2 else 0.0
+        # Standard cosine similarity (vectorised; zero vectors score 0.0)
+        return float(cosine_similarity(v1, v2)[0, 0])
 
 # Placeholder for Temporal Mimicry
 class TemporalMimicry:
@@ -0,0 +1,223 @@
+"""
+Suspicious Phrases - Multi-Pattern Matching for AI Detection
+============================================================
+
+Phrases typical of LLM output are loaded from
+``config/suspicious_phrases.json`` and compiled into an Aho-Corasick
+automaton. A single pass over an answer finds every phrase, with its
+position and category, no matter how many phrases are tracked.
+
+The phrase score is capped at the file's ``max_score``, kept below the
+consensus veto threshold, so phrases alone can flag an answer but never
+zero its grade.
+
+The library checks the file's modification time (at most every
+``check_interval`` seconds) and recompiles when it changes, so phrases can
+be added without restarting the service.
+
+Assigned to: Kaustuv (AI Swarm Engineer)
+Branch: feat/kaustuv-swarm
+"""
+
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_PHRASES_PATH = Path(__file__).resolve().parents[2] / "config" / "suspicious_phrases.json"
+
+
+@dataclass
+class PhraseMatch:
+    """One occurrence of a phrase in the text."""
+    start: int
+    end: int  # Exclusive
+    phrase: str
+    category: str
+
+
+@dataclass
+class MatchResult:
+    """All phrase occurrences in a text, with per-category counts."""
+    matches: list[PhraseMatch] = field(default_factory=list)
+    counts: dict[str, int] = field(default_factory=dict)  # Occurrences per category
+
+    def distinct_phrases(self) -> dict[str, set[str]]:
+        """Distinct phrases found, per category."""
+        found: dict[str, set[str]] = {}
+        for match in self.matches:
+            found.setdefault(match.category, set()).add(match.phrase)
+        return found
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over lower-cased phrases.
+
+    Phrase edges that are letters or digits only match at word boundaries
+    ("moreover," does not fire inside "whatsoever,"); punctuation edges
+    match anywhere.
+    """
+
+    def __init__(self, phrases: dict[str, list[str]]):
+        """
+        Args:
+            phrases: Category -> phrases
+        """
+        # Node i: goto transitions, failure link, (phrase, category) outputs
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[tuple[str, str]]] = [[]]
+        self.size = 0
+
+        for category, entries in phrases.items():
+            for phrase in entries:
+                phrase = phrase.lower()
+                if phrase:
+                    self._insert(phrase, category)
+        self._build_failure_links()
+
+    def _insert(self, phrase: str, category: str) -> None:
+        node = 0
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if (phrase, category) not in self._out[node]:
+            self._out[node].append((phrase, category))
+            self.size += 1
+
+    def _build_failure_links(self) -> None:
+        # Breadth-first, so a node's failure target is final before its children
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                # Inherit the outputs of the longest proper suffix
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> MatchResult:
+        """Scan ``text`` once and return every phrase occurrence."""
+        result = MatchResult()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for index, ch in enumerate(text):
+            ch = ch.lower()
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for phrase, category in out[node]:
+                start = index + 1 - len(phrase)
+                if self._at_boundaries(text, start, index + 1, phrase):
+                    result.matches.append(PhraseMatch(start, index + 1, phrase, category))
+                    result.counts[category] = result.counts.get(category, 0) + 1
+        return result
+
+    @staticmethod
+    def _at_boundaries(text: str, start: int, end: int, phrase: str) -> bool:
+        if phrase[0].isalnum() and start > 0 and text[start - 1].isalnum():
+            return False
+        if phrase[-1].isalnum() and end < len(text) and text[end].isalnum():
+            return False
+        return True
+
+
+class PhraseLibrary:
+    """A ``PhraseMatcher`` compiled from a JSON file and recompiled when it changes."""
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 5.0):
+        """
+        Args:
+            path: Phrase file (defaults to ``config/suspicious_phrases.json``)
+            check_interval: Minimum seconds between modification-time checks
+        """
+        self.path = Path(path) if path else DEFAULT_PHRASES_PATH
+        self.check_interval = check_interval
+        self.weights: dict[str, float] = {}
+        self.max_score = 100.0
+        self.matcher = PhraseMatcher({})
+        self.reloads = 0
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self.reload()
+
+    @classmethod
+    def from_env(cls) -> "PhraseLibrary":
+        """Read ``SUSPICIOUS_PHRASES_*`` environment variables."""
+        return cls(
+            path=os.getenv("SUSPICIOUS_PHRASES_PATH") or None,
+            check_interval=float(os.getenv("SUSPICIOUS_PHRASES_CHECK_INTERVAL", "5")),
+        )
+
+    def reload(self) -> bool:
+        """
+        Recompile from the file now.
+
+        Returns:
+            True if a new phrase list was loaded (a missing or invalid file
+            keeps the current one)
+        """
+        self._checked_at = time.monotonic()
+        try:
+            mtime = self.path.stat().st_mtime
+            with open(self.path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            categories = config["categories"]
+            matcher = PhraseMatcher({name: c.get("phrases", []) for name, c in categories.items()})
+            max_score = min(float(config.get("max_score", 100.0)), 100.0)
+        except (OSError, ValueError, KeyError, AttributeError, TypeError):
+            return False
+        # Replace matcher and weights together; a failed reload changed nothing
+        self.matcher = matcher
+        self.weights = {name: float(c.get("weight", 0.0)) for name, c in categories.items()}
+        self.max_score = max_score
+        self._mtime = mtime
+        self.reloads += 1
+        return True
+
+    def maybe_reload(self) -> bool:
+        """Reload if the file changed (checked at most every ``check_interval``)."""
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = time.monotonic()
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return False
+        return mtime != self._mtime and self.reload()
+
+    def find(self, text: str) -> MatchResult:
+        """Match ``text`` against the current phrase list."""
+        self.maybe_reload()
+        return self.matcher.find(text)
+
+    def score(self, result: MatchResult) -> float:
+        """Sum of category weights over the distinct phrases found, capped at ``max_score``."""
+        total = sum(
+            self.weights.get(category, 0.0) * len(found)
+            for category, found in result.distinct_phrases().items()
+        )
+        return min(total, self.max_score)
+
+    def get_stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "phrases": self.matcher.size,
+            "categories": len(self.weights),
+            "max_score": self.max_score,
+            "reloads": self.reloads,
+        }
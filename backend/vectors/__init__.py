@@ -0,0 +1,34 @@
+"""
+Vector Engine Module
+====================
+
+Embeddings (through one shared, cached and batched service) and similarity
+search used by the swarm: reference-document retrieval for fact checking,
+the in-process vector index behind TVCA and plagiarism checks, cohort-level
+TVCA and the MinHash/LSH index of past submissions.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+from backend.vectors.embeddings import HashingEmbedder, get_default_embedder
+from backend.vectors.indexes import VectorIndex, cosine_similarity
+from backend.vectors.minhash import MinHashIndex, PeerMatch
+from backend.vectors.service import EmbeddingService, get_embedding_service
+from backend.vectors.retrieval import ReferenceRetriever, chunk_text
+from backend.vectors.triangulation import CohortAlignment, TriangulationEngine
+
+__all__ = [
+    "HashingEmbedder",
+    "get_default_embedder",
+    "EmbeddingService",
+    "get_embedding_service",
+    "VectorIndex",
+    "cosine_similarity",
+    "ReferenceRetriever",
+    "chunk_text",
+    "TriangulationEngine",
+    "CohortAlignment",
+    "MinHashIndex",
+    "PeerMatch",
+]
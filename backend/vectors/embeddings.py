@@ -0,0 +1,102 @@
+"""
+Text Embeddings - Local, Dependency-Light Vectorisation
+=======================================================
+
+``HashingEmbedder`` maps text to L2-normalised float32 vectors by feature
+hashing of word unigrams and bigrams. It needs only NumPy, is deterministic
+across processes (CRC32, not Python's salted ``hash``) and embeds thousands
+of chunks per second, which is enough for reference retrieval.
+
+When ``sentence-transformers`` is installed and ``EMBEDDING_MODEL`` is set,
+``get_default_embedder()`` returns a ``SentenceTransformerEmbedder`` instead.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import math
+import os
+import re
+import zlib
+from typing import Optional, Protocol
+
+import numpy as np
+
+try:  # Optional: real sentence embeddings (pip install sentence-transformers)
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class Embedder(Protocol):
+    """Anything that turns a batch of texts into an (N x dim) float32 matrix."""
+    name: str
+    dim: int
+
+    def embed(self, texts: list[str]) -> np.ndarray: ...
+
+
+class HashingEmbedder:
+    """Feature-hashing embedder over word unigrams and bigrams."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> dict[int, float]:
+        words = _WORD_PATTERN.findall(text.lower())
+        counts: dict[int, float] = {}
+        for gram in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            h = zlib.crc32(gram.encode("utf-8"))
+            # Low bits pick the dimension, one high bit picks the sign
+            index = h % self.dim
+            counts[index] = counts.get(index, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+        return counts
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Embed texts into L2-normalised rows (zero rows for empty text)."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index, value in self._features(text).items():
+                # Sublinear term frequency keeps repeated words from dominating
+                matrix[row, index] = math.copysign(1.0 + math.log(abs(value)), value) if value else 0.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class SentenceTransformerEmbedder:
+    """Wrapper around a local sentence-transformers model."""
+
+    def __init__(self, model_name: str):
+        self._model = SentenceTransformer(model_name)
+        self.dim = self._model.get_sentence_embedding_dimension()
+        self.name = model_name
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+_default_embedder: Optional[Embedder] = None
+
+
+def get_default_embedder() -> Embedder:
+    """
+    Return the process-wide embedder.
+
+    Uses ``EMBEDDING_MODEL`` through sentence-transformers when both are
+    available, otherwise a ``HashingEmbedder`` of ``EMBEDDING_DIM`` dimensions.
+    """
+    global _default_embedder
+    if _default_embedder is None:
+        model_name = os.getenv("EMBEDDING_MODEL", "")
+        if model_name and SENTENCE_TRANSFORMERS_AVAILABLE:
+            _default_embedder = SentenceTransformerEmbedder(model_name)
+        else:
+            _default_embedder = HashingEmbedder(dim=int(os.getenv("EMBEDDING_DIM", "384")))
+    return _default_embedder
@@ -0,0 +1,264 @@
+"""
+Vector Indexes - In-Process Similarity Search
+=============================================
+
+``VectorIndex`` stores L2-normalised float32 rows in one contiguous matrix
+and answers (batched) top-k cosine queries with a single matrix product.
+
+For large corpora an IVF mode (``build_ivf``) clusters rows with spherical
+k-means and only scores the ``nprobe`` closest clusters per query. Indexes
+are saved as ``.npy`` files and loaded memory-mapped, so a corpus larger
+than RAM (or shared by several workers) is paged in on demand.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+ArrayLike = Union[np.ndarray, Sequence[float], Sequence[Sequence[float]]]
+
+
+def normalize_rows(vectors: ArrayLike) -> np.ndarray:
+    """
+    Return vectors as a contiguous (N x dim) float32 matrix of unit rows.
+
+    Zero rows stay zero (their similarity to anything is 0).
+    """
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2, order="C")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def cosine_similarity(a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """
+    Pairwise cosine similarity between the rows of ``a`` and ``b``.
+
+    Returns:
+        (len(a) x len(b)) float32 matrix
+    """
+    return normalize_rows(a) @ normalize_rows(b).T
+
+
+def top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Best ``k`` columns of each row of a (Q x N) score matrix.
+
+    Returns:
+        (scores, indexes), both (Q x k) and sorted best-first
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.float32), empty.astype(np.int64)
+    # argpartition is O(N); only the k survivors get sorted
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best, order, axis=1)
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over normalised float32 rows.
+
+    Rows are addressed by position; optional string ``keys`` (document IDs,
+    teacher IDs, ...) are kept alongside and returned by ``search_keys``.
+    """
+
+    def __init__(self, dim: int, nprobe: int = 8):
+        """
+        Args:
+            dim: Vector dimensionality
+            nprobe: Clusters scored per query once ``build_ivf`` has run
+        """
+        self.dim = dim
+        self.nprobe = nprobe
+        self.keys: list[Optional[str]] = []
+        self._data = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0
+        # IVF state (None until build_ivf)
+        self.centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists: Optional[list[np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The stored (N x dim) matrix (a view, not a copy)."""
+        return self._data[:self._size]
+
+    @property
+    def approximate(self) -> bool:
+        return self.centroids is not None
+
+    # -------------------------------------------------------------------------
+    # Building
+    # -------------------------------------------------------------------------
+
+    def add(self, vectors: ArrayLike, keys: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Append vectors (normalised on the way in).
+
+        Args:
+            vectors: One vector or an (N x dim) batch
+            keys: Optional identifier per vector
+
+        Returns:
+            Row positions of the added vectors
+        """
+        rows = normalize_rows(vectors)
+        if rows.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {rows.shape[1]}")
+        if keys is not None and len(keys) != len(rows):
+            raise ValueError("keys must have one entry per vector")
+
+        self._reserve(self._size + len(rows))
+        positions = np.arange(self._size, self._size + len(rows))
+        self._data[positions] = rows
+        self._size += len(rows)
+        self.keys.extend(keys if keys is not None else [None] * len(rows))
+
+        if self.centroids is not None:
+            # New rows join their nearest existing cluster; call build_ivf
+            # again after large inserts to rebalance
+            assigned = np.argmax(rows @ self.centroids.T, axis=1).astype(np.int32)
+            self._assignments = np.concatenate([self._assignments, assigned])
+            self._lists = self._group_lists(self._assignments, len(self.centroids))
+        return positions
+
+    def _reserve(self, capacity: int) -> None:
+        """Grow the backing matrix geometrically (amortised O(1) appends)."""
+        if capacity <= len(self._data) and self._data.flags.writeable:
+            return
+        grown = np.zeros((max(capacity, 2 * len(self._data), 16), self.dim), dtype=np.float32)
+        grown[:self._size] = self._data[:self._size]
+        self._data = grown
+
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10, seed: int = 0) -> None:
+        """
+        Cluster the rows for approximate search (inverted file index).
+
+        Args:
+            nlist: Number of clusters (default ~sqrt(N))
+            iterations: Spherical k-means iterations
+            seed: RNG seed for the initial centroids
+        """
+        vectors = self.vectors
+        if not len(vectors):
+            return
+        nlist = min(nlist or max(1, int(math.sqrt(len(vectors)))), len(vectors))
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            # Empty clusters keep their previous centroid
+            filled = np.bincount(assignments, minlength=nlist) > 0
+            centroids[filled] = normalize_rows(sums[filled])
+
+        self.centroids = centroids
+        self._assignments = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+        self._lists = self._group_lists(self._assignments, nlist)
+
+    @staticmethod
+    def _group_lists(assignments: np.ndarray, nlist: int) -> list[np.ndarray]:
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(nlist + 1))
+        return [order[bounds[i]:bounds[i + 1]] for i in range(nlist)]
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def search(self, queries: ArrayLike, k: int = 5, exact: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k rows by cosine similarity for each query.
+
+        Args:
+            queries: One vector or a (Q x dim) batch
+            k: Results per query
+            exact: Score every row even when an IVF index is built
+
+        Returns:
+            (scores, positions), both (Q x k) sorted best-first; when fewer
+            than k rows are candidates, missing slots are -1 / -inf
+        """
+        queries = normalize_rows(queries)
+        k = max(k, 0)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        positions = np.full((len(queries), k), -1, dtype=np.int64)
+        if not self._size or not k:
+            return scores, positions
+        if exact or self.centroids is None:
+            best_scores, best = top_k(queries @ self.vectors.T, k)
+            scores[:, :best.shape[1]] = best_scores
+            positions[:, :best.shape[1]] = best
+            return scores, positions
+        return self._search_ivf(queries, scores, positions)
+
+    def _search_ivf(
+        self, queries: np.ndarray, scores: np.ndarray, positions: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Fill the padded (Q x k) result arrays from the probed clusters."""
+        k = scores.shape[1]
+        _, probes = top_k(queries @ self.centroids.T, self.nprobe)
+        for q, clusters in enumerate(probes):
+            candidates = np.concatenate([self._lists[c] for c in clusters])
+            if not len(candidates):
+                continue
+            best_scores, best = top_k(queries[q:q + 1] @ self.vectors[candidates].T, k)
+            scores[q, :best.shape[1]] = best_scores[0]
+            positions[q, :best.shape[1]] = candidates[best[0]]
+        return scores, positions
+
+    def search_keys(self, query: ArrayLike, k: int = 5) -> list[tuple[Optional[str], float]]:
+        """Top-k ``(key, score)`` pairs for a single query."""
+        scores, positions = self.search(query, k)
+        return [(self.keys[p], float(s)) for p, s in zip(positions[0], scores[0]) if p >= 0]
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the index to a directory of ``.npy`` files plus ``meta.json``."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "vectors.npy", self.vectors)
+        if self.centroids is not None:
+            np.save(path / "centroids.npy", self.centroids)
+            np.save(path / "assignments.npy", self._assignments)
+        meta = {"dim": self.dim, "nprobe": self.nprobe, "keys": self.keys}
+        (path / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "VectorIndex":
+        """
+        Open an index written by ``save``.
+
+        Args:
+            path: Index directory
+            mmap: Memory-map the vectors read-only instead of reading them
+                into RAM (the first ``add`` copies them)
+        """
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        index = cls(dim=meta["dim"], nprobe=meta.get("nprobe", 8))
+        index._data = np.load(path / "vectors.npy", mmap_mode="r" if mmap else None)
+        index._size = len(index._data)
+        index.keys = list(meta.get("keys") or [None] * index._size)
+        if (path / "centroids.npy").exists():
+            index.centroids = np.load(path / "centroids.npy")
+            index._assignments = np.load(path / "assignments.npy")
+            index._lists = cls._group_lists(index._assignments, len(index.centroids))
+        return index
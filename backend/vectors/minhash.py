@@ -0,0 +1,326 @@
+"""
+MinHash / LSH - Cross-Submission Near-Duplicate Detection
+=========================================================
+
+Each answer is reduced to a set of word shingles, summarised by a MinHash
+signature and inserted into LSH band buckets for its question. A new answer
+is only compared with the submissions sharing at least one bucket, so
+checking it against every earlier answer to the same question is
+sub-linear instead of O(N).
+
+Signatures are appended to per-question files under ``MINHASH_INDEX_DIR``
+(``data/minhash`` by default) and reloaded lazily, so the index survives
+restarts. A resubmission under the same ID overwrites its signature in
+place, so each submission has exactly one record on disk.
+
+Short answers are neither checked nor indexed: correct one-sentence answers
+from different students are legitimately identical, so below
+``min_words`` words overlap says nothing about copying.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import hashlib
+import os
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+DEFAULT_MINHASH_DIR = Path(__file__).resolve().parents[2] / "data" / "minhash"
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def shingles(text: str, size: int = 5) -> np.ndarray:
+    """
+    Distinct hashed word ``size``-grams of a text (uint64 array).
+
+    Texts shorter than ``size`` words yield one shingle of all their words.
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    grams = [" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))]
+    return np.unique(np.array([zlib.crc32(g.encode("utf-8")) for g in grams], dtype=np.uint64))
+
+
+@dataclass
+class PeerMatch:
+    """An earlier submission that near-duplicates the checked answer."""
+    submission_id: str
+    jaccard: float  # Estimated Jaccard similarity of the shingle sets
+
+
+class _QuestionIndex:
+    """Signatures and LSH buckets of one question's submissions."""
+
+    def __init__(self, num_perm: int, bands: int):
+        self.rows = num_perm // bands
+        self.ids: list[str] = []
+        self.positions: dict[str, int] = {}
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self.buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+
+    def band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [signature[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(len(self.buckets))]
+
+    def insert(self, submission_id: str, signature: np.ndarray) -> None:
+        """Add a submission, or replace the signature of an indexed one."""
+        position = self.positions.get(submission_id)
+        if position is not None:
+            for band, key in zip(self.buckets, self.band_keys(self.signatures[position])):
+                band[key].remove(position)
+                if not band[key]:
+                    del band[key]
+            self.signatures[position] = signature
+            for band, key in zip(self.buckets, self.band_keys(signature)):
+                band.setdefault(key, []).append(position)
+            return
+        position = len(self.ids)
+        if position == len(self.signatures):
+            grown = np.zeros((max(16, 2 * position), self.signatures.shape[1]), dtype=np.uint32)
+            grown[:position] = self.signatures[:position]
+            self.signatures = grown
+        self.signatures[position] = signature
+        self.ids.append(submission_id)
+        self.positions[submission_id] = position
+        for band, key in zip(self.buckets, self.band_keys(signature)):
+            band.setdefault(key, []).append(position)
+
+    def candidates(self, signature: np.ndarray) -> np.ndarray:
+        found: set[int] = set()
+        for band, key in zip(self.buckets, self.band_keys(signature)):
+            found.update(band.get(key, ()))
+        return np.fromiter(found, dtype=np.int64, count=len(found))
+
+
+class MinHashIndex:
+    """
+    Per-question MinHash/LSH index of submitted answers.
+
+    With ``bands`` bands of ``num_perm / bands`` rows, pairs above roughly
+    ``(1 / bands) ** (bands / num_perm)`` Jaccard similarity become
+    candidates; candidates are then filtered by their estimated similarity
+    against ``threshold``.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 5,
+        threshold: float = 0.5,
+        seed: int = 1,
+        min_words: int = 20,
+    ):
+        """
+        Args:
+            directory: Persistence root (None keeps the index in memory)
+            num_perm: MinHash permutations per signature
+            bands: LSH bands (must divide ``num_perm``)
+            shingle_size: Words per shingle
+            threshold: Minimum estimated Jaccard similarity to report
+            seed: Seed of the permutation parameters
+            min_words: Answers with fewer words are not checked or indexed
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.min_words = min_words
+        # Signatures only compare under identical parameters, so each
+        # parameter set gets its own subdirectory
+        self.directory = Path(directory) / f"k{shingle_size}-p{num_perm}-s{seed}" if directory else None
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._questions: dict[str, _QuestionIndex] = {}
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.candidates_compared = 0
+        self.matches = 0
+        self.skipped_short = 0
+
+    @classmethod
+    def from_env(cls) -> "MinHashIndex":
+        """Read ``MINHASH_*`` environment variables."""
+        return cls(
+            directory=os.getenv("MINHASH_INDEX_DIR", str(DEFAULT_MINHASH_DIR)) or None,
+            num_perm=int(os.getenv("MINHASH_NUM_PERM", "128")),
+            bands=int(os.getenv("MINHASH_BANDS", "32")),
+            shingle_size=int(os.getenv("MINHASH_SHINGLE_SIZE", "5")),
+            threshold=float(os.getenv("MINHASH_THRESHOLD", "0.5")),
+            min_words=int(os.getenv("MINHASH_MIN_WORDS", "20")),
+        )
+
+    def long_enough(self, text: str) -> bool:
+        """Whether an answer has enough words for overlap to indicate copying."""
+        return len(_WORD_PATTERN.findall(text.lower())) >= max(1, self.min_words)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of a text (None when it has no words)."""
+        hashes = shingles(text, self.shingle_size)
+        if not len(hashes):
+            return None
+        # Universal hashing (a*x + b) mod p for every permutation at once;
+        # uint64 wrap-around is part of the hash family, as in datasketch
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    # -------------------------------------------------------------------------
+    # Query / Insert
+    # -------------------------------------------------------------------------
+
+    def query(self, question_id: str, signature: np.ndarray, exclude: Optional[str] = None) -> list[PeerMatch]:
+        """Earlier submissions to ``question_id`` similar to ``signature``, best first."""
+        with self._lock:
+            return self._match(self._question(question_id), signature, exclude)
+
+    def add(self, question_id: str, submission_id: str, signature: np.ndarray) -> bool:
+        """
+        Insert a submission; a resubmission under the same ID replaces it.
+
+        Returns:
+            True if the submission was new
+        """
+        with self._lock:
+            return self._insert(question_id, submission_id, signature)
+
+    def check_and_add(self, question_id: str, submission_id: Optional[str], text: str) -> list[PeerMatch]:
+        """
+        Match an answer against earlier submissions, then index it.
+
+        The query and the insert happen under one lock, so of two
+        near-duplicates checked concurrently the second always sees the
+        first.
+
+        Args:
+            question_id: Question the answer belongs to
+            submission_id: Stable ID of the submission; without one the
+                answer is only checked, never indexed (a re-grade would
+                otherwise match its own earlier entry)
+            text: The answer
+        """
+        if not self.long_enough(text):
+            self.skipped_short += 1
+            return []
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        with self._lock:
+            matches = self._match(self._question(question_id), signature, submission_id)
+            if submission_id:
+                self._insert(question_id, submission_id, signature)
+            self.checks += 1
+            self.matches += bool(matches)
+        return matches
+
+    def _match(self, index: _QuestionIndex, signature: np.ndarray, exclude: Optional[str]) -> list[PeerMatch]:
+        """Query one question's index (caller holds the lock)."""
+        candidates = index.candidates(signature)
+        if exclude is not None and exclude in index.positions:
+            candidates = candidates[candidates != index.positions[exclude]]
+        self.candidates_compared += len(candidates)
+        if not len(candidates):
+            return []
+        estimates = (index.signatures[candidates] == signature).mean(axis=1)
+        matches = [
+            PeerMatch(index.ids[i], round(float(j), 3))
+            for i, j in zip(candidates, estimates) if j >= self.threshold
+        ]
+        return sorted(matches, key=lambda m: -m.jaccard)
+
+    def _insert(self, question_id: str, submission_id: str, signature: np.ndarray) -> bool:
+        """Index and persist a submission (caller holds the lock)."""
+        index = self._question(question_id)
+        position = index.positions.get(submission_id)
+        if position is not None and np.array_equal(index.signatures[position], signature):
+            return False  # Unchanged resubmission: nothing to write
+        index.insert(submission_id, signature)
+        if position is None:
+            self._append(question_id, submission_id, signature)
+        else:
+            self._overwrite(question_id, position, signature)
+        return position is None
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def _paths(self, question_id: str) -> tuple[Path, Path]:
+        stem = hashlib.sha256(question_id.encode("utf-8")).hexdigest()[:32]
+        return self.directory / f"{stem}.sig", self.directory / f"{stem}.ids"
+
+    def _question(self, question_id: str) -> _QuestionIndex:
+        """The in-memory index for a question, loading it from disk on first use."""
+        index = self._questions.get(question_id)
+        if index is not None:
+            return index
+        index = _QuestionIndex(self.num_perm, self.bands)
+        if self.directory is not None:
+            sig_path, ids_path = self._paths(question_id)
+            if sig_path.exists() and ids_path.exists():
+                raw = np.fromfile(sig_path, dtype=np.uint32)
+                ids = ids_path.read_text(encoding="utf-8").splitlines()
+                count = min(len(raw) // self.num_perm, len(ids))
+                if count * self.num_perm != len(raw) or count != len(ids):
+                    # A crash mid-append left one file ahead: cut both back
+                    # to the last complete submission before appending again
+                    os.truncate(sig_path, count * self.num_perm * raw.itemsize)
+                    ids_path.write_text("".join(f"{i}\n" for i in ids[:count]), encoding="utf-8")
+                signatures = raw[:count * self.num_perm].reshape(count, self.num_perm)
+                for submission_id, signature in zip(ids, signatures):
+                    index.insert(submission_id, signature)
+                if len(index.ids) < count:
+                    # Files written before resubmissions were overwritten in
+                    # place hold repeated IDs: compact them so that record i
+                    # on disk is position i in memory again
+                    sig_path.write_bytes(index.signatures[:len(index.ids)].tobytes())
+                    ids_path.write_text("".join(f"{i}\n" for i in index.ids), encoding="utf-8")
+        self._questions[question_id] = index
+        return index
+
+    def _append(self, question_id: str, submission_id: str, signature: np.ndarray) -> None:
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        sig_path, ids_path = self._paths(question_id)
+        with open(sig_path, "ab") as f:
+            f.write(signature.astype(np.uint32).tobytes())
+        with open(ids_path, "a", encoding="utf-8") as f:
+            f.write(submission_id.replace("\n", " ") + "\n")
+
+    def _overwrite(self, question_id: str, position: int, signature: np.ndarray) -> None:
+        """Replace the signature of the submission stored at ``position``."""
+        if self.directory is None:
+            return
+        sig_path, _ = self._paths(question_id)
+        with open(sig_path, "r+b") as f:
+            f.seek(position * self.num_perm * np.dtype(np.uint32).itemsize)
+            f.write(signature.astype(np.uint32).tobytes())
+
+    def get_stats(self) -> dict:
+        return {
+            "questions_loaded": len(self._questions),
+            "submissions": sum(len(q.ids) for q in self._questions.values()),
+            "checks": self.checks,
+            "checks_with_matches": self.matches,
+            "skipped_short": self.skipped_short,
+            "candidates_per_check": round(self.candidates_compared / self.checks, 2) if self.checks else 0.0,
+            "threshold": self.threshold,
+            "persistent": self.directory is not None,
+        }
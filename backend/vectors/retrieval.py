@@ -0,0 +1,205 @@
+"""
+Reference Retrieval - Chunked PDF Context for Fact Checking
+===========================================================
+
+Long reference documents (whole textbooks) are chunked, embedded and
+indexed once per exam; each answer then only sends its top-k most relevant
+chunks to the fact-checker and critical agents instead of the full text.
+
+Short references are passed through unchanged: they fit the prompt and
+stay an identical, cacheable prefix for every student (see
+``backend/infra/prefix.py``).
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from backend.infra.metrics import RollingWindow
+from backend.infra.singleflight import SingleFlight
+from backend.vectors.embeddings import Embedder, get_default_embedder
+from backend.vectors.indexes import VectorIndex
+from backend.vectors.service import EmbeddingService, get_embedding_service
+
+
+def chunk_text(text: str, chunk_words: int = 150, overlap_words: int = 30) -> list[str]:
+    """
+    Split text into overlapping word windows.
+
+    Args:
+        text: Document text
+        chunk_words: Words per chunk
+        overlap_words: Words shared by consecutive chunks (so a fact on a
+            boundary is whole in at least one chunk)
+    """
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, chunk_words - overlap_words)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words):
+            break
+    return chunks
+
+
+@dataclass
+class ReferenceIndex:
+    """Chunks of one reference document and their embedding matrix."""
+    doc_id: str
+    chunks: list[str]
+    index: VectorIndex  # One row per chunk
+    source_chars: int
+
+    def top_k(self, query_vector: np.ndarray, k: int) -> list[int]:
+        """Indexes of the k most similar chunks, in document order."""
+        if not self.chunks:
+            return []
+        _, best = self.index.search(query_vector, k)
+        # Document order keeps excerpts readable and their text stable
+        return sorted(int(i) for i in best[0] if i >= 0)
+
+
+@dataclass
+class RetrievalStats:
+    """Ingestion/retrieval counters and prompt-size reduction."""
+    documents_indexed: int = 0
+    chunks_indexed: int = 0
+    retrievals: int = 0
+    passthrough: int = 0
+    source_chars: int = 0
+    retrieved_chars: int = 0
+    ingest_latency: RollingWindow = field(default_factory=RollingWindow)
+    retrieval_latency: RollingWindow = field(default_factory=RollingWindow)
+
+    def to_dict(self) -> dict:
+        return {
+            "documents_indexed": self.documents_indexed,
+            "chunks_indexed": self.chunks_indexed,
+            "retrievals": self.retrievals,
+            "passthrough": self.passthrough,
+            "prompt_chars_saved": self.source_chars - self.retrieved_chars,
+            "prompt_size_ratio": round(self.retrieved_chars / self.source_chars, 4) if self.source_chars else 1.0,
+            "ingest_ms": self.ingest_latency.summary(scale=1000.0),
+            "retrieval_ms": self.retrieval_latency.summary(scale=1000.0),
+        }
+
+
+class ReferenceRetriever:
+    """
+    Per-exam reference indexes, built on first use and kept in an LRU.
+
+    Documents are identified by content hash, so every answer of an exam
+    (and every concurrent batch worker) shares one index; concurrent first
+    uses share one ingestion.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        enabled: bool = True,
+        min_chars: int = 6000,
+        top_k: int = 4,
+        chunk_words: int = 150,
+        overlap_words: int = 30,
+        max_documents: int = 32,
+    ):
+        self._embedder = embedder
+        self.enabled = enabled
+        self.min_chars = min_chars
+        self.top_k = top_k
+        self.chunk_words = chunk_words
+        self.overlap_words = overlap_words
+        self.max_documents = max_documents
+        self._indexes: OrderedDict[str, ReferenceIndex] = OrderedDict()
+        self._ingesting = SingleFlight()
+        self.stats = RetrievalStats()
+
+    @classmethod
+    def from_env(cls) -> "ReferenceRetriever":
+        """Read ``RETRIEVAL_*`` environment variables."""
+        return cls(
+            enabled=os.getenv("RETRIEVAL_ENABLED", "true").lower() == "true",
+            min_chars=int(os.getenv("RETRIEVAL_MIN_CHARS", "6000")),
+            top_k=int(os.getenv("RETRIEVAL_TOP_K", "4")),
+            chunk_words=int(os.getenv("RETRIEVAL_CHUNK_WORDS", "150")),
+            overlap_words=int(os.getenv("RETRIEVAL_CHUNK_OVERLAP", "30")),
+            max_documents=int(os.getenv("RETRIEVAL_MAX_DOCUMENTS", "32")),
+        )
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = get_default_embedder()
+        return self._embedder
+
+    @property
+    def embeddings(self) -> EmbeddingService:
+        """Shared cached/batched embeddings (chunks repeat across re-ingestion)."""
+        return get_embedding_service(self.embedder)
+
+    async def ingest(self, document: str) -> ReferenceIndex:
+        """Chunk, embed and index a document (once per distinct document)."""
+        doc_id = hashlib.sha256(document.encode("utf-8")).hexdigest()
+        index = self._indexes.get(doc_id)
+        if index is not None:
+            self._indexes.move_to_end(doc_id)
+            return index
+        return await self._ingesting.do(doc_id, lambda: self._build(doc_id, document))
+
+    async def _build(self, doc_id: str, document: str) -> ReferenceIndex:
+        start = time.perf_counter()
+        chunks = chunk_text(document, self.chunk_words, self.overlap_words)
+        matrix = await self.embeddings.embed_many(chunks)
+        vectors = VectorIndex(dim=self.embedder.dim)
+        vectors.add(matrix)
+        index = ReferenceIndex(doc_id=doc_id, chunks=chunks, index=vectors, source_chars=len(document))
+
+        self._indexes[doc_id] = index
+        while len(self._indexes) > self.max_documents:
+            self._indexes.popitem(last=False)
+        self.stats.documents_indexed += 1
+        self.stats.chunks_indexed += len(chunks)
+        self.stats.ingest_latency.add(time.perf_counter() - start)
+        return index
+
+    async def select_context(self, document: Optional[str], query: str) -> Optional[str]:
+        """
+        Return the reference text to put in the agents' prompts.
+
+        Documents shorter than ``min_chars`` are returned unchanged; longer
+        ones are reduced to the ``top_k`` chunks most similar to ``query``.
+        """
+        if not document or not self.enabled or len(document) < self.min_chars:
+            if document:
+                self.stats.passthrough += 1
+            return document
+
+        index = await self.ingest(document)
+        start = time.perf_counter()
+        query_vector = await self.embeddings.embed(query)
+        selected = [index.chunks[i] for i in index.top_k(query_vector, self.top_k)]
+        context = "\n[...]\n".join(selected)
+        self.stats.retrieval_latency.add(time.perf_counter() - start)
+        self.stats.retrievals += 1
+        self.stats.source_chars += len(document)
+        self.stats.retrieved_chars += len(context)
+        return context
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "min_chars": self.min_chars,
+            "top_k": self.top_k,
+            "documents_cached": len(self._indexes),
+            **self.stats.to_dict(),
+        }
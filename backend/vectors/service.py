@@ -0,0 +1,330 @@
+"""
+Embedding Service - Shared, Batched and Cached Embeddings
+=========================================================
+
+One place to turn text into vectors for every subsystem (reference chunks,
+plagiarism checks, TVCA, teacher personas):
+
+    - each distinct text (keyed by SHA-256) is embedded once, then served
+      from a persistent cache: an append-only float32 file read through a
+      memory map, so lookups do not load the whole cache into RAM
+    - cache misses from concurrent callers are collected into batches (one
+      ``embed()`` call per batch, run off the event loop)
+
+The cache lives under ``data/embeddings/<embedder name>/``; vectors from
+different embedders never mix. Worker processes may share it (appends are
+serialised with a file lock), and it is bounded by
+``EMBEDDING_CACHE_MAX_VECTORS``.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from backend.infra.microbatch import MicroBatcher
+from backend.infra.singleflight import SingleFlight
+from backend.vectors.embeddings import Embedder, get_default_embedder
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one worker per cache
+    fcntl = None
+
+
+DEFAULT_EMBEDDING_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "embeddings"
+
+
+def content_key(text: str) -> str:
+    """Cache key of a text (its SHA-256)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed vector store: in memory, or persisted as
+    ``vectors.f32`` (rows) + ``keys.txt`` (one key per row).
+
+    Several worker processes can share a directory. A key's row is its line
+    number in ``keys.txt``, and appends (vectors first, then keys) happen
+    under an exclusive lock on ``.lock``, so every process maps a key to
+    the same row. Rows appended by other processes are picked up on the
+    next miss.
+
+    At most ``max_vectors`` rows are kept: an append that would exceed it
+    first replaces both files with empty ones (processes still mapping the
+    old files keep reading them until they notice). Methods are thread-safe;
+    with a directory they do file I/O and may block on the lock, so
+    ``EmbeddingService`` calls them from worker threads.
+    """
+
+    def __init__(self, dim: int, directory: Optional[Path] = None, max_vectors: int = 200_000):
+        self.dim = dim
+        self.directory = Path(directory) if directory else None
+        self.max_vectors = max_vectors
+        self.resets = 0
+        self._rows: dict[str, int] = {}
+        self._count = 0  # Rows known to this process (lines of keys.txt read)
+        self._keys_read = 0  # Bytes of keys.txt read
+        self._inode: Optional[int] = None  # Changes when the files are reset
+        self._memory = np.zeros((0, dim), dtype=np.float32)  # In-memory mode only
+        self._mmap: Optional[np.memmap] = None
+        self._thread_lock = threading.Lock()
+        if self.directory is not None:
+            with self._locked():
+                self._sync()
+                self._repair()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _paths(self) -> tuple[Path, Path]:
+        return self.directory / "vectors.f32", self.directory / "keys.txt"
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock shared by every process (and thread) using the directory."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock, open(self.directory / ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _sync(self) -> None:
+        """Read keys appended since the last sync (or all of them after a reset)."""
+        _, keys_path = self._paths()
+        try:
+            f = open(keys_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._inode:
+                self._rows, self._count, self._keys_read, self._mmap = {}, 0, 0, None
+                self._inode = inode
+            f.seek(self._keys_read)
+            data = f.read()
+        # A writer may be mid-line; only complete lines are committed rows
+        data = data[:data.rfind(b"\n") + 1]
+        for key in data.decode("utf-8").splitlines():
+            self._rows.setdefault(key, self._count)
+            self._count += 1
+        self._keys_read += len(data)
+
+    def _repair(self) -> None:
+        """
+        Cut off a torn append (a crash mid-write). Only called under the
+        lock, right after ``_sync``, when no other process is writing.
+        """
+        vectors_path, keys_path = self._paths()
+        if not keys_path.exists():
+            return
+        row_bytes = self.dim * 4
+        size = vectors_path.stat().st_size if vectors_path.exists() else 0
+        if size < self._count * row_bytes:
+            self._reset()  # Keys without vectors: unrecoverable, start over
+            return
+        if size > self._count * row_bytes:
+            os.truncate(vectors_path, self._count * row_bytes)
+        if keys_path.stat().st_size > self._keys_read:
+            os.truncate(keys_path, self._keys_read)
+
+    def _reset(self) -> None:
+        """Replace both files with empty ones (under the lock)."""
+        vectors_path, keys_path = self._paths()
+        # Renamed into place, so existing memory maps stay valid; vectors
+        # first, so a reader that sees the new keys file also sees them
+        for path in (vectors_path, keys_path):
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(b"")
+            os.replace(tmp_path, path)
+        self.resets += 1
+        self._sync()
+
+    def _matrix(self) -> np.ndarray:
+        if self.directory is None:
+            return self._memory
+        if self._mmap is None or len(self._mmap) < self._count:
+            # Re-map after appends (mapping is cheap; the data stays on disk)
+            vectors_path, _ = self._paths()
+            self._mmap = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(self._count, self.dim))
+        return self._mmap
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """Cached vectors for the keys that are present."""
+        with self._thread_lock:
+            if self.directory is not None and any(key not in self._rows for key in keys):
+                self._sync()  # Another process may have stored them
+            found = [(key, self._rows[key]) for key in keys if key in self._rows]
+            if not found:
+                return {}
+            rows = np.array(self._matrix()[[row for _, row in found]])
+        return {key: rows[i] for i, (key, _) in enumerate(found)}
+
+    def put_many(self, keys: list[str], vectors: np.ndarray) -> None:
+        """Store new vectors (keys already present are skipped)."""
+        new = [(i, key) for i, key in enumerate(keys) if key not in self._rows]
+        # Duplicate keys within one call are stored once
+        new = list({key: i for i, key in reversed(new)}.items())
+        if not new:
+            return
+        if self.directory is None:
+            with self._thread_lock:
+                new = [(key, i) for key, i in new if key not in self._rows]
+                if not new:
+                    return
+                if len(self._rows) + len(new) > self.max_vectors:
+                    self._rows, self._memory = {}, self._memory[:0]
+                    self.resets += 1
+                start = len(self._rows)
+                rows = np.ascontiguousarray(vectors[[i for _, i in new]], dtype=np.float32)
+                self._memory = np.vstack([self._memory, rows])
+                for offset, (key, _) in enumerate(new):
+                    self._rows[key] = start + offset
+            return
+
+        with self._locked():
+            self._sync()
+            self._repair()
+            new = [(key, i) for key, i in new if key not in self._rows]
+            if not new:
+                return
+            if self._count + len(new) > self.max_vectors:
+                self._reset()
+            rows = np.ascontiguousarray(vectors[[i for _, i in new]], dtype=np.float32)
+            vectors_path, keys_path = self._paths()
+            with open(vectors_path, "ab") as f:
+                f.write(rows.tobytes())
+            with open(keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{key}\n" for key, _ in new))
+            self._sync()
+
+
+class EmbeddingService:
+    """Batched, cached front end of an ``Embedder``."""
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        cache_dir: Optional[Path] = DEFAULT_EMBEDDING_CACHE_DIR,
+        max_batch_size: int = 64,
+        max_wait: float = 0.005,
+        max_cached_vectors: int = 200_000,
+    ):
+        """
+        Args:
+            embedder: Model to wrap (defaults to ``get_default_embedder()``)
+            cache_dir: Persistence root (None keeps the cache in memory)
+            max_cached_vectors: Cache size bound; when reached the cache
+                starts over empty
+            max_batch_size: Texts per ``embed()`` call
+            max_wait: Seconds to wait for a batch to fill
+        """
+        self.embedder = embedder or get_default_embedder()
+        directory = None
+        if cache_dir is not None:
+            directory = Path(cache_dir) / re.sub(r"[^A-Za-z0-9_.-]+", "_", self.embedder.name)
+        self.cache = EmbeddingCache(self.embedder.dim, directory, max_vectors=max_cached_vectors)
+        self._batcher = MicroBatcher(self._embed_batch, max_batch_size=max_batch_size, max_wait=max_wait)
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def dim(self) -> int:
+        return self.embedder.dim
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Vector for one text."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: list[str]) -> np.ndarray:
+        """
+        Vectors for a list of texts, as an (N x dim) float32 matrix.
+
+        Cached texts are served from the cache; the rest are embedded in
+        batches together with other callers' misses.
+        """
+        keys = [content_key(text) for text in texts]
+        if self.cache.directory is None:
+            vectors = self.cache.get_many(keys)
+        else:
+            # File reads and the cache lock stay off the event loop
+            vectors = await asyncio.to_thread(self.cache.get_many, keys)
+        self.hits += sum(1 for key in keys if key in vectors)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            self.misses += len(missing)
+            # Concurrent requests for the same text share one embedding
+            computed = await asyncio.gather(*(
+                self._flight.do(key, lambda text=text: self._batcher.submit(text))
+                for key, text in missing.items()
+            ))
+            vectors.update(zip(missing, computed))
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, key in enumerate(keys):
+            matrix[row] = vectors[key]
+        return matrix
+
+    async def _embed_batch(self, texts: list[str]) -> list[np.ndarray]:
+        # Embedding is CPU-bound and storing may wait on the cache lock:
+        # both run in one worker thread, off the event loop
+        return list(await asyncio.to_thread(self._embed_and_store, texts))
+
+    def _embed_and_store(self, texts: list[str]) -> np.ndarray:
+        matrix = self.embedder.embed(texts)
+        self.cache.put_many([content_key(text) for text in texts], matrix)
+        return matrix
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "embedder": self.embedder.name,
+            "dim": self.dim,
+            "cached_vectors": len(self.cache),
+            "max_cached_vectors": self.cache.max_vectors,
+            "cache_resets": self.cache.resets,
+            "persistent": self.cache.directory is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "batching": self._batcher.get_stats(),
+        }
+
+
+_services: dict[str, EmbeddingService] = {}
+
+
+def get_embedding_service(embedder: Optional[Embedder] = None) -> EmbeddingService:
+    """
+    Return the process-wide service for an embedder (default: the default
+    embedder), configured from ``EMBEDDING_CACHE_*`` environment variables.
+    """
+    embedder = embedder or get_default_embedder()
+    service = _services.get(embedder.name)
+    if service is None:
+        cache_dir = os.getenv("EMBEDDING_CACHE_DIR", str(DEFAULT_EMBEDDING_CACHE_DIR))
+        service = EmbeddingService(
+            embedder=embedder,
+            cache_dir=Path(cache_dir) if cache_dir else None,
+            max_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+            max_wait=float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5")) / 1000,
+            max_cached_vectors=int(os.getenv("EMBEDDING_CACHE_MAX_VECTORS", "200000")),
+        )
+        _services[embedder.name] = service
+    return service
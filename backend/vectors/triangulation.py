@@ -0,0 +1,186 @@
+"""
+Triangulation - Cohort-Level Tri-Vector Contextual Alignment (TVCA)
+===================================================================
+
+Scores every student of a cohort against the course (C) and world (W)
+vectors in one matrix product:
+
+    adherence = cos(S, C) - penalty * cos(S, W)
+
+High course similarity with low world similarity is on-syllabus work; high
+world similarity with low course similarity suggests answers lifted from
+the internet ("internet drift"). With several course/world centroids (one
+per topic or source cluster) each student is scored against its best match.
+
+The penalty weight is ``tvca.internet_penalty_weight`` in
+``config/consensus_matrix.json``, read through the same hot-reloaded file
+as the consensus engine (``backend.config``); an engine keeps the weight it
+was built with. Callers that score one student at a time against the same
+centroids share an engine through ``get_triangulation_engine()``, which is
+keyed by the current weight.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from backend.config import load_penalty_weight
+from backend.vectors.indexes import ArrayLike, normalize_rows
+from backend.vectors.service import EmbeddingService, get_embedding_service
+
+
+def get_penalty_weight() -> float:
+    """Current penalty weight (follows edits to the consensus matrix)."""
+    return load_penalty_weight()
+
+
+def centroid(vectors: ArrayLike) -> np.ndarray:
+    """Unit-length mean direction of a group of vectors (e.g. a syllabus)."""
+    return normalize_rows(normalize_rows(vectors).mean(axis=0))[0]
+
+
+@dataclass
+class CohortAlignment:
+    """TVCA results for a cohort; every array has one entry per student."""
+    adherence: np.ndarray
+    internet_drift: np.ndarray  # Similarity to the closest world centroid
+    course_similarity: np.ndarray  # Similarity to the closest course centroid
+    course_match: np.ndarray  # Index of that course centroid
+    world_match: np.ndarray  # Index of that world centroid
+
+    def __len__(self) -> int:
+        return len(self.adherence)
+
+    def to_dicts(self) -> list[dict]:
+        """Per-student dicts in the ``TriVectorContext.calculate_alignment`` shape."""
+        return [
+            {"adherence": float(a), "internet_drift": float(w)}
+            for a, w in zip(self.adherence, self.internet_drift)
+        ]
+
+
+class TriangulationEngine:
+    """Vectorised TVCA against fixed course and world centroid matrices."""
+
+    def __init__(
+        self,
+        course_centroids: ArrayLike,
+        world_centroids: ArrayLike,
+        penalty_weight: Optional[float] = None,
+        block_size: int = 8192,
+    ):
+        """
+        Args:
+            course_centroids: (C x d) course/syllabus vectors
+            world_centroids: (W x d) general-knowledge/internet vectors
+            penalty_weight: Weight of the world similarity (defaults to the
+                consensus matrix value)
+            block_size: Students scored per matrix product (bounds memory
+                for very large cohorts)
+        """
+        course = normalize_rows(course_centroids)
+        world = normalize_rows(world_centroids)
+        if course.shape[1] != world.shape[1]:
+            raise ValueError("Course and world centroids must have the same dimension")
+        self.dim = course.shape[1]
+        self.n_course = len(course)
+        # One stacked matrix: a single product yields both similarity blocks
+        self._centroids_t = np.ascontiguousarray(np.vstack([course, world]).T)
+        self.penalty_weight = get_penalty_weight() if penalty_weight is None else penalty_weight
+        self.block_size = block_size
+
+    @classmethod
+    async def from_texts(
+        cls,
+        course_texts: list[str],
+        world_texts: list[str],
+        embeddings: Optional[EmbeddingService] = None,
+        penalty_weight: Optional[float] = None,
+    ) -> "TriangulationEngine":
+        """
+        Build an engine whose centroids are the embeddings of the given texts
+        (e.g. one per syllabus section / one per known web source).
+        """
+        embeddings = embeddings or get_embedding_service()
+        course = await embeddings.embed_many(course_texts)
+        world = await embeddings.embed_many(world_texts)
+        return cls(course, world, penalty_weight=penalty_weight)
+
+    async def align_texts(self, answers: list[str], embeddings: Optional[EmbeddingService] = None) -> CohortAlignment:
+        """Embed a cohort's answers (cached, batched) and score them."""
+        embeddings = embeddings or get_embedding_service()
+        return self.align(await embeddings.embed_many(answers))
+
+    def align(self, students: ArrayLike) -> CohortAlignment:
+        """
+        Score a cohort.
+
+        Args:
+            students: (N x d) student embeddings (or a single vector)
+        """
+        students = normalize_rows(students)
+        if students.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional student vectors, got {students.shape[1]}")
+
+        n = len(students)
+        course_similarity = np.empty(n, dtype=np.float32)
+        internet_drift = np.empty(n, dtype=np.float32)
+        course_match = np.empty(n, dtype=np.int64)
+        world_match = np.empty(n, dtype=np.int64)
+        for start in range(0, n, self.block_size):
+            block = slice(start, start + self.block_size)
+            sims = students[block] @ self._centroids_t
+            course_sims, world_sims = sims[:, :self.n_course], sims[:, self.n_course:]
+            course_match[block] = course_sims.argmax(axis=1)
+            world_match[block] = world_sims.argmax(axis=1)
+            course_similarity[block] = course_sims.max(axis=1)
+            internet_drift[block] = world_sims.max(axis=1)
+
+        return CohortAlignment(
+            adherence=course_similarity - np.float32(self.penalty_weight) * internet_drift,
+            internet_drift=internet_drift,
+            course_similarity=course_similarity,
+            course_match=course_match,
+            world_match=world_match,
+        )
+
+
+# Engines by centroids and penalty, most recently used last
+_engines: "OrderedDict[str, TriangulationEngine]" = OrderedDict()
+_MAX_ENGINES = 16
+
+
+def get_triangulation_engine(
+    course_centroids: ArrayLike,
+    world_centroids: ArrayLike,
+    penalty_weight: Optional[float] = None,
+) -> TriangulationEngine:
+    """
+    Shared engine for a set of centroids, built on first use.
+
+    Per-student callers pass the same exam centroids on every call; they
+    get the same engine back instead of building one each time.
+    """
+    penalty = get_penalty_weight() if penalty_weight is None else float(penalty_weight)
+    course = np.asarray(course_centroids, dtype=np.float32)
+    world = np.asarray(world_centroids, dtype=np.float32)
+    digest = hashlib.sha256(repr((course.shape, world.shape, penalty)).encode())
+    digest.update(course.tobytes())
+    digest.update(world.tobytes())
+    key = digest.hexdigest()
+
+    engine = _engines.get(key)
+    if engine is None:
+        engine = TriangulationEngine(course, world, penalty_weight=penalty)
+        _engines[key] = engine
+        while len(_engines) > _MAX_ENGINES:
+            _engines.popitem(last=False)
+    else:
+        _engines.move_to_end(key)
+    return engine
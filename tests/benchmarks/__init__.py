@@ -0,0 +1 @@
+"""Benchmark package init (run modules with ``python -m tests.benchmarks.<name>``)."""
@@ -0,0 +1,183 @@
+"""
+API Benchmark - End-to-End /api/evaluate Under Load
+===================================================
+
+Drives ``backend.main:app`` in-process through ``httpx.ASGITransport`` and
+measures requests/s, latency percentiles, event-loop lag and RSS per
+concurrency level. Two council modes:
+
+    - ``mock``:    MockSwarmCouncil (fixed 100 ms), isolates the API layer,
+                   persona loading and ``synthesize_grade``
+    - ``standin``: the real SwarmCouncil and HybridRouter against the local
+                   stand-in backends (router, agents and parsing included)
+
+Every run is appended to ``results/history.jsonl`` and compared against the
+stored baseline; the process exits non-zero on a regression. Caches and
+indexes live in a temporary directory for the run.
+
+    python -m tests.benchmarks.bench_api --council standin --levels 1,16,64
+    python -m tests.benchmarks.bench_api --save-baseline
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+
+from backend.infra.router import HybridRouter
+from backend.infra.standin import BACKENDS, LatencyProfile, StandinProfile, StandinServer
+from backend.main import app
+from backend.swarm.orchestrator import MockSwarmCouncil, SwarmCouncil
+from tests.benchmarks.bench_router import build_router
+from tests.benchmarks.harness import (
+    LoopLagMonitor,
+    append_history,
+    compare_to_baseline,
+    load_baseline,
+    rss_mb,
+    run_load,
+    save_baseline,
+    scratch_data_dirs,
+)
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+HISTORY_PATH = RESULTS_DIR / "history.jsonl"
+BASELINE_PATH = RESULTS_DIR / "baseline_api.json"
+
+GRADING_MODES = ("strict", "balanced", "creative")
+
+
+@asynccontextmanager
+async def benchmark_client(council: str, profile: StandinProfile) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Set up ``app.state`` the way the lifespan does and yield an ASGI client.
+
+    The router always points at the stand-in, so neither mode touches the
+    network (not even the startup health probes).
+    """
+    server = StandinServer(profiles={name: profile for name in BACKENDS})
+    router: HybridRouter = build_router(server)
+    await router.startup()
+    app.state.hybrid_router = router
+    app.state.swarm_council = (
+        SwarmCouncil(router=router) if council == "standin" else MockSwarmCouncil(router=router)
+    )
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            yield client
+    finally:
+        await router.aclose()
+
+
+async def run_benchmark(council: str, levels: list[int], requests_per_level: int, profile: StandinProfile) -> list[dict]:
+    """Run /api/evaluate at each concurrency level; returns one row per level."""
+    rows = []
+    async with benchmark_client(council, profile) as client:
+        for level in levels:
+            async def operation(index: int, level: int = level) -> None:
+                resp = await client.post("/api/evaluate", json={
+                    "student_answer": f"Answer {level}-{index}: plants turn sunlight into glucose.",
+                    "pdf_context": "Photosynthesis converts light energy into chemical energy.",
+                    "teacher_id": f"teacher_{index % 5:03d}",
+                    "grading_mode": GRADING_MODES[index % len(GRADING_MODES)],
+                })
+                resp.raise_for_status()
+
+            async with LoopLagMonitor() as lag:
+                result = await run_load(operation, level, requests_per_level)
+            row = result.to_dict()
+            row["loop_lag"] = lag.summary_ms()
+            row["rss_mb"] = round(rss_mb(), 1)
+            rows.append(row)
+    return rows
+
+
+def format_table_with_extras(rows: list[dict]) -> str:
+    """Results table plus event-loop lag and RSS columns."""
+    lines = []
+    for row in rows:
+        lines.append(
+            f"c={row['concurrency']:<4} rps={row['throughput_rps']:<8} p50={row['p50_ms']}ms "
+            f"p95={row['p95_ms']}ms p99={row['p99_ms']}ms errors={row['errors']} "
+            f"loop_lag_p99={row['loop_lag']['p99_ms']}ms rss={row['rss_mb']}MB"
+        )
+    return "\n".join(lines)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark /api/evaluate end to end")
+    parser.add_argument("--council", default="mock", choices=["mock", "standin"])
+    parser.add_argument("--levels", default="1,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=128, help="Requests per level")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Stand-in backend latency")
+    parser.add_argument("--token-delay-ms", type=float, default=1.0)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    profile = StandinProfile(
+        latency=LatencyProfile("lognormal", args.latency_ms),
+        token_delay_ms=args.token_delay_ms,
+    )
+    levels = [int(level) for level in args.levels.split(",")]
+    with scratch_data_dirs():
+        rows = asyncio.run(run_benchmark(args.council, levels, args.requests, profile))
+
+    entry = {
+        "benchmark": f"api_evaluate_{args.council}",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "levels": rows,
+    }
+    append_history(args.history, entry)
+
+    print(format_table_with_extras(rows))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, entry)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline} (run with --save-baseline)")
+        return 0
+    if baseline.get("benchmark") != entry["benchmark"]:
+        print(f"\nBaseline is for {baseline.get('benchmark')}, skipping comparison")
+        return 0
+
+    regressions = compare_to_baseline(rows, baseline, tolerance=args.tolerance)
+    if regressions:
+        print(f"\nRegressions vs baseline {baseline.get('revision')}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\nNo regressions vs baseline {baseline.get('revision')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
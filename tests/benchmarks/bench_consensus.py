@@ -0,0 +1,99 @@
+"""
+Consensus Benchmark - Cohort Grade Synthesis Throughput
+=======================================================
+
+Compares grading a cohort with ``synthesize_grade`` once per answer
+against one ``synthesize_grades`` call over the whole (N x 4) block, and
+reports answers per second for each.
+
+    python -m tests.benchmarks.bench_consensus --cohorts 1000,10000,100000
+
+The per-answer path is timed on at most ``--loop-sample`` answers per
+cohort and extrapolated; it scales linearly, so the rate is representative.
+
+Assigned to: Jatin (Digital Twin Architect)
+Branch: feat/jatin-twin
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from backend.digital_twin.decision_maker import synthesize_grade, synthesize_grades
+from backend.digital_twin.persona_store import TeacherPersona
+from backend.swarm.orchestrator import AgentVote, CouncilVotes
+
+
+def _council(scores: np.ndarray, confidences: np.ndarray) -> CouncilVotes:
+    return CouncilVotes(*(
+        AgentVote("Agent", "Role", float(s), float(c), "Solid reasoning.", "Reasoning")
+        for s, c in zip(scores, confidences)
+    ))
+
+
+async def _grade_one_by_one(councils: list[CouncilVotes], persona: TeacherPersona) -> list[float]:
+    return [(await synthesize_grade(votes, persona, "balanced")).final_grade for votes in councils]
+
+
+def run_benchmark(cohorts: list[int], loop_sample: int = 2000, seed: int = 0) -> list[dict]:
+    """Time both paths for each cohort size and return one row per size."""
+    rng = np.random.default_rng(seed)
+    persona = TeacherPersona("bench", "Dr. Bench", "General", grading_bias={"fact_weight": 0.35})
+
+    rows = []
+    for size in cohorts:
+        scores = rng.uniform(0, 100, size=(size, 4))
+        confidences = rng.uniform(0.3, 1.0, size=(size, 4))
+
+        sample = min(size, loop_sample)
+        councils = [_council(scores[i], confidences[i]) for i in range(sample)]
+        start = time.perf_counter()
+        expected = asyncio.run(_grade_one_by_one(councils, persona))
+        loop_seconds = (time.perf_counter() - start) * size / sample
+
+        start = time.perf_counter()
+        batch = synthesize_grades(scores, confidences, persona, "balanced")
+        batch_seconds = time.perf_counter() - start
+
+        rows.append({
+            "answers": size,
+            "loop_answers_per_s": round(size / loop_seconds, 1),
+            "batch_answers_per_s": round(size / batch_seconds, 1),
+            "batch_ms": round(batch_seconds * 1000, 3),
+            "speedup": round(loop_seconds / batch_seconds, 1),
+            "mismatches": int(np.sum(batch.final_grades[:sample] != np.array(expected))),
+        })
+    return rows
+
+
+def format_table(rows: list[dict]) -> str:
+    """Render benchmark rows as a fixed-width table."""
+    header = f"{'answers':>8} {'loop/s':>10} {'batch/s':>12} {'batch ms':>9} {'speedup':>8} {'mismatch':>9}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['answers']:>8} {r['loop_answers_per_s']:>10.0f} {r['batch_answers_per_s']:>12.0f} "
+            f"{r['batch_ms']:>9.2f} {r['speedup']:>7.1f}x {r['mismatches']:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cohort grade synthesis")
+    parser.add_argument("--cohorts", default="1000,10000,100000", help="Comma-separated cohort sizes")
+    parser.add_argument("--loop-sample", type=int, default=2000, help="Answers timed on the per-answer path")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    rows = run_benchmark([int(size) for size in args.cohorts.split(",")], args.loop_sample)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Feedback Index Benchmark - Few-Shot Retrieval Latency
+=====================================================
+
+Fills one teacher's feedback index with N synthetic comments (on disk, so
+searches go through the memory map) and reports top-k search latency.
+
+    python -m tests.benchmarks.bench_feedback --comments 50000 --queries 200
+
+Assigned to: Jatin (Digital Twin Architect)
+Branch: feat/jatin-twin
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+
+from backend.digital_twin.feedback_index import FeedbackIndex
+from backend.vectors.embeddings import HashingEmbedder
+from backend.vectors.service import EmbeddingService
+
+
+WORDS = (
+    "argument evidence structure citation thesis grammar analysis example clarity "
+    "conclusion derivation graph units method hypothesis source depth summary"
+).split()
+
+
+def make_comments(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [f"{i}: " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 20))) for i in range(count)]
+
+
+async def run_benchmark(comments: int, queries: int, k: int = 5, dim: int = 384) -> dict:
+    """Build the index, reopen it from disk and time ``queries`` searches."""
+    with tempfile.TemporaryDirectory() as directory:
+        embeddings = EmbeddingService(HashingEmbedder(dim=dim), cache_dir=None)
+        await FeedbackIndex(directory, embeddings=embeddings).add("teacher", make_comments(comments))
+        index = FeedbackIndex(directory, embeddings=embeddings)  # Fresh, lazily mapped
+        for query in make_comments(queries, seed=1):
+            await index.search("teacher", query, k=k)
+        latency = index.get_stats()["search_latency_ms"]
+    return {"comments": comments, "queries": queries, "k": k, "dim": dim, "search_ms": latency}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-teacher feedback retrieval")
+    parser.add_argument("--comments", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run_benchmark(args.comments, args.queries, args.k, args.dim)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
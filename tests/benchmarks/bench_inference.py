@@ -0,0 +1,99 @@
+"""
+Inference Benchmark - Local AI-Detection Throughput
+===================================================
+
+Submits a mixed-length cohort of answers concurrently to the
+``InferenceService`` (the router's ``bert`` backend) and reports answers/s
+overall and per core, plus the batch sizes each length bucket achieved.
+
+    python -m tests.benchmarks.bench_inference --answers 2000 --workers 0,1,2
+
+Set ``INFERENCE_MODEL`` (with transformers installed) to benchmark a real
+model instead of the statistical detector.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from backend.infra.inference import InferenceService
+
+
+SENTENCES = [
+    "Photosynthesis converts light energy into chemical energy.",
+    "The chloroplast is where it happens.",
+    "Glucose produced by the plant is used for growth, repair and as an energy store for the night.",
+    "Oxygen is released.",
+    "Carbon dioxide enters through the stomata on the underside of the leaf, which open during the day.",
+    "Water travels up from the roots through the xylem.",
+]
+
+
+def make_answers(count: int, seed: int = 0) -> list[str]:
+    """Answers of 1-40 sentences, so every length bucket gets traffic."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 40))) for _ in range(count)]
+
+
+async def run_benchmark(answers: int, workers: list[int], max_batch_size: int = 16) -> list[dict]:
+    """Score the cohort once per worker count and return one row each."""
+    texts = make_answers(answers)
+    rows = []
+    for count in workers:
+        service = InferenceService(
+            model_name=os.getenv("INFERENCE_MODEL", ""),
+            workers=count,
+            max_batch_size=max_batch_size,
+        )
+        try:
+            await service.score("warm-up")  # Start workers and load the model
+            service.answers = 0
+            service.cpu_seconds = 0.0
+            start = time.perf_counter()
+            await asyncio.gather(*(service.score(text) for text in texts))
+            elapsed = time.perf_counter() - start
+        finally:
+            await service.aclose()
+        stats = service.get_stats()
+        rows.append({
+            "workers": count,
+            "backend": stats["backend"],
+            "answers": answers,
+            "answers_per_s": round(answers / elapsed, 1),
+            "answers_per_s_per_core": round(answers / elapsed / max(1, count), 1),
+            "answers_per_core_second": stats["answers_per_core_second"],
+            "mean_batch_size": {bound: b["mean_batch_size"] for bound, b in stats["buckets"].items()},
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the local AI-detection service")
+    parser.add_argument("--answers", type=int, default=2000)
+    parser.add_argument("--workers", default="0,1,2", help="Comma-separated worker counts (0 = thread)")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run_benchmark(args.answers, [int(w) for w in args.workers.split(",")], args.max_batch))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    header = f"{'workers':>7} {'backend':>12} {'answers/s':>10} {'per core':>9} {'per cpu-s':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['workers']:>7} {r['backend']:>12} {r['answers_per_s']:>10.1f} "
+            f"{r['answers_per_s_per_core']:>9.1f} {r['answers_per_core_second']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Router Benchmark - Council Votes Against the Stand-in Backends
+==============================================================
+
+Drives ``SwarmCouncil.gather_council_votes`` through a real ``HybridRouter``
+whose backends are the in-process stand-in server, and reports throughput
+and p50/p95/p99 per concurrency level. The response cache is disabled and
+every answer is unique, so the numbers measure the router, not the cache.
+
+    python -m tests.benchmarks.bench_router --levels 1,8,32,128 --latency-ms 200
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import argparse
+import asyncio
+import json
+
+from backend.infra.router import HybridRouter
+from backend.infra.scheduler import RateLimit, RequestScheduler
+from backend.infra.standin import BACKENDS, LatencyProfile, StandinProfile, StandinServer
+from backend.swarm.orchestrator import SwarmCouncil
+from tests.benchmarks.harness import LoadResult, format_table, run_load
+
+
+PDF_CONTEXT = "Photosynthesis converts light energy into chemical energy stored in glucose."
+
+
+def build_router(server: StandinServer, rate_limits: bool = False) -> HybridRouter:
+    """Create a router wired to the stand-in with caching disabled."""
+    router = HybridRouter()
+    server.attach(router)
+    router.cache.enabled = False
+    if not rate_limits:
+        unlimited = RateLimit(requests_per_second=0.0, tokens_per_minute=0.0, max_concurrent=0, max_queue=10_000)
+        router.scheduler = RequestScheduler(limits={name: unlimited for name in BACKENDS})
+    return router
+
+
+async def run_benchmark(
+    levels: list[int],
+    requests_per_level: int,
+    profile: StandinProfile,
+    rate_limits: bool = False,
+) -> list[LoadResult]:
+    """Run the council at each concurrency level and return the results."""
+    server = StandinServer(profiles={name: profile for name in BACKENDS})
+    router = build_router(server, rate_limits=rate_limits)
+    council = SwarmCouncil(router=router)
+    await router.startup()
+
+    results = []
+    try:
+        for level in levels:
+            server.reset_stats()
+
+            async def operation(index: int, level: int = level) -> None:
+                answer = f"Answer {level}-{index}: plants use sunlight to make glucose."
+                await council.gather_council_votes(answer, PDF_CONTEXT)
+
+            results.append(await run_load(operation, level, requests_per_level))
+    finally:
+        await router.aclose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Hybrid Router against stand-in backends")
+    parser.add_argument("--levels", default="1,8,32,128", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=128, help="Council evaluations per level")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--distribution", default="lognormal", choices=["fixed", "uniform", "lognormal"])
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--token-delay-ms", type=float, default=2.0)
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the scheduler's RATE_* limits")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    profile = StandinProfile(
+        latency=LatencyProfile(args.distribution, args.latency_ms, args.sigma),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        token_delay_ms=args.token_delay_ms,
+    )
+    levels = [int(level) for level in args.levels.split(",")]
+    results = asyncio.run(run_benchmark(levels, args.requests, profile, rate_limits=args.rate_limits))
+
+    if args.json:
+        print(json.dumps([r.to_dict() for r in results], indent=2))
+    else:
+        print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+TVCA Benchmark - Cohort Alignment Throughput
+============================================
+
+Compares per-student Tri-Vector alignment in pure Python (the original
+list arithmetic) with ``TriangulationEngine.align`` over whole cohorts, and
+reports students per second for each.
+
+    python -m tests.benchmarks.bench_tvca --cohorts 1000,10000,100000 --dim 384
+
+The pure-Python path is timed on at most ``--loop-sample`` students per
+cohort and extrapolated; it scales linearly, so the rate is representative.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+
+from backend.vectors.triangulation import TriangulationEngine
+
+
+def _python_alignment(vec_s: list[float], vec_c: list[float], vec_w: list[float], penalty: float) -> dict:
+    """Reference implementation: list-based cosine per student."""
+    def cosine(v1, v2):
+        dot = sum(a * b for a, b in zip(v1, v2))
+        norm1 = math.sqrt(sum(a * a for a in v1))
+        norm2 = math.sqrt(sum(b * b for b in v2))
+        return dot / (norm1 * norm2) if norm1 and norm2 else 0.0
+
+    sim_c = cosine(vec_s, vec_c)
+    sim_w = cosine(vec_s, vec_w)
+    return {"adherence": sim_c - penalty * sim_w, "internet_drift": sim_w}
+
+
+def run_benchmark(cohorts: list[int], dim: int = 384, loop_sample: int = 1000, seed: int = 0) -> list[dict]:
+    """Time both paths for each cohort size and return one row per size."""
+    rng = np.random.default_rng(seed)
+    course = rng.normal(size=dim).astype(np.float32)
+    world = rng.normal(size=dim).astype(np.float32)
+    engine = TriangulationEngine([course], [world])
+    course_list, world_list = course.tolist(), world.tolist()
+
+    rows = []
+    for size in cohorts:
+        students = rng.normal(size=(size, dim)).astype(np.float32)
+
+        sample = students[:min(size, loop_sample)].tolist()
+        start = time.perf_counter()
+        expected = [_python_alignment(s, course_list, world_list, engine.penalty_weight) for s in sample]
+        loop_seconds = (time.perf_counter() - start) * size / len(sample)
+
+        start = time.perf_counter()
+        result = engine.align(students)
+        vector_seconds = time.perf_counter() - start
+
+        max_error = max(abs(e["adherence"] - float(a)) for e, a in zip(expected, result.adherence))
+        rows.append({
+            "students": size,
+            "dim": dim,
+            "loop_students_per_s": round(size / loop_seconds, 1),
+            "vectorised_students_per_s": round(size / vector_seconds, 1),
+            "speedup": round(loop_seconds / vector_seconds, 1),
+            "max_abs_error": max_error,
+        })
+    return rows
+
+
+def format_table(rows: list[dict]) -> str:
+    """Render benchmark rows as a fixed-width table."""
+    header = f"{'students':>9} {'dim':>5} {'loop/s':>12} {'vectorised/s':>14} {'speedup':>8}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['students']:>9} {r['dim']:>5} {r['loop_students_per_s']:>12.0f} "
+            f"{r['vectorised_students_per_s']:>14.0f} {r['speedup']:>7.1f}x"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cohort-level TVCA")
+    parser.add_argument("--cohorts", default="1000,10000,100000", help="Comma-separated cohort sizes")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--loop-sample", type=int, default=1000, help="Students timed on the pure-Python path")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    rows = run_benchmark([int(size) for size in args.cohorts.split(",")], args.dim, args.loop_sample)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Benchmark Harness - Closed-Loop Load Generation
+===============================================
+
+Runs an async operation at a fixed concurrency (closed loop: each worker
+starts its next request as soon as the previous one finishes) and reports
+throughput, error count and latency percentiles. Also provides event-loop
+lag sampling, RSS readings and a JSON history/baseline for regression checks.
+
+Assigned to: Anshuman (Hybrid Infrastructure)
+Branch: feat/anshuman-hybrid
+"""
+
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator, Optional
+
+from backend.infra.metrics import percentile
+
+
+Operation = Callable[[int], Awaitable[object]]
+
+
+@dataclass
+class LoadResult:
+    """Outcome of one load level."""
+    concurrency: int
+    requests: int
+    errors: int
+    elapsed: float
+    latencies: list[float] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile_ms(self, q: float) -> float:
+        ordered = sorted(self.latencies)
+        return percentile(ordered, q) * 1000 if ordered else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "errors": self.errors,
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_rps": round(self.throughput, 2),
+            "p50_ms": round(self.percentile_ms(0.50), 1),
+            "p95_ms": round(self.percentile_ms(0.95), 1),
+            "p99_ms": round(self.percentile_ms(0.99), 1),
+        }
+
+
+async def run_load(operation: Operation, concurrency: int, total: int) -> LoadResult:
+    """
+    Call ``operation(i)`` for i in ``range(total)`` with ``concurrency`` workers.
+
+    Args:
+        operation: Async callable taking the request index (use it to make
+            requests unique so caches do not flatter the numbers)
+        concurrency: Number of concurrent workers
+        total: Total number of requests
+
+    Returns:
+        LoadResult with per-request latencies (failed requests count as errors)
+    """
+    counter = iter(range(total))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in counter:
+            start = time.perf_counter()
+            try:
+                await operation(index)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return LoadResult(
+        concurrency=concurrency,
+        requests=total,
+        errors=errors,
+        elapsed=time.perf_counter() - start,
+        latencies=latencies,
+    )
+
+
+def format_table(results: list[LoadResult]) -> str:
+    """Render load results as a fixed-width table."""
+    header = f"{'conc':>5} {'reqs':>6} {'errs':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        row = r.to_dict()
+        lines.append(
+            f"{row['concurrency']:>5} {row['requests']:>6} {row['errors']:>5} "
+            f"{row['throughput_rps']:>9.2f} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+# =============================================================================
+# Process & Event-Loop Metrics
+# =============================================================================
+
+class LoopLagMonitor:
+    """
+    Samples event-loop lag: how late a ``sleep(interval)`` wakes up.
+
+    Lag means some coroutine (JSON parsing, consensus maths, sync I/O) held
+    the loop; every other in-flight request waits that long.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def summary_ms(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        }
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux, bytes on macOS
+        return peak / 1024 / 1024 if peak > 1 << 30 else peak / 1024
+
+
+
+# On-disk stores the app configures from the environment
+DATA_DIR_VARS = ("LLM_CACHE_DIR", "EMBEDDING_CACHE_DIR", "MINHASH_INDEX_DIR", "FEEDBACK_INDEX_DIR")
+
+
+@contextmanager
+def scratch_data_dirs() -> Iterator[Path]:
+    """
+    Point the app's on-disk stores at a temporary directory for one run,
+    so a benchmark neither starts from warm caches nor writes into ``data/``.
+    """
+    saved = {name: os.environ.get(name) for name in DATA_DIR_VARS}
+    with tempfile.TemporaryDirectory(prefix="smartevaluator-bench-") as directory:
+        for name in DATA_DIR_VARS:
+            os.environ[name] = os.path.join(directory, name.lower())
+        try:
+            yield Path(directory)
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+# =============================================================================
+# History & Baseline
+# =============================================================================
+
+def append_history(path: Path, entry: dict) -> None:
+    """Append one benchmark run to a JSON-lines history file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, entry: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(entry, f, indent=2)
+
+
+def compare_to_baseline(levels: list[dict], baseline: dict, tolerance: float = 0.2) -> list[str]:
+    """
+    Compare per-concurrency results against a baseline run.
+
+    Args:
+        levels: Current ``to_dict()`` rows (plus any extra metrics)
+        baseline: A previously saved run (``{"levels": [...]}``)
+        tolerance: Allowed relative slowdown before a metric counts as a regression
+
+    Returns:
+        Human-readable regression descriptions (empty if none)
+    """
+    previous = {row["concurrency"]: row for row in baseline.get("levels", [])}
+    regressions = []
+    for row in levels:
+        base = previous.get(row["concurrency"])
+        if base is None:
+            continue
+        conc = row["concurrency"]
+        if base.get("throughput_rps") and row["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"c={conc}: throughput {row['throughput_rps']:.2f} rps < baseline {base['throughput_rps']:.2f}"
+            )
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if base.get(key) and row[key] > base[key] * (1 + tolerance):
+                regressions.append(f"c={conc}: {key} {row[key]:.1f} > baseline {base[key]:.1f}")
+        if row.get("errors", 0) > base.get("errors", 0):
+            regressions.append(f"c={conc}: errors {row['errors']} > baseline {base.get('errors', 0)}")
+    return regressions
@@ -0,0 +1,35 @@
+"""
+Shared Test Configuration
+=========================
+
+Points every on-disk store that the app configures from the environment
+at a throwaway directory, so test runs never write into the repo's
+``data/`` tree.
+"""
+
+import os
+import shutil
+import tempfile
+
+
+# Environment variable -> subdirectory of the throwaway data directory
+DATA_DIRS = {
+    "LLM_CACHE_DIR": "cache",
+    "EMBEDDING_CACHE_DIR": "embeddings",
+    "MINHASH_INDEX_DIR": "minhash",
+    "FEEDBACK_INDEX_DIR": "feedback",
+}
+
+_data_dir = None
+
+
+def pytest_configure(config):
+    global _data_dir
+    _data_dir = tempfile.mkdtemp(prefix="smartevaluator-tests-")
+    for name, subdir in DATA_DIRS.items():
+        os.environ[name] = os.path.join(_data_dir, subdir)
+
+
+def pytest_unconfigure(config):
+    if _data_dir is not None:
+        shutil.rmtree(_data_dir, ignore_errors=True)
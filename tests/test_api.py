@@ -9,6 +9,17 @@ import pytest
 from unittest.mock import patch, AsyncMock
 
 
+@pytest.fixture
+def app_state():
+    """``app.state`` of the FastAPI app, restored after the test."""
+    from backend.main import app
+    
+    saved = dict(app.state._state)
+    yield app.state
+    app.state._state.clear()
+    app.state._state.update(saved)
+
+
 class TestAPIStructure:
     """Tests for API structure and configuration."""
     
@@ -112,3 +123,93 @@ class TestResponseModels:
         assert response.final_grade == 85.5
         assert response.letter_grade == "B"
         assert len(response.agent_votes) == 1
+
+
+class TestEvaluateBenchmark:
+    """Smoke tests for the end-to-end /api/evaluate benchmark suite."""
+    
+    @pytest.mark.asyncio
+    async def test_benchmark_drives_evaluate_endpoint(self, app_state):
+        """Test the benchmark runs /api/evaluate in-process without errors."""
+        from backend.infra.standin import LatencyProfile, StandinProfile
+        from tests.benchmarks.bench_api import run_benchmark
+        
+        profile = StandinProfile(latency=LatencyProfile("fixed", 0), token_delay_ms=0)
+        rows = await run_benchmark("mock", levels=[2], requests_per_level=4, profile=profile)
+        
+        assert rows[0]["errors"] == 0
+        assert rows[0]["throughput_rps"] > 0
+        assert "p99_ms" in rows[0]["loop_lag"] and rows[0]["rss_mb"] > 0
+    
+    def test_baseline_comparison_flags_regressions(self):
+        """Test slowdowns beyond the tolerance are reported."""
+        from tests.benchmarks.harness import compare_to_baseline
+        
+        baseline = {"levels": [{"concurrency": 8, "throughput_rps": 100.0, "p50_ms": 50.0,
+                                "p95_ms": 80.0, "p99_ms": 100.0, "errors": 0}]}
+        steady = [{"concurrency": 8, "throughput_rps": 95.0, "p50_ms": 52.0,
+                   "p95_ms": 85.0, "p99_ms": 110.0, "errors": 0}]
+        slower = [{"concurrency": 8, "throughput_rps": 60.0, "p50_ms": 50.0,
+                   "p95_ms": 120.0, "p99_ms": 100.0, "errors": 0}]
+        
+        assert compare_to_baseline(steady, baseline, tolerance=0.2) == []
+        regressions = compare_to_baseline(slower, baseline, tolerance=0.2)
+        assert len(regressions) == 2
+        assert any("throughput" in r for r in regressions)
+
+
+class TestBatchEndpoints:
+    """Tests for the background batch evaluation endpoints."""
+    
+    @pytest.mark.asyncio
+    async def test_batch_submit_progress_and_results(self, app_state):
+        """Test a batch job can be submitted, polled and its results fetched."""
+        import httpx
+        from backend.main import app
+        from backend.swarm.batch import BatchEngine
+        from backend.swarm.orchestrator import MockSwarmCouncil
+        
+        app_state.batch_engine = BatchEngine(MockSwarmCouncil(), concurrency=4)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.post("/api/evaluate/batch", json=[
+                {"student_answer": f"Answer {i}", "teacher_id": "teacher_001"} for i in range(4)
+            ])
+            body = resp.json()
+            assert body["status"] == "processing" and body["total_items"] == 4
+            
+            await app_state.batch_engine.get(body["job_id"]).task
+            progress = (await client.get(f"/api/evaluate/batch/{body['job_id']}")).json()
+            results = (await client.get(f"/api/evaluate/batch/{body['job_id']}/results")).json()
+            missing = await client.get("/api/evaluate/batch/unknown")
+        
+        assert progress["status"] == "completed" and progress["completed"] == 4
+        assert len(results["results"]) == 4
+        assert missing.status_code == 404
+
+
+class TestTeacherFeedbackEndpoint:
+    """Tests for recording teacher-approved feedback."""
+    
+    @pytest.mark.asyncio
+    async def test_only_approved_feedback_is_recorded(self, monkeypatch):
+        """Test approved feedback joins the index once and empty text is rejected."""
+        import httpx
+        from backend.digital_twin import personality_loader
+        from backend.digital_twin.feedback_index import FeedbackIndex
+        from backend.main import app
+        from backend.vectors.embeddings import HashingEmbedder
+        from backend.vectors.service import EmbeddingService
+        
+        index = FeedbackIndex(None, embeddings=EmbeddingService(HashingEmbedder(dim=64), cache_dir=None))
+        monkeypatch.setattr(personality_loader, "_feedback_index", index)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            approved = await client.post("/api/teachers/t1/feedback", json={"feedback": "Cite the lab data."})
+            repeated = await client.post("/api/teachers/t1/feedback", json={"feedback": "Cite the lab data."})
+            empty = await client.post("/api/teachers/t1/feedback", json={"feedback": ""})
+        
+        assert approved.json() == {"teacher_id": "t1", "recorded": True}
+        assert repeated.json()["recorded"] is False
+        assert empty.status_code == 422
+        assert index.recent("t1") == ["Cite the lab data."]
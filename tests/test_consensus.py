@@ -9,6 +9,25 @@ import pytest
 import json
 import os
 
+import numpy as np
+
+from backend.digital_twin.consensus_engine import ConsensusEngine
+from backend.digital_twin.decision_maker import (
+    council_votes_to_arrays,
+    synthesize_grade,
+    synthesize_grades,
+)
+from backend.digital_twin.personality_loader import TeacherPersona
+from backend.swarm.orchestrator import AgentVote, CouncilVotes
+
+
+def _council(scores, confidences) -> CouncilVotes:
+    """Council votes with the given per-agent scores and confidences."""
+    return CouncilVotes(*(
+        AgentVote("Agent", "Role", float(s), float(c), "Feedback.", "Reasoning")
+        for s, c in zip(scores, confidences)
+    ))
+
 
 class TestConsensusMatrix:
     """Tests for consensus_matrix.json configuration."""
@@ -93,3 +112,133 @@ class TestConsensusMatrix:
         for agent_name, agent_config in agents.items():
             for field in required_fields:
                 assert field in agent_config, f"{agent_name} missing {field}"
+    
+    def test_tvca_penalty_weight(self, consensus_config):
+        """Test the TVCA internet-drift penalty is configured."""
+        weight = consensus_config["tvca"]["internet_penalty_weight"]
+        
+        assert 0.0 <= weight <= 1.0
+
+
+class TestConsensusEngine:
+    """Tests for the compiled, vectorised consensus engine."""
+    
+    @pytest.fixture
+    def matrix_path(self, tmp_path):
+        """Copy of the consensus matrix that tests can edit."""
+        source = os.path.join(os.path.dirname(__file__), "..", "config", "consensus_matrix.json")
+        path = tmp_path / "consensus_matrix.json"
+        with open(source, "r") as f:
+            path.write_text(f.read())
+        return path
+    
+    def test_weights_combine_mode_and_bias(self, matrix_path):
+        """Test mode weights are scaled by teacher bias and renormalised."""
+        engine = ConsensusEngine(matrix_path)
+        
+        strict = engine.weights("strict")
+        biased = engine.weights("strict", {"fact_weight": 0.1, "structure_weight": 0.3})
+        
+        assert np.allclose(strict, [0.50, 0.10, 0.25, 0.15])
+        assert np.isclose(biased.sum(), 1.0)
+        assert biased[0] < strict[0] and biased[1] > strict[1]
+        assert np.allclose(engine.weights("unknown"), engine.weights("balanced"))
+    
+    def test_veto_table_and_confidence_gating(self, matrix_path):
+        """Test the plagiarism veto zeroes the grade only on a confident security vote."""
+        engine = ConsensusEngine(matrix_path)
+        scores = np.array([
+            [80.0, 80.0, 80.0, 20.0],
+            [80.0, 80.0, 80.0, 0.0],
+            [80.0, 80.0, 80.0, 60.0],
+        ])
+        confidences = np.array([[0.9] * 4, [0.9, 0.9, 0.9, 0.0], [0.9] * 4])
+        
+        result = engine.score(scores, confidences)
+        
+        assert result.vetoed.tolist() == [True, False, False]
+        assert result.grades[0] == 0.0
+        assert result.grades[1] == pytest.approx(85.0)  # Unanimous pass bonus
+        assert result.plagiarism_flags.tolist() == [True, True, False]
+        assert result.ai_generated_flags.tolist() == [True, True, True]
+        assert result.messages(0) == [
+            "Academic integrity violation detected. Score set to 0.",
+            "AI-generated content flagged for manual review.",
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_cohort_matches_per_answer_path(self):
+        """Test synthesize_grades returns the grades synthesize_grade does."""
+        rng = np.random.default_rng(0)
+        scores = rng.uniform(0, 100, size=(200, 4))
+        confidences = rng.uniform(0, 1, size=(200, 4))
+        persona = TeacherPersona("t1", "Dr. Test", "Physics")
+        council = [_council(s, c) for s, c in zip(scores, confidences)]
+        
+        cohort = synthesize_grades(*council_votes_to_arrays(council)[:2], persona, "creative")
+        single = [await synthesize_grade(votes, persona, "creative") for votes in council]
+        
+        assert cohort.final_grades.tolist() == [r.final_grade for r in single]
+        assert cohort.letter_grades.tolist() == [r.letter_grade for r in single]
+        assert [cohort.consensus_method(i) for i in range(200)] == [r.consensus_method for r in single]
+    
+    @pytest.mark.asyncio
+    async def test_cohort_rounding_matches_per_answer_path(self):
+        """Test both paths round ties the same way (np.round gives 50.2 for 50.15)."""
+        persona = TeacherPersona("t1", "Dr. Test", "Physics")
+        council = [_council([grade] * 4, [1.0] * 4) for grade in (50.15, 50.45, 51.55, 77.35)]
+        
+        cohort = synthesize_grades(*council_votes_to_arrays(council)[:2], persona)
+        single = [await synthesize_grade(votes, persona) for votes in council]
+        
+        assert cohort.final_grades.tolist() == [r.final_grade for r in single]
+    
+    def test_hot_reload_applies_new_rules(self, matrix_path):
+        """Test editing the JSON recompiles the rule table."""
+        engine = ConsensusEngine(matrix_path, check_interval=0)
+        scores = np.array([[70.0, 70.0, 10.0, 90.0]])
+        before = engine.score(scores).grades[0]
+        
+        config = json.loads(matrix_path.read_text())
+        config["veto_rules"]["bluff_veto"]["enabled"] = True
+        matrix_path.write_text(json.dumps(config))
+        os.utime(matrix_path, (0, 0))
+        after = engine.score(scores).grades[0]
+        
+        assert engine.reloads == 2
+        assert after == pytest.approx(before * 0.5)
+    
+    def test_engine_and_tvca_penalty_follow_one_file(self, matrix_path, monkeypatch):
+        """Test an edit reaches the consensus engine and the TVCA penalty together."""
+        from backend import config as shared_config
+        from backend.vectors.triangulation import get_penalty_weight
+        
+        monkeypatch.setattr(shared_config, "_consensus_matrix", shared_config.ConfigFile(matrix_path, check_interval=0))
+        engine = ConsensusEngine.from_env()
+        scores = np.array([[70.0, 70.0, 10.0, 90.0]])
+        before = engine.score(scores).grades[0]
+        
+        config = json.loads(matrix_path.read_text())
+        config["veto_rules"]["bluff_veto"]["enabled"] = True
+        config["tvca"]["internet_penalty_weight"] = 0.8
+        matrix_path.write_text(json.dumps(config))
+        os.utime(matrix_path, (0, 0))
+        
+        assert get_penalty_weight() == 0.8
+        assert engine.score(scores).grades[0] == pytest.approx(before * 0.5)
+    
+    @pytest.mark.asyncio
+    async def test_synthesize_grade_uses_matrix_veto(self):
+        """Test synthesize_grade vetoes through the configured rule."""
+        def vote(score: float) -> AgentVote:
+            return AgentVote("Agent", "Role", score, 0.9, "Feedback.", "Reasoning")
+        
+        votes = CouncilVotes(vote(90), vote(90), vote(90), vote(10))
+        persona = TeacherPersona("t1", "Dr. Test", "Physics")
+        
+        result = await synthesize_grade(votes, persona, "strict")
+        
+        assert result.consensus_method == "veto"
+        assert result.final_grade == 0.0
+        assert result.plagiarism_flag and result.ai_generated_flag
+        assert result.teacher_feedback.startswith("Academic integrity violation detected.")
@@ -5,20 +5,31 @@ Digital Twin Tests
 Tests for the Teacher Persona and Decision Maker components.
 """
 
+import asyncio
+
+import numpy as np
 import pytest
 
+from backend.digital_twin.feedback_index import FeedbackIndex
+from backend.digital_twin.persona_cache import PersonaCache
+from backend.digital_twin.persona_store import PersonaStore
 from backend.digital_twin.personality_loader import (
     TeacherPersona,
     load_teacher_persona,
+    invalidate_teacher_persona,
     get_teacher_style_vector,
     get_past_feedback_examples,
 )
 from backend.digital_twin.decision_maker import (
     FinalEvaluation,
+    council_votes_to_arrays,
     synthesize_grade,
+    synthesize_grades,
     _score_to_letter,
 )
-from backend.swarm.orchestrator import MockSwarmCouncil
+from backend.swarm.orchestrator import AgentVote, CouncilVotes, MockSwarmCouncil
+from backend.vectors.embeddings import HashingEmbedder
+from backend.vectors.service import EmbeddingService
 
 
 class TestTeacherPersona:
@@ -84,6 +95,247 @@ class TestPersonaLoader:
         
         assert isinstance(feedback, list)
         assert len(feedback) == 3
+    
+    @pytest.mark.asyncio
+    async def test_load_teacher_persona_is_cached(self):
+        """Test repeated loads share one persona until it is invalidated."""
+        first = await load_teacher_persona("teacher_cached")
+        
+        assert await load_teacher_persona("teacher_cached") is first
+        invalidate_teacher_persona("teacher_cached")
+        assert await load_teacher_persona("teacher_cached") is not first
+    
+    @pytest.mark.asyncio
+    async def test_default_personas_are_not_stored(self, monkeypatch):
+        """Test unknown teachers get a default persona without growing the store."""
+        from backend.digital_twin import personality_loader
+        
+        store = PersonaStore(dim=personality_loader.STYLE_VECTOR_DIM)
+        monkeypatch.setattr(personality_loader, "_persona_store", store)
+        stored = await load_teacher_persona("teacher_known")
+        await personality_loader.update_teacher_persona(stored)
+        
+        persona = await load_teacher_persona("teacher_unknown")
+        similar = await personality_loader.find_similar_teachers("teacher_unknown")
+        
+        assert persona.name == "Teacher teacher_unknown"
+        assert len(store) == 1 and "teacher_unknown" not in store
+        assert [t for t, _ in similar] == ["teacher_known"]
+
+
+class TestPersonaStore:
+    """Tests for the array-backed persona store."""
+    
+    @staticmethod
+    def make_persona(teacher_id: str, vector, subject: str = "Physics") -> TeacherPersona:
+        return TeacherPersona(teacher_id, f"Dr. {teacher_id}", subject, style_vector=vector, pet_peeves=["Vague answers"])
+    
+    def test_personas_are_views_onto_the_matrix(self):
+        """Test style vectors live in the store matrix and detached personas keep defaults."""
+        store = PersonaStore(dim=4)
+        persona = store.put(self.make_persona("t1", [1, 0, 0, 0]))
+        
+        persona.style_vector = [0, 1, 0, 0]
+        view = store.get("t1")
+        
+        assert store.vectors.dtype == np.float32
+        assert store.vectors[0].tolist() == [0.0, 1.0, 0.0, 0.0]
+        assert view.style_vector == [0.0, 1.0, 0.0, 0.0]
+        assert view.to_dict()["pet_peeves"] == ["Vague answers"]
+        assert TeacherPersona("t2", "Dr. B", "Art").style_vector == []
+        with pytest.raises(AttributeError):
+            persona.extra = 1
+    
+    def test_similar_teachers(self):
+        """Test vectorised similarity search excludes the teacher and filters by subject."""
+        store = PersonaStore(dim=3)
+        store.put(self.make_persona("a", [1, 0, 0]))
+        store.put(self.make_persona("b", [0.9, 0.1, 0]))
+        store.put(self.make_persona("c", [0, 1, 0]))
+        store.put(self.make_persona("d", [0.8, 0.2, 0], subject="History"))
+        
+        similar = store.similar("a", k=2)
+        
+        assert [t for t, _ in similar] == ["b", "d"]
+        assert similar[0][1] > similar[1][1]
+        assert [t for t, _ in store.similar("a", k=5, subject="Physics")] == ["b", "c"]
+        assert store.similar("unknown") == []
+    
+    def test_save_and_memory_mapped_load(self, tmp_path):
+        """Test a saved store reloads memory-mapped and copies on first write."""
+        store = PersonaStore(dim=3)
+        store.put(self.make_persona("a", [1, 0, 0]))
+        store.put(self.make_persona("b", [0, 1, 0]))
+        store.save(tmp_path)
+        
+        loaded = PersonaStore.load(tmp_path)
+        assert loaded.get_stats()["memory_mapped"]
+        assert loaded.get("b") == store.get("b")
+        
+        loaded.put(self.make_persona("c", [0, 0, 1]))
+        loaded.get("a").style_vector = [0, 0, 1]
+        assert not loaded.get_stats()["memory_mapped"]
+        assert PersonaStore.load(tmp_path).get("a").style_vector == [1.0, 0.0, 0.0]
+        assert [t for t, _ in loaded.similar("c", k=1)] == ["a"]
+
+
+class TestFeedbackIndex:
+    """Tests for the per-teacher feedback index."""
+    
+    COMMENTS = [
+        "Your derivation of the quadratic formula skips the completing-the-square step.",
+        "Cite the primary sources on the French Revolution, not a textbook summary.",
+        "Good lab report, but the error bars on the pendulum graph are missing.",
+    ]
+    
+    @staticmethod
+    def make_index(directory) -> FeedbackIndex:
+        return FeedbackIndex(directory, embeddings=EmbeddingService(HashingEmbedder(dim=64), cache_dir=None))
+    
+    @pytest.mark.asyncio
+    async def test_search_returns_most_similar_comments(self, tmp_path):
+        """Test top-k retrieval is per teacher and duplicates are stored once."""
+        index = self.make_index(tmp_path)
+        
+        assert await index.add("t1", self.COMMENTS + [self.COMMENTS[0]]) == 3
+        assert await index.add("t1", [self.COMMENTS[1]]) == 0
+        matches = await index.search("t1", "pendulum graph error bars", k=2)
+        
+        assert matches[0].text == self.COMMENTS[2]
+        assert matches[0].similarity > matches[1].similarity
+        assert await index.search("t2", "pendulum graph error bars") == []
+        assert index.recent("t1", 1) == [self.COMMENTS[2]]
+    
+    @pytest.mark.asyncio
+    async def test_reopens_lazily_and_recovers_torn_append(self, tmp_path):
+        """Test a new index memory-maps stored comments and truncates a torn row."""
+        await self.make_index(tmp_path).add("t1", self.COMMENTS)
+        reopened = self.make_index(tmp_path)
+        assert reopened.get_stats()["teachers_open"] == 0
+        
+        (vectors_path,) = tmp_path.rglob("vectors.f32")
+        with open(vectors_path, "ab") as f:
+            f.write(b"\0" * 10)
+        matches = await reopened.search("t1", "French Revolution primary sources", k=1)
+        
+        assert matches[0].text == self.COMMENTS[1]
+        assert reopened.count("t1") == 3
+        assert vectors_path.stat().st_size == 3 * 64 * 4
+    
+    @pytest.mark.asyncio
+    async def test_workers_sharing_a_directory_stay_aligned(self, tmp_path):
+        """Test two indexes on one directory see each other's rows and keep files in step."""
+        first, second = self.make_index(tmp_path), self.make_index(tmp_path)
+        assert first.count("t1") == 0
+        
+        await first.add("t1", self.COMMENTS[:2])
+        assert await second.add("t1", self.COMMENTS) == 1  # Only the one first lacks
+        matches = await first.search("t1", "pendulum graph error bars", k=1)
+        
+        assert matches[0].text == self.COMMENTS[2]
+        assert second.recent("t1", 3) == self.COMMENTS[::-1]
+        (vectors_path,) = tmp_path.rglob("vectors.f32")
+        (comments_path,) = tmp_path.rglob("comments.jsonl")
+        assert vectors_path.stat().st_size == 3 * 64 * 4
+        assert len(comments_path.read_text().splitlines()) == 3
+    
+    @pytest.mark.asyncio
+    async def test_past_feedback_uses_query_and_pads_with_defaults(self, monkeypatch):
+        """Test get_past_feedback_examples ranks stored feedback and tops up short histories."""
+        from backend.digital_twin import personality_loader
+        
+        monkeypatch.setattr(personality_loader, "_feedback_index", self.make_index(None))
+        await personality_loader.get_feedback_index().add("t1", self.COMMENTS)
+        
+        examples = await get_past_feedback_examples("t1", n=5, query="quadratic formula derivation")
+        
+        assert len(examples) == 5
+        assert examples[0] == self.COMMENTS[0]
+        assert examples[3] == personality_loader.DEFAULT_FEEDBACK_EXAMPLES[0]
+
+
+class TestPersonaCache:
+    """Tests for the TTL/LRU persona cache."""
+    
+    @staticmethod
+    def make_loader(delay: float = 0.0):
+        calls = []
+        
+        async def loader(teacher_id: str):
+            calls.append(teacher_id)
+            await asyncio.sleep(delay)
+            if teacher_id == "broken":
+                raise RuntimeError("no such teacher")
+            return {"teacher_id": teacher_id, "version": len(calls)}
+        
+        return loader, calls
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        """Test single-flight loading and hit-rate accounting."""
+        loader, calls = self.make_loader(delay=0.01)
+        cache = PersonaCache(loader)
+        
+        personas = await asyncio.gather(*(cache.get("t1") for _ in range(10)))
+        await cache.get("t1")
+        stats = cache.get_stats()
+        
+        assert calls == ["t1"]
+        assert all(p is personas[0] for p in personas)
+        assert stats["hits"] == 1
+        assert stats["misses"] == 10
+        assert stats["load_latency_ms"]["count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_ttl_and_lru_eviction(self):
+        """Test expired entries reload and the least recently used is evicted."""
+        loader, calls = self.make_loader()
+        cache = PersonaCache(loader, ttl=60, max_entries=2)
+        await cache.get("a")
+        await cache.get("b")
+        await cache.get("a")  # "b" is now least recently used
+        await cache.get("c")
+        
+        assert len(cache) == 2
+        await cache.get("a")
+        await cache.get("b")
+        assert calls == ["a", "b", "c", "b"]
+        
+        cache.ttl = 0.0
+        cache.invalidate()
+        await cache.get("a")
+        await cache.get("a")
+        assert calls[-2:] == ["a", "a"]
+    
+    @pytest.mark.asyncio
+    async def test_invalidation_discards_in_flight_load(self):
+        """Test a load started before an invalidation is not cached."""
+        loader, calls = self.make_loader(delay=0.02)
+        cache = PersonaCache(loader)
+        
+        pending = asyncio.create_task(cache.get("t1"))
+        await asyncio.sleep(0.005)
+        cache.invalidate("t1")
+        stale = await pending
+        fresh = await cache.get("t1")
+        
+        assert stale["version"] == 1
+        assert fresh["version"] == 2
+        assert await cache.get("t1") is fresh
+    
+    @pytest.mark.asyncio
+    async def test_warm_up_skips_failures(self):
+        """Test warm-up preloads teachers and tolerates a failing one."""
+        loader, calls = self.make_loader()
+        cache = PersonaCache(loader)
+        
+        loaded = await cache.warm_up(["t1", "t2", "t1", "broken"])
+        
+        assert loaded == 2
+        assert len(cache) == 2
+        assert cache.get_stats()["load_failures"] == 1
+        await cache.get("t2")
+        assert cache.get_stats()["hits"] == 1
 
 
 class TestScoreConversion:
@@ -158,3 +410,47 @@ class TestGradeSynthesis:
         result = await synthesize_grade(votes, persona, "balanced")
         
         assert len(result.agent_votes) == 4
+    
+    @pytest.mark.asyncio
+    async def test_synthesize_grades_matches_per_answer(self):
+        """Test the batch API gives each answer the same result as synthesize_grade."""
+        def council(scores, confidence=0.9) -> CouncilVotes:
+            return CouncilVotes(*(
+                AgentVote("Agent", "Role", score, confidence, f"Comment {i}.", "Reasoning")
+                for i, score in enumerate(scores)
+            ))
+        
+        cohort = [
+            council([92, 88, 95, 90]),
+            council([70, 65, 40, 85]),
+            council([90, 90, 90, 15]),
+            council([55, 60, 50, 45]),
+            council([80, 70, 75, 0], confidence=0.0),
+        ]
+        persona = await load_teacher_persona("teacher_001")
+        scores, confidences, feedback = council_votes_to_arrays(cohort)
+        
+        batch = synthesize_grades(scores, confidences, persona, "strict", agent_feedback=feedback)
+        
+        for i, votes in enumerate(cohort):
+            single = await synthesize_grade(votes, persona, "strict")
+            assert batch.final_grades[i] == single.final_grade
+            assert batch.letter_grades[i] == single.letter_grade
+            assert batch.consensus_method(i) == single.consensus_method
+            assert bool(batch.plagiarism_flags[i]) == single.plagiarism_flag
+            assert bool(batch.ai_generated_flags[i]) == single.ai_generated_flag
+            assert batch.feedback(i) == single.teacher_feedback
+        # With no confident vote at all, every vote counts (and can veto)
+        assert batch.vetoed.tolist() == [False, False, True, False, True]
+    
+    def test_synthesize_grades_large_cohort(self):
+        """Test a 10k-answer block is scored as arrays."""
+        rng = np.random.default_rng(0)
+        scores = rng.uniform(0, 100, size=(10_000, 4))
+        
+        batch = synthesize_grades(scores, grading_mode="balanced")
+        
+        assert len(batch) == 10_000
+        assert set(batch.letter_grades.tolist()) <= {"A", "B", "C", "D", "F"}
+        assert (batch.final_grades[batch.vetoed] == 0).all()
+        assert isinstance(batch.feedback(0), str)
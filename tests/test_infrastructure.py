@@ -6,10 +6,11 @@ Tests for the Hybrid Router and infrastructure components.
 Uses mocks to avoid real network calls.
 """
 
+import httpx
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
-from backend.infra.router import HybridRouter, ModelType, CircuitBreaker
+from backend.infra.router import HybridRouter, ModelType, CircuitBreaker, CircuitState
 
 
 class TestCircuitBreaker:
@@ -26,6 +27,38 @@ class TestCircuitBreaker:
         cb = CircuitBreaker()
         assert cb.threshold == 3
         assert cb.recovery_timeout == 60
+    
+    def test_circuit_half_opens_after_recovery_timeout(self):
+        """Test an open circuit lets one probe through after the timeout."""
+        cb = CircuitBreaker(threshold=1, recovery_timeout=0)
+        cb.record_failure()
+        assert cb.is_open is True
+        
+        assert cb.allow_request() is True  # probe
+        assert cb.state == CircuitState.HALF_OPEN
+        assert cb.allow_request() is False  # only one probe at a time
+        
+        cb.record_success()
+        assert cb.state == CircuitState.CLOSED
+        assert cb.failure_count == 0
+    
+    def test_failed_probe_reopens_circuit(self):
+        """Test a failing half-open probe re-opens the circuit."""
+        cb = CircuitBreaker(threshold=3, recovery_timeout=0)
+        for _ in range(3):
+            cb.record_failure()
+        cb.allow_request()
+        cb.record_failure()
+        
+        assert cb.state == CircuitState.OPEN
+    
+    def test_open_circuit_rejects_before_timeout(self):
+        """Test an open circuit rejects calls until recovery_timeout elapses."""
+        cb = CircuitBreaker(threshold=1, recovery_timeout=60)
+        cb.record_failure()
+        
+        assert cb.allow_request() is False
+        assert cb.last_failure_time > 0
 
 
 class TestHybridRouter:
@@ -87,6 +120,48 @@ class TestHybridRouter:
             router._record_failure(ModelType.GEMINI)
         
         assert cb.is_open is True
+    
+    def test_fallback_order_prefers_fastest_backend(self):
+        """Test failover order follows rolling latency, not the static chain."""
+        router = HybridRouter()
+        for _ in range(10):
+            router._record_latency(ModelType.GEMINI, 2.0, ok=True)
+            router._record_latency(ModelType.CLAUDE, 0.5, ok=True)
+            router._record_latency(ModelType.OPENAI, 0.2, ok=True)
+        
+        order = router._fallback_order()
+        
+        assert order[:3] == [ModelType.OPENAI, ModelType.CLAUDE, ModelType.GEMINI]
+        assert order[3] == ModelType.LOCAL  # No samples yet
+    
+    def test_fallback_order_penalises_errors(self):
+        """Test a fast but failing backend ranks behind a healthy one."""
+        router = HybridRouter()
+        for i in range(10):
+            router._record_latency(ModelType.GEMINI, 0.4, ok=True)
+            router._record_latency(ModelType.CLAUDE, 0.3, ok=i % 2 == 0)
+        
+        order = router._fallback_order()
+        
+        assert order.index(ModelType.GEMINI) < order.index(ModelType.CLAUDE)
+    
+    @pytest.mark.asyncio
+    async def test_failover_records_and_recovers(self):
+        """Test failures fail over and a later success closes the circuit."""
+        router = HybridRouter()
+        router.cache.enabled = False
+        
+        async def flaky(model, prompt, system_prompt):
+            if model == ModelType.GEMINI:
+                raise RuntimeError("503")
+            return f"{model.value} ok"
+        
+        with patch.object(router, "_call_model", side_effect=flaky):
+            result = await router.route_request("p", "s", "gemini")
+        
+        assert result == "claude ok"
+        assert router.circuit_breakers[ModelType.GEMINI].failure_count == 1
+        assert router.get_stats()["backends"]["gemini"]["error_rate"] == 1.0
 
 
 class TestModelTypes:
@@ -99,3 +174,925 @@ class TestModelTypes:
         assert ModelType.OPENAI.value == "openai"
         assert ModelType.LOCAL.value == "local"
         assert ModelType.BERT.value == "bert"
+
+
+class TestConnectionPool:
+    """Tests for pooled per-backend HTTP clients."""
+    
+    def _pool(self, handler):
+        from backend.infra.pool import ConnectionPool, PoolConfig
+        configs = {"local": PoolConfig(base_url="http://ollama.test", max_connections=4)}
+        return ConnectionPool(configs=configs, transport=httpx.MockTransport(handler))
+    
+    @pytest.mark.asyncio
+    async def test_client_is_reused(self):
+        """Test the same client instance serves repeated calls."""
+        pool = self._pool(lambda request: httpx.Response(200, json={}))
+        
+        assert pool.client("local") is pool.client("local")
+        await pool.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_request_counts_and_stats(self):
+        """Test requests are tracked in pool stats."""
+        pool = self._pool(lambda request: httpx.Response(200, json={"models": []}))
+        
+        await pool.request("local", "GET", "/api/tags")
+        await pool.request("local", "GET", "/api/tags")
+        stats = pool.stats()["local"]
+        
+        assert stats["total_requests"] == 2
+        assert stats["in_flight"] == 0
+        assert stats["max_connections"] == 4
+        await pool.aclose()
+        assert pool.stats()["local"]["open"] is False
+    
+    @pytest.mark.asyncio
+    async def test_ollama_call_uses_pool(self):
+        """Test the Ollama call goes through the pooled client."""
+        from backend.infra.pool import ConnectionPool, PoolConfig
+        
+        def handler(request):
+            assert request.url.path == "/api/generate"
+            return httpx.Response(200, json={"response": "pooled"})
+        
+        router = HybridRouter()
+        router.pool = ConnectionPool(
+            configs={"local": PoolConfig(base_url="http://ollama.test")},
+            transport=httpx.MockTransport(handler),
+        )
+        
+        assert await router._call_ollama("prompt", "system") == "pooled"
+        assert router.get_stats()["pools"]["local"]["total_requests"] == 1
+        await router.aclose()
+
+
+class TestResponseCache:
+    """Tests for the two-tier LLM response cache."""
+    
+    def test_cache_key_is_content_addressed(self):
+        """Test identical requests share a key and different ones do not."""
+        from backend.infra.cache import make_cache_key
+        
+        assert make_cache_key("gemini", "p", "s") == make_cache_key("gemini", "p", "s")
+        assert make_cache_key("gemini", "p", "s") != make_cache_key("claude", "p", "s")
+        assert make_cache_key("gemini", "ab", "c") != make_cache_key("gemini", "a", "bc")
+    
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_memory_clear(self, tmp_path):
+        """Test entries are promoted back from disk after a memory flush."""
+        from backend.infra.cache import ResponseCache
+        
+        cache = ResponseCache(disk_dir=tmp_path)
+        await cache.set("k" * 64, "cached response")
+        cache.clear_memory()
+        
+        assert await cache.get("k" * 64) == "cached response"
+        assert await cache.get("k" * 64) == "cached response"
+        assert cache.stats.disk_hits == 1
+        assert cache.stats.memory_hits == 1
+    
+    def test_memory_lru_evicts_oldest(self):
+        """Test the in-process tier is size-bounded."""
+        from backend.infra.cache import MemoryLRU
+        
+        lru = MemoryLRU(max_entries=2)
+        lru.set("a", "1")
+        lru.set("b", "2")
+        lru.get("a")
+        lru.set("c", "3")
+        
+        assert lru.get("b") is None
+        assert lru.get("a") == "1"
+    
+    @pytest.mark.asyncio
+    async def test_route_request_hits_cache(self, tmp_path):
+        """Test identical requests call the backend once, unless bypassed."""
+        from backend.infra.cache import ResponseCache
+        
+        router = HybridRouter()
+        router.cache = ResponseCache(disk_dir=tmp_path)
+        
+        with patch.object(router, "_call_model", new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = '{"score": 80}'
+            first = await router.route_request("prompt", "system", "gemini")
+            second = await router.route_request("prompt", "system", "gemini")
+            await router.route_request("prompt", "system", "gemini", use_cache=False)
+        
+        assert first == second == '{"score": 80}'
+        assert mock_call.await_count == 2
+        assert router.get_stats()["cache"]["bypassed"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_route_request_records_serving_backend(self, tmp_path):
+        """Test cached entries name the backend that produced them."""
+        import json as jsonlib
+        from backend.infra.cache import ResponseCache, make_cache_key
+        
+        router = HybridRouter()
+        router.cache = ResponseCache(disk_dir=tmp_path)
+        
+        with patch.object(router, "_call_model", new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = '{"score": 80}'
+            await router.route_request("prompt", "system", "local")
+        
+        key = make_cache_key(f"local/{router.ollama_model}", "prompt", "system")
+        entry = jsonlib.loads((tmp_path / key[:2] / f"{key}.json").read_text())
+        assert entry["backend"] == "local"
+    
+    @pytest.mark.asyncio
+    async def test_changing_the_model_misses_the_cache(self, tmp_path):
+        """Test answers cached for one concrete model are not served for another."""
+        from backend.infra.cache import ResponseCache
+        
+        router = HybridRouter()
+        router.gemini_model = "gemini-old"
+        router.cache = ResponseCache(disk_dir=tmp_path)
+        
+        with patch.object(router, "_call_model", new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = '{"score": 80}'
+            await router.route_request("prompt", "system", "gemini")
+            router.gemini_model = "gemini-new"
+            router.cache = ResponseCache(disk_dir=tmp_path)  # Restarted with the new model
+            await router.route_request("prompt", "system", "gemini")
+            await router.route_request("prompt", "system", "gemini")
+        
+        assert mock_call.await_count == 2
+        assert len(list(tmp_path.rglob("*.json"))) == 2
+    
+    @pytest.mark.asyncio
+    async def test_placeholder_and_fallback_answers_are_not_cached(self, tmp_path):
+        """Test missing-key placeholders and fallback answers are never stored."""
+        from backend.infra.cache import ResponseCache
+        
+        router = HybridRouter()
+        router.gemini_key = ""
+        router.cache = ResponseCache(disk_dir=tmp_path)
+        
+        assert "placeholder" in await router.route_request("prompt", "system", "gemini")
+        
+        async def call(model, prompt, system_prompt):
+            if model == ModelType.CLAUDE:
+                raise RuntimeError("claude down")
+            return model.value
+        
+        with patch.object(router, "_call_model", side_effect=call):
+            fallback = await router.route_request("prompt", "system", "claude")
+        
+        assert fallback != "claude"
+        assert router.get_stats()["cache"]["writes"] == 0
+        assert not list(tmp_path.rglob("*.json"))
+
+
+class TestSingleFlight:
+    """Tests for concurrent request deduplication."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_are_coalesced(self):
+        """Test only the first identical in-flight call does the work."""
+        import asyncio
+        from backend.infra.singleflight import SingleFlight
+        
+        flight = SingleFlight()
+        calls = 0
+        
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+        
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+        
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert flight.stats.coalesced == 4
+        assert flight.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_callers(self):
+        """Test a failed call raises in every waiting caller."""
+        import asyncio
+        from backend.infra.singleflight import SingleFlight
+        
+        flight = SingleFlight()
+        
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+        
+        results = await asyncio.gather(
+            flight.do("key", work), flight.do("key", work), return_exceptions=True,
+        )
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+    
+    @pytest.mark.asyncio
+    async def test_work_is_cancelled_only_when_every_caller_leaves(self):
+        """Test a cancelled caller leaves shared work running, the last one cancels it."""
+        import asyncio
+        from backend.infra.singleflight import SingleFlight
+        
+        flight = SingleFlight()
+        started = asyncio.Event()
+        
+        async def work():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "result"
+        
+        first = asyncio.create_task(flight.do("shared", work))
+        second = asyncio.create_task(flight.do("shared", work))
+        await started.wait()
+        first.cancel()
+        assert await second == "result"
+        
+        started.clear()
+        alone = asyncio.create_task(flight.do("alone", work))
+        await started.wait()
+        (task,) = [f.task for f in flight._in_flight.values()]
+        alone.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await alone
+        await asyncio.sleep(0)
+        
+        assert task.cancelled()
+        assert flight.get_stats()["abandoned"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_route_request_coalesces_duplicates(self):
+        """Test concurrent identical route_request calls hit the backend once."""
+        import asyncio
+        
+        router = HybridRouter()
+        router.cache.enabled = False
+        
+        async def slow_call(model, prompt, system_prompt):
+            await asyncio.sleep(0.01)
+            return '{"score": 70}'
+        
+        with patch.object(router, "_call_model", side_effect=slow_call) as mock_call:
+            await asyncio.gather(*(router.route_request("same", "system") for _ in range(10)))
+        
+        assert mock_call.call_count == 1
+        assert router.get_stats()["singleflight"]["coalesced"] == 9
+    
+    @pytest.mark.asyncio
+    async def test_flights_are_split_by_priority_and_cache_use(self):
+        """Test batch, interactive and cache-bypassing calls never share a flight."""
+        import asyncio
+        from backend.infra.scheduler import Priority
+        
+        router = HybridRouter()
+        router.cache.enabled = True
+        router.cache.disk = None
+        
+        async def slow_call(model, prompt, system_prompt):
+            await asyncio.sleep(0.01)
+            return '{"score": 70}'
+        
+        with patch.object(router, "_call_model", side_effect=slow_call) as mock_call:
+            await asyncio.gather(
+                router.route_request("same", "system", priority=Priority.INTERACTIVE),
+                router.route_request("same", "system", priority=Priority.INTERACTIVE),
+                router.route_request("same", "system", priority=Priority.BATCH),
+                router.route_request("same", "system", priority=Priority.INTERACTIVE, use_cache=False),
+            )
+        
+        assert mock_call.call_count == 3
+        assert router.get_stats()["singleflight"]["coalesced"] == 1
+
+
+class TestRequestScheduler:
+    """Tests for token-bucket rate limiting and priority queuing."""
+    
+    def test_token_bucket_wait_time(self):
+        """Test an empty bucket reports the refill delay."""
+        from backend.infra.scheduler import TokenBucket
+        
+        bucket = TokenBucket(rate=10.0, capacity=1.0)
+        assert bucket.wait_time(1) == 0.0
+        bucket.take(1)
+        assert 0.0 < bucket.wait_time(1) <= 0.1
+    
+    @pytest.mark.asyncio
+    async def test_interactive_jumps_ahead_of_batch(self):
+        """Test queued interactive work is granted before queued batch work."""
+        import asyncio
+        from backend.infra.scheduler import Priority, RateLimit, RequestScheduler
+        
+        scheduler = RequestScheduler(limits={
+            "local": RateLimit(requests_per_second=0, tokens_per_minute=0, max_concurrent=1),
+        })
+        order = []
+        
+        async def job(name, priority):
+            async with scheduler.slot("local", 10, priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+        
+        first = asyncio.create_task(job("first", Priority.BATCH))
+        await asyncio.sleep(0)
+        batch = asyncio.create_task(job("batch", Priority.BATCH))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(job("interactive", Priority.INTERACTIVE))
+        await asyncio.gather(first, batch, interactive)
+        
+        assert order == ["first", "interactive", "batch"]
+        assert scheduler.get_stats()["backends"]["local"]["admitted"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_bounded_queue_rejects_and_sheds(self):
+        """Test a full queue rejects work and drives admission control."""
+        import asyncio
+        from backend.infra.scheduler import Priority, QueueFullError, RateLimit, RequestScheduler
+        
+        scheduler = RequestScheduler(limits={
+            "local": RateLimit(requests_per_second=0, tokens_per_minute=0, max_concurrent=1, max_queue=1),
+        })
+        release = asyncio.Event()
+        
+        async def hold():
+            async with scheduler.slot("local", 1):
+                await release.wait()
+        
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        
+        assert scheduler.should_shed(Priority.BATCH) is True
+        with pytest.raises(QueueFullError):
+            async with scheduler.slot("local", 1):
+                pass
+        
+        release.set()
+        await asyncio.gather(holder, waiter)
+        assert scheduler.get_stats()["backends"]["local"]["rejected"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_shedding_is_decided_per_target_lane(self):
+        """Test one full lane sheds work queued on it, not work elsewhere."""
+        import asyncio
+        from backend.infra.scheduler import Priority, RateLimit, RequestScheduler
+        
+        scheduler = RequestScheduler(limits={
+            "local": RateLimit(requests_per_second=0, tokens_per_minute=0, max_concurrent=1, max_queue=2),
+            "claude": RateLimit(requests_per_second=0, tokens_per_minute=0, max_concurrent=1, max_queue=100),
+        }, shed_batch_ratio=0.5, shed_interactive_ratio=0.9)
+        release = asyncio.Event()
+        
+        async def hold():
+            async with scheduler.slot("local", 1):
+                await release.wait()
+        
+        tasks = [asyncio.create_task(hold()) for _ in range(2)]
+        await asyncio.sleep(0)
+        
+        # 1 queued of a combined capacity of 102 would never shed in total
+        assert scheduler.should_shed(Priority.BATCH, ["local", "bert"]) is True
+        assert scheduler.should_shed(Priority.INTERACTIVE, ["local"]) is False
+        assert scheduler.should_shed(Priority.BATCH, ["claude", "bert"]) is False
+        assert scheduler.should_shed(Priority.BATCH) is True
+        
+        release.set()
+        await asyncio.gather(*tasks)
+    
+    @pytest.mark.asyncio
+    async def test_polling_does_not_count_as_shedding(self):
+        """Test is_shedding has no side effects; should_shed counts each rejected request."""
+        import asyncio
+        from backend.infra.scheduler import Priority, RateLimit, RequestScheduler
+        
+        scheduler = RequestScheduler(limits={
+            "local": RateLimit(requests_per_second=0, tokens_per_minute=0, max_concurrent=1, max_queue=1),
+        })
+        release = asyncio.Event()
+        
+        async def hold():
+            async with scheduler.slot("local", 1):
+                await release.wait()
+        
+        tasks = [asyncio.create_task(hold()) for _ in range(2)]
+        await asyncio.sleep(0)
+        
+        assert all(scheduler.is_shedding(Priority.BATCH) for _ in range(10))
+        assert scheduler.get_stats()["shed"] == 0
+        assert scheduler.should_shed(Priority.INTERACTIVE) is True
+        assert scheduler.get_stats()["shed"] == 1
+        
+        release.set()
+        await asyncio.gather(*tasks)
+
+
+class TestHedging:
+    """Tests for hedged requests across backends."""
+    
+    def _router(self):
+        from backend.infra.hedging import HedgeBudget, HedgePolicy
+        
+        router = HybridRouter()
+        router.cache.enabled = False
+        router.hedge_policy = HedgePolicy(enabled=True, default_delay=0.01, max_extra_load=1.0)
+        router.hedge_budget = HedgeBudget(router.hedge_policy)
+        return router
+    
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_and_cancelled(self):
+        """Test the backup answers first and the slow primary is cancelled."""
+        import asyncio
+        
+        router = self._router()
+        cancelled = []
+        
+        async def call(model, prompt, system_prompt):
+            if model == ModelType.GEMINI:
+                try:
+                    await asyncio.sleep(1.0)
+                except asyncio.CancelledError:
+                    cancelled.append(model)
+                    raise
+            return model.value
+        
+        with patch.object(router, "_call_model", side_effect=call):
+            result = await router.route_request("p", "s", "gemini")
+            await asyncio.sleep(0)
+        
+        assert result == "claude"
+        assert cancelled == [ModelType.GEMINI]
+        stats = router.get_stats()["hedging"]
+        assert stats["hedges_sent"] == 1
+        assert stats["hedge_wins"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        """Test no hedge is sent when the primary answers in time."""
+        router = self._router()
+        router.hedge_policy.default_delay = 1.0
+        
+        with patch.object(router, "_call_model", new_callable=AsyncMock) as mock_call:
+            mock_call.return_value = "fast"
+            assert await router.route_request("p", "s", "gemini") == "fast"
+        
+        assert mock_call.await_count == 1
+        assert router.get_stats()["hedging"]["hedges_sent"] == 0
+    
+    def test_budget_caps_extra_load(self):
+        """Test hedges are limited to a fraction of requests."""
+        from backend.infra.hedging import HedgeBudget, HedgePolicy
+        
+        budget = HedgeBudget(HedgePolicy(max_extra_load=0.1))
+        budget.tokens = 0.0
+        sent = 0
+        for _ in range(100):
+            budget.on_request()
+            sent += budget.try_spend()
+        
+        assert sent <= 10
+        assert budget.budget_denied > 0
+
+
+class TestStreaming:
+    """Tests for token streaming and incremental JSON parsing."""
+    
+    def test_scanner_completes_on_closing_brace(self):
+        """Test the scanner ignores braces inside strings and preambles."""
+        from backend.infra.streaming import JsonObjectScanner
+        
+        scanner = JsonObjectScanner()
+        assert scanner.feed('Sure! {"score": 8') is False
+        assert scanner.partial() == {}
+        assert scanner.feed('5, "feedback": "use {braces}"') is False
+        assert scanner.partial() == {"score": 85, "feedback": "use {braces}"}
+        assert scanner.feed('} trailing text') is True
+        assert scanner.result() == {"score": 85, "feedback": "use {braces}"}
+    
+    @pytest.mark.asyncio
+    async def test_stream_json_stops_at_object_end(self):
+        """Test Ollama streaming stops once the score object is complete."""
+        import json as jsonlib
+        from backend.infra.pool import ConnectionPool, PoolConfig
+        
+        tokens = ['{"score": ', '72', ', "confidence": 0.9', '}', ' extra', ' tokens']
+        body = "\n".join(jsonlib.dumps({"response": t, "done": False}) for t in tokens)
+        
+        def handler(request):
+            assert jsonlib.loads(request.content)["stream"] is True
+            return httpx.Response(200, content=body.encode())
+        
+        router = HybridRouter()
+        router.cache.enabled = False
+        router.pool = ConnectionPool(
+            configs={"local": PoolConfig(base_url="http://ollama.test")},
+            transport=httpx.MockTransport(handler),
+        )
+        partials = []
+        
+        result = await router.stream_json("p", "s", "local", on_partial=partials.append)
+        
+        assert jsonlib.loads(result) == {"score": 72, "confidence": 0.9}
+        assert partials[0] == {"score": 72}
+        stats = router.get_stats()["streaming"]["local"]
+        assert stats["early_terminations"] == 1
+        assert stats["ttft_ms"]["count"] == 1
+        await router.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_stream_json_shares_cache_and_flights(self):
+        """Test streams are coalesced, cached, bypassable and credited to the serving backend."""
+        import asyncio
+        
+        router = HybridRouter()
+        router.cache.disk = None
+        streams = []
+        
+        async def fake_stream(model, prompt, system_prompt):
+            streams.append(model)
+            if model == ModelType.CLAUDE:
+                raise RuntimeError("claude down")
+            await asyncio.sleep(0.01)
+            for token in ('{"score": ', '70}', ' extra'):
+                yield token
+        
+        with patch.object(router, "_stream_model", side_effect=fake_stream):
+            results = await asyncio.gather(*(router.stream_json("p", "s", "local") for _ in range(3)))
+            cached = await router.stream_json("p", "s", "local")
+            await router.stream_json("p", "s", "local", use_cache=False)
+            fallback = await router.stream_json("q", "s", "claude")
+        
+        assert results == [cached] * 3 and cached == '{"score": 70}'
+        assert fallback == '{"score": 70}'
+        assert streams[:2] == [ModelType.LOCAL, ModelType.LOCAL] and streams[2] == ModelType.CLAUDE
+        stats = router.get_stats()
+        terminations = {name: b["early_terminations"] for name, b in stats["streaming"].items()}
+        assert terminations["claude"] == 0 and terminations[streams[3].value] >= 1
+        assert sum(terminations.values()) == 3
+        assert stats["cache"]["writes"] == 1  # The fallback answer is not cached
+    
+    @pytest.mark.asyncio
+    async def test_agents_surface_partial_results(self):
+        """Test agents forward partial fields to the caller's callback."""
+        from backend.swarm.agents import StructureAgent
+        
+        router = HybridRouter()
+        router.cache.enabled = False
+        seen = []
+        
+        async def fake_stream(model, prompt, system_prompt):
+            for chunk in ['{"score": 64,', ' "feedback": "ok"}']:
+                yield chunk
+        
+        with patch.object(router, "_stream_model", side_effect=fake_stream):
+            vote = await StructureAgent(router).evaluate(
+                "An answer.", on_partial=lambda name, fields: seen.append((name, fields)),
+            )
+        
+        assert vote.score == 64
+        assert seen[0] == ("StructureAnalyzer", {"score": 64})
+
+
+class TestHealthMonitor:
+    """Tests for parallel, TTL-cached backend health checks."""
+    
+    @pytest.mark.asyncio
+    async def test_probes_run_concurrently_with_latency(self):
+        """Test all backends are probed in parallel and latency is recorded."""
+        import asyncio
+        import time
+        from backend.infra.health import HealthMonitor
+        
+        async def slow_ok():
+            await asyncio.sleep(0.05)
+            return True
+        
+        async def broken():
+            raise ConnectionError("refused")
+        
+        monitor = HealthMonitor(probes={"a": slow_ok, "b": slow_ok, "c": slow_ok, "d": broken})
+        start = time.monotonic()
+        snapshot = await monitor.refresh()
+        
+        assert time.monotonic() - start < 0.15
+        assert snapshot.is_ok("a") and not snapshot.is_ok("d")
+        assert snapshot.backends["a"].latency_ms >= 40
+        assert snapshot.backends["d"].error == "refused"
+    
+    @pytest.mark.asyncio
+    async def test_snapshot_is_cached_until_ttl(self):
+        """Test reads within the TTL do not re-probe."""
+        from backend.infra.health import HealthMonitor
+        
+        calls = 0
+        
+        async def probe():
+            nonlocal calls
+            calls += 1
+            return True
+        
+        monitor = HealthMonitor(probes={"local": probe}, ttl=60)
+        await monitor.get_snapshot()
+        await monitor.get_snapshot()
+        
+        assert calls == 1
+        
+        monitor.ttl = 0
+        await monitor.get_snapshot()
+        assert calls == 2
+    
+    @pytest.mark.asyncio
+    async def test_background_refresh_detects_restart(self):
+        """Test the background loop picks up a backend coming back."""
+        import asyncio
+        from backend.infra.health import HealthMonitor
+        
+        state = {"up": False}
+        
+        async def probe():
+            return state["up"]
+        
+        monitor = HealthMonitor(probes={"local": probe}, interval=0.01, ttl=60)
+        await monitor.start()
+        assert monitor.snapshot.is_ok("local") is False
+        
+        state["up"] = True
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        
+        assert monitor.snapshot.is_ok("local") is True
+    
+    @pytest.mark.asyncio
+    async def test_router_health_reads_snapshot(self):
+        """Test router health calls use the monitor instead of probing each time."""
+        router = HybridRouter()
+        probe = AsyncMock(return_value=True)
+        router.health_monitor.probes = {"local": probe, "gemini": probe}
+        
+        assert await router.is_local_available() is True
+        health = await router.health_check()
+        
+        assert health == {"local": True, "gemini": True}
+        assert probe.await_count == 2  # One snapshot, two backends
+
+
+class TestStandinServer:
+    """Tests for the local stand-in LLM backends and benchmark harness."""
+    
+    @pytest.mark.asyncio
+    async def test_router_calls_every_protocol(self):
+        """Test the router's real HTTP calls parse each stand-in protocol."""
+        from backend.infra.standin import LatencyProfile, StandinProfile, StandinServer
+        
+        fast = StandinProfile(latency=LatencyProfile("fixed", 0), token_delay_ms=0, trailing_tokens=2)
+        server = StandinServer(profiles={name: fast for name in ("local", "gemini", "claude", "openai")})
+        router = HybridRouter()
+        server.attach(router)
+        router.cache.enabled = False
+        
+        for model in (ModelType.LOCAL, ModelType.GEMINI, ModelType.CLAUDE, ModelType.OPENAI):
+            text = await router._call_model(model, "prompt", "system")
+            assert "[STANDIN]" in text
+        
+        health = await router.health_check()
+        await router.aclose()
+        
+        assert all(health.values())
+        assert server.stats["claude"].requests == 1
+    
+    @pytest.mark.asyncio
+    async def test_injected_errors_fail_over(self):
+        """Test a failing stand-in backend trips failover to the next one."""
+        from backend.infra.standin import LatencyProfile, StandinProfile, StandinServer
+        
+        fast = StandinProfile(latency=LatencyProfile("fixed", 0), token_delay_ms=0)
+        server = StandinServer(profiles={
+            "gemini": StandinProfile(latency=LatencyProfile("fixed", 0), rate_limit_rate=1.0),
+            "claude": fast, "openai": fast, "local": fast,
+        })
+        router = HybridRouter()
+        server.attach(router)
+        router.cache.enabled = False
+        
+        text = await router.route_request("prompt", "system", preferred_model="gemini")
+        await router.aclose()
+        
+        assert "[STANDIN]" in text
+        assert server.stats["gemini"].rate_limited == 1
+        assert router.circuit_breakers[ModelType.GEMINI].failure_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_harness_reports_percentiles(self):
+        """Test the load harness counts errors and honours concurrency."""
+        import asyncio
+        from tests.benchmarks.harness import run_load
+        
+        active = peak = 0
+        
+        async def operation(index: int):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if index == 0:
+                raise RuntimeError("boom")
+        
+        result = await run_load(operation, concurrency=4, total=20)
+        
+        assert peak == 4
+        assert result.errors == 1 and len(result.latencies) == 19
+        assert result.to_dict()["p50_ms"] >= 10
+
+
+class TestMicroBatcher:
+    """Tests for the size/time-windowed request collector."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_items_share_one_batch(self):
+        """Test items submitted within the window are handled together."""
+        import asyncio
+        from backend.infra.microbatch import MicroBatcher
+        
+        batches = []
+        
+        async def handler(items):
+            batches.append(list(items))
+            return [item * 10 for item in items]
+        
+        batcher = MicroBatcher(handler, max_batch_size=3, max_wait=0.01)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        
+        assert results == [0, 10, 20, 30, 40]
+        assert batches == [[0, 1, 2], [3, 4]]  # Size flush, then window flush
+        assert batcher.get_stats()["mean_batch_size"] == 2.5
+    
+    @pytest.mark.asyncio
+    async def test_errors_fan_out_to_callers(self):
+        """Test a failing handler fails every caller, per-item errors only one."""
+        import asyncio
+        from backend.infra.microbatch import MicroBatcher
+        
+        async def handler(items):
+            if len(items) == 1:
+                raise RuntimeError("backend down")
+            return [ValueError("bad item") if item == "bad" else item for item in items]
+        
+        batcher = MicroBatcher(handler, max_batch_size=2, max_wait=0.01)
+        good, bad = await asyncio.gather(batcher.submit("good"), batcher.submit("bad"), return_exceptions=True)
+        
+        assert good == "good" and isinstance(bad, ValueError)
+        with pytest.raises(RuntimeError):
+            await batcher.submit("alone")
+    
+    @pytest.mark.asyncio
+    async def test_batch_runs_at_highest_member_priority(self):
+        """Test a batch opened by batch work still runs interactive when one joins."""
+        import asyncio
+        from backend.infra.microbatch import MicroBatcher
+        from backend.infra.scheduler import REQUEST_PRIORITY, Priority
+        
+        seen = []
+        
+        async def handler(items):
+            seen.append(REQUEST_PRIORITY.get())
+            return items
+        
+        async def submit(item, priority):
+            REQUEST_PRIORITY.set(priority)
+            return await batcher.submit(item)
+        
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait=0.01)
+        await asyncio.gather(submit("cohort", Priority.BATCH), submit("live", Priority.INTERACTIVE))
+        await submit("cohort", Priority.BATCH)
+        
+        assert seen == [Priority.INTERACTIVE, Priority.BATCH]
+
+
+class TestPrefixReuse:
+    """Tests for provider-side reuse of the shared system prompt + reference prefix."""
+    
+    @pytest.mark.asyncio
+    async def test_every_backend_reuses_a_stable_prefix(self):
+        """Test Ollama context, Gemini cachedContents, Claude cache_control and OpenAI caching."""
+        from backend.infra.standin import LatencyProfile, StandinProfile, StandinServer
+        
+        fast = StandinProfile(latency=LatencyProfile("fixed", 0), token_delay_ms=0, trailing_tokens=0)
+        server = StandinServer(profiles={name: fast for name in ("local", "gemini", "claude", "openai")})
+        router = HybridRouter()
+        server.attach(router)
+        system_prompt = "Grade fairly.\n" + "Reference material sentence. " * 200  # ~1.5k tokens
+        
+        for model in (ModelType.LOCAL, ModelType.GEMINI, ModelType.CLAUDE, ModelType.OPENAI):
+            for student in range(2):
+                text = await router._call_model(model, f"Answer {student}", system_prompt)
+                assert "[STANDIN]" in text
+        await router.aclose()
+        
+        stats = router.get_stats()["prefix"]["backends"]
+        assert stats["local"]["reused"] == 2  # Primed once, reused by both calls
+        assert stats["gemini"]["reused"] == 2
+        assert stats["claude"]["reused"] == 1  # First call writes the cache
+        assert stats["openai"]["reused"] == 1
+        assert router.prefix_tokens_saved() > 4 * 1000
+        assert router.prefix_cache.created == 2  # One Ollama context, one Gemini cache
+    
+    @pytest.mark.asyncio
+    async def test_small_prefixes_are_sent_inline(self):
+        """Test prompts below the provider minimum skip prefix caching."""
+        from backend.infra.standin import StandinServer, StandinProfile, LatencyProfile
+        
+        fast = StandinProfile(latency=LatencyProfile("fixed", 0), token_delay_ms=0)
+        server = StandinServer(profiles={"local": fast})
+        router = HybridRouter()
+        server.attach(router)
+        
+        payload = await router._ollama_payload("Answer", "Short system prompt", stream=False)
+        await router.aclose()
+        
+        assert "context" not in payload
+        assert payload["prompt"].startswith("Short system prompt")
+        assert router.prefix_stats[ModelType.LOCAL].requests == 0
+    
+    @pytest.mark.asyncio
+    async def test_agents_put_reference_in_the_shared_prefix(self):
+        """Test the reference goes to the system prompt and not the per-student prompt."""
+        from backend.swarm.agents import FactCheckerAgent
+        
+        router = HybridRouter()
+        agent = FactCheckerAgent(router)
+        calls = []
+        
+        async def fake_route(prompt, system_prompt, preferred_model="gemini", **kwargs):
+            calls.append((prompt, system_prompt))
+            return '{"score": 80, "confidence": 0.9, "feedback": "ok", "reasoning": "r"}'
+        
+        with patch.object(router, "route_request", side_effect=fake_route):
+            await agent.evaluate("Answer one", pdf_context="THE REFERENCE")
+            await agent.evaluate("Answer two", pdf_context="THE REFERENCE")
+        
+        (prompt_a, system_a), (prompt_b, system_b) = calls
+        assert system_a == system_b and "THE REFERENCE" in system_a
+        assert "THE REFERENCE" not in prompt_a and "Answer one" in prompt_a
+
+
+class TestInferenceService:
+    """Tests for the local AI-detection service behind the bert backend."""
+    
+    UNIFORM = ("Photosynthesis is a vital process for plants. It converts light energy into chemical energy. "
+               "This energy is stored in glucose molecules. The process occurs in the chloroplasts. "
+               "It also releases oxygen into the atmosphere. This makes it essential for life on Earth.")
+    VARIED = ("Plants eat light, basically. When sunlight hits the chloroplasts, a whole chain of reactions "
+              "kicks off that ends with sugar being made out of carbon dioxide and water. Cool. My teacher "
+              "said it's why we can breathe, though the dark reactions still confuse me.")
+    
+    @pytest.mark.asyncio
+    async def test_requests_batched_by_length_bucket(self):
+        """Test concurrent answers of similar length share batches, long ones batch apart."""
+        import asyncio
+        from backend.infra.inference import InferenceService
+        
+        service = InferenceService(workers=0, buckets=(64, 512), max_batch_size=8)
+        texts = ["Short answer one."] * 4 + [self.UNIFORM * 20] * 2
+        
+        results = await asyncio.gather(*(service.score(t) for t in texts))
+        
+        buckets = service.get_stats()["buckets"]
+        assert buckets["<=64"] == {"batches": 1, "mean_batch_size": 4.0}
+        assert buckets[">512"] == {"batches": 1, "mean_batch_size": 2.0}
+        assert all(set(r) >= {"ai_likelihood", "perplexity", "burstiness"} for r in results)
+    
+    @pytest.mark.asyncio
+    async def test_statistical_detector_flags_but_never_vetoes(self):
+        """Test even sentence lengths raise AI-likelihood, capped below the veto range."""
+        from backend.infra.inference import STATISTICAL_MAX_LIKELIHOOD, InferenceService
+        
+        service = InferenceService(workers=0)
+        uniform, varied = await service.score(self.UNIFORM), await service.score(self.VARIED)
+        
+        assert uniform["burstiness"] < varied["burstiness"]
+        assert varied["ai_likelihood"] < uniform["ai_likelihood"] <= STATISTICAL_MAX_LIKELIHOOD
+        assert (await service.score("Too short."))["ai_likelihood"] == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_process_pool_serves_bert_backend(self):
+        """Test the bert model type scores text in a worker process."""
+        import json
+        
+        router = HybridRouter()
+        router.inference.workers = 1
+        try:
+            result = json.loads(await router._call_model(ModelType.BERT, self.UNIFORM, ""))
+        finally:
+            await router.aclose()
+        
+        assert result["model"] == "statistical" and result["tokens"] > 0
+        stats = router.get_stats()["inference"]
+        assert stats["answers"] == 1 and stats["answers_per_core_second"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_benchmark_reports_per_core_throughput(self):
+        """Test the inference benchmark runs in-process."""
+        from tests.benchmarks.bench_inference import run_benchmark
+        
+        rows = await run_benchmark(answers=50, workers=[0])
+        
+        assert rows[0]["answers_per_s"] > 0 and rows[0]["backend"] == "statistical"
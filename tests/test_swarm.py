@@ -80,3 +80,227 @@ async def test_parallel_execution():
     
     # Should complete in ~100ms (parallel), not 400ms (sequential)
     assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_batch_job_runs_with_bounded_concurrency():
+    """Test a batch job grades every item at batch priority within its worker limit."""
+    from backend.infra.scheduler import REQUEST_PRIORITY, Priority
+    from backend.swarm.batch import BatchEngine, JobStatus
+    
+    swarm = MockSwarmCouncil()
+    active = peak = 0
+    priorities = []
+    original = swarm.gather_council_votes
+    
+    async def tracked(*args, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        priorities.append(REQUEST_PRIORITY.get())
+        try:
+            return await original(*args, **kwargs)
+        finally:
+            active -= 1
+    
+    swarm.gather_council_votes = tracked
+    engine = BatchEngine(swarm, concurrency=3)
+    items = [{"student_answer": f"Answer {i}", "teacher_id": "teacher_001"} for i in range(7)]
+    job = engine.submit(items)
+    await job.task
+    
+    progress = job.progress()
+    assert job.status == JobStatus.COMPLETED
+    assert progress["completed"] == 7 and progress["eta_seconds"] == 0.0
+    assert peak == 3
+    assert set(priorities) == {Priority.BATCH}
+    assert [r["index"] for r in job.partial_results()["results"]] == list(range(7))
+
+
+@pytest.mark.asyncio
+async def test_batch_job_cancel_keeps_partial_results():
+    """Test cancelling a job stops workers but keeps finished results."""
+    from backend.swarm.batch import BatchEngine, JobStatus
+    
+    engine = BatchEngine(MockSwarmCouncil(), concurrency=2)
+    items = [{"student_answer": f"Answer {i}", "teacher_id": "teacher_001"} for i in range(10)]
+    job = engine.submit(items)
+    await asyncio.sleep(0.15)  # Mock council takes 100 ms per item
+    
+    await engine.cancel(job.job_id)
+    
+    assert job.status == JobStatus.CANCELLED
+    assert 0 < len(job.results) < 10
+    assert job.partial_results()["results"][0]["result"]["letter_grade"]
+
+
+@pytest.mark.asyncio
+async def test_structure_agent_batches_concurrent_answers():
+    """Test concurrent structure analyses share one multi-answer local prompt."""
+    import json
+    from backend.infra.router import HybridRouter
+    from backend.swarm.agents import StructureAgent
+    
+    router = HybridRouter()
+    router.cache.enabled = False
+    prompts = []
+    
+    async def fake_route(prompt, system_prompt, preferred_model="gemini", **kwargs):
+        prompts.append(prompt)
+        results = [{"index": i, "score": 60 + i, "confidence": 0.9, "feedback": "ok", "reasoning": "r"}
+                   for i in (3, 1, 2)]  # Out of order on purpose
+        return "Here you go:\n" + json.dumps(results)
+    
+    agent = StructureAgent(router)
+    with patch.object(router, "route_request", side_effect=fake_route):
+        votes = await asyncio.gather(*(agent.evaluate(f"Answer {i}") for i in range(3)))
+    
+    assert len(prompts) == 1 and "STUDENT ANSWER 3" in prompts[0]
+    assert [v.score for v in votes] == [61, 62, 63]
+
+
+@pytest.mark.asyncio
+async def test_structure_agent_batch_falls_back_to_single_calls():
+    """Test an unusable batched response is retried answer by answer."""
+    from backend.infra.router import HybridRouter
+    from backend.swarm.agents import StructureAgent
+    
+    router = HybridRouter()
+    router.cache.enabled = False
+    
+    async def fake_route(prompt, system_prompt, preferred_model="gemini", **kwargs):
+        if "STUDENT ANSWER 1" in prompt:
+            return '{"score": 10}'  # Not an array
+        return '{"score": 70, "confidence": 0.8, "feedback": "single", "reasoning": "r"}'
+    
+    agent = StructureAgent(router)
+    with patch.object(router, "route_request", side_effect=fake_route):
+        votes = await asyncio.gather(agent.evaluate("First"), agent.evaluate("Second"))
+    
+    assert [v.score for v in votes] == [70, 70]
+    assert agent.batch_fallbacks == 1
+
+
+@pytest.mark.asyncio
+async def test_retrieved_context_keeps_system_prompt_shared():
+    """Test per-answer excerpts go into the user prompt, so the system prompt stays identical."""
+    from backend.infra.router import HybridRouter
+    from backend.swarm.orchestrator import SwarmCouncil
+    from backend.vectors.retrieval import ReferenceRetriever
+    
+    topics = ["photosynthesis", "mitosis", "plate tectonics", "the water cycle", "enzymes"]
+    document = " ".join(
+        f"Section {i} on {topic}: " + f"{topic} is explained here in detail. " * 40
+        for i, topic in enumerate(topics)
+    )
+    router = HybridRouter()
+    router.cache.enabled = False
+    council = SwarmCouncil(router=router)
+    council.retriever = ReferenceRetriever(min_chars=1000, top_k=2, chunk_words=40, overlap_words=5)
+    calls = []
+    
+    async def fake_route(prompt, system_prompt, preferred_model="gemini", **kwargs):
+        calls.append((preferred_model, prompt, system_prompt))
+        return '{"score": 70, "confidence": 0.8, "feedback": "ok", "reasoning": "r"}'
+    
+    with patch.object(router, "route_request", side_effect=fake_route):
+        for topic in topics:
+            await council.gather_council_votes(f"My answer is about {topic}.", document)
+    
+    fact_calls = [(prompt, system) for model, prompt, system in calls if model == "gemini"]
+    assert len(fact_calls) == len(topics)
+    assert len({system for _, system in fact_calls}) == 1
+    assert "REFERENCE MATERIAL" not in fact_calls[0][1]
+    assert all("REFERENCE MATERIAL (excerpts" in prompt for prompt, _ in fact_calls)
+
+
+@pytest.mark.asyncio
+async def test_security_agent_flags_copied_known_source():
+    """Test the semantic plagiarism check scores copies of indexed sources."""
+    from backend.infra.router import HybridRouter
+    from backend.swarm.agents import SecurityAgent
+    
+    source = "Photosynthesis converts light energy into chemical energy stored in glucose molecules."
+    agent = SecurityAgent(HybridRouter())
+    assert await agent._check_plagiarism(source) == 0.0  # No known sources yet
+    
+    agent.add_known_sources([source, "Plate tectonics shapes volcanic island chains."], ["bio-101", "geo-7"])
+    
+    assert await agent._check_plagiarism(source) == 100.0
+    assert await agent._check_plagiarism("My essay argues that trade guilds shaped medieval towns.") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_security_agent_flags_peer_submissions():
+    """Test near-duplicate answers to the same question lower the security vote."""
+    from backend.infra.router import HybridRouter
+    from backend.swarm.agents import SecurityAgent
+    from backend.vectors.minhash import MinHashIndex
+    
+    answer = ("Mitochondria generate most of the cell's ATP through oxidative phosphorylation "
+              "across the inner membrane, using the proton gradient built by the electron transport chain.")
+    agent = SecurityAgent(HybridRouter())
+    agent.peer_index = MinHashIndex()
+    
+    first = await agent.evaluate(answer, question_id="bio-q3", submission_id="s1")
+    copied = await agent.evaluate(answer, question_id="bio-q3", submission_id="s2")
+    
+    assert first.score == 100.0
+    assert copied.score == 0.0
+    assert "s1 (Jaccard 1.00)" in copied.reasoning
+    assert "Near-duplicate of 1 earlier submission" in copied.feedback
+
+
+def test_phrase_matcher_single_pass_positions_and_counts():
+    """Test overlapping phrases are found with positions, respecting word boundaries."""
+    from backend.swarm.phrases import PhraseMatcher
+    
+    matcher = PhraseMatcher({"pronoun": ["he", "she", "hers"], "transition": ["moreover,"]})
+    text = "She said hers. Whatsoever, MOREOVER, he left."
+    
+    result = matcher.find(text)
+    
+    found = [(m.phrase, text[m.start:m.end]) for m in result.matches]
+    assert found == [("she", "She"), ("hers", "hers"), ("moreover,", "MOREOVER,"), ("he", "he")]
+    assert result.counts == {"pronoun": 3, "transition": 1}
+
+
+def test_phrase_library_hot_reload(tmp_path):
+    """Test the phrase file is recompiled when it changes, and a broken edit is ignored."""
+    import json
+    import os
+    from backend.swarm.phrases import PhraseLibrary
+    
+    path = tmp_path / "phrases.json"
+    path.write_text(json.dumps({"categories": {"filler": {"weight": 20, "phrases": ["delve into"]}}}))
+    library = PhraseLibrary(str(path), check_interval=0.0)
+    assert library.score(library.find("Let us delve into it.")) == 20.0
+    
+    path.write_text(json.dumps({"categories": {"filler": {"weight": 20, "phrases": ["tapestry"]}}}))
+    os.utime(path, (1, 1))  # Ensure a distinct mtime
+    assert library.find("Let us delve into it.").matches == []
+    assert library.find("A rich tapestry.").counts == {"filler": 1}
+    
+    path.write_text("{not json")
+    os.utime(path, (2, 2))
+    assert library.find("A rich tapestry.").counts == {"filler": 1}
+    assert library.reloads == 2
+
+
+def test_shipped_phrases_can_flag_but_never_veto():
+    """Test ordinary connectives stay unflagged and phrases alone stay below the veto."""
+    import json
+    from backend.digital_twin.consensus_engine import get_consensus_engine
+    from backend.swarm.phrases import DEFAULT_PHRASES_PATH, PhraseLibrary
+    
+    library = PhraseLibrary()
+    transitions = "Moreover, the data agree. Furthermore, it is worth noting the trend. In conclusion, it holds."
+    assert library.score(library.find(transitions)) < 30.0
+    
+    categories = json.loads(DEFAULT_PHRASES_PATH.read_text())["categories"]
+    everything = ". ".join(p for c in categories.values() for p in c["phrases"])
+    ai_score = library.score(library.find(everything))
+    result = get_consensus_engine().score([[90.0, 90.0, 90.0, 100.0 - ai_score]])
+    
+    assert ai_score == library.max_score
+    assert not result.vetoed[0] and result.review[0]
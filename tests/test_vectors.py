@@ -0,0 +1,467 @@
+"""
+Vector Engine Tests
+===================
+
+Tests for embeddings, reference retrieval and vector search.
+"""
+
+import numpy as np
+import pytest
+
+from backend.swarm.patent_logic import TriVectorContext
+from backend.vectors.embeddings import HashingEmbedder
+from backend.vectors.indexes import VectorIndex, cosine_similarity
+from backend.vectors.minhash import MinHashIndex
+from backend.vectors.service import EmbeddingService
+from backend.vectors.retrieval import ReferenceRetriever, chunk_text
+from backend.config import load_penalty_weight
+from backend.vectors.triangulation import TriangulationEngine
+
+
+TEXTBOOK = " ".join(
+    [f"Chapter {i} discusses the history of trade routes and merchant guilds in detail." for i in range(300)]
+    + ["Photosynthesis converts light energy into chemical energy stored as glucose in chloroplasts."]
+    + [f"Section {i} covers the geology of volcanic islands and plate tectonics." for i in range(300)]
+)
+
+
+class TestEmbeddings:
+    """Tests for the hashing embedder."""
+    
+    def test_vectors_are_normalised_and_deterministic(self):
+        """Test rows are unit length and identical across embedder instances."""
+        a = HashingEmbedder(dim=64).embed(["plants make glucose", ""])
+        b = HashingEmbedder(dim=64).embed(["plants make glucose"])
+        
+        assert a.dtype == np.float32 and a.shape == (2, 64)
+        assert np.isclose(np.linalg.norm(a[0]), 1.0)
+        assert not a[1].any()  # Empty text embeds to zeros
+        assert np.array_equal(a[0], b[0])
+    
+    def test_similar_texts_score_higher(self):
+        """Test word overlap drives cosine similarity."""
+        query, near, far = HashingEmbedder().embed([
+            "light energy becomes glucose in photosynthesis",
+            "photosynthesis turns light energy into glucose",
+            "volcanic islands form over tectonic hotspots",
+        ])
+        assert query @ near > query @ far
+
+
+class TestReferenceRetrieval:
+    """Tests for chunked retrieval over long PDF contexts."""
+    
+    def test_chunks_overlap_and_cover_the_text(self):
+        """Test word windows overlap and the last words are included."""
+        words = [f"w{i}" for i in range(25)]
+        chunks = chunk_text(" ".join(words), chunk_words=10, overlap_words=3)
+        
+        assert chunks[0].split()[-3:] == chunks[1].split()[:3]
+        assert chunks[-1].split()[-1] == "w24"
+    
+    @pytest.mark.asyncio
+    async def test_long_context_reduced_to_relevant_chunks(self):
+        """Test only the top-k chunks (including the relevant one) are returned."""
+        retriever = ReferenceRetriever(min_chars=1000, top_k=2, chunk_words=40, overlap_words=5)
+        
+        context = await retriever.select_context(TEXTBOOK, "Photosynthesis stores light energy as glucose")
+        
+        assert "Photosynthesis converts light energy" in context
+        assert len(context) < len(TEXTBOOK) / 10
+        stats = retriever.get_stats()
+        assert stats["retrievals"] == 1 and stats["prompt_chars_saved"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_document_indexed_once_per_exam(self):
+        """Test concurrent answers for one exam share a single ingestion."""
+        import asyncio
+        
+        retriever = ReferenceRetriever(min_chars=1000)
+        await asyncio.gather(*(retriever.select_context(TEXTBOOK, f"answer {i}") for i in range(5)))
+        
+        assert retriever.stats.documents_indexed == 1
+        assert retriever.stats.retrievals == 5
+    
+    @pytest.mark.asyncio
+    async def test_short_context_passes_through(self):
+        """Test short references are used whole (keeping the cacheable prefix)."""
+        retriever = ReferenceRetriever(min_chars=1000)
+        
+        assert await retriever.select_context("Short notes.", "answer") == "Short notes."
+        assert await retriever.select_context(None, "answer") is None
+        assert retriever.stats.documents_indexed == 0
+
+
+class TestVectorIndex:
+    """Tests for the in-process vector index."""
+    
+    @pytest.fixture
+    def corpus(self):
+        rng = np.random.default_rng(7)
+        return rng.normal(size=(2000, 32)).astype(np.float32)
+    
+    def test_batched_search_matches_brute_force(self, corpus):
+        """Test batched top-k equals a per-query brute-force ranking."""
+        index = VectorIndex(dim=32)
+        index.add(corpus[:1500])
+        index.add(corpus[1500:])  # Appends grow the same matrix
+        queries = corpus[[3, 1700, 42]]
+        
+        scores, positions = index.search(queries, k=5)
+        
+        expected = np.argsort(-cosine_similarity(queries, corpus), axis=1)[:, :5]
+        assert np.array_equal(positions, expected)
+        assert positions[:, 0].tolist() == [3, 1700, 42]
+        assert np.allclose(scores[:, 0], 1.0, atol=1e-5)
+        assert np.all(np.diff(scores, axis=1) <= 0)  # Best first
+    
+    def test_search_pads_to_k(self, corpus):
+        """Test exact, IVF and empty searches all return (Q x k), padded with -1 / -inf."""
+        index = VectorIndex(dim=corpus.shape[1], nprobe=1)
+        empty_scores, empty_positions = index.search(corpus[:2], k=3)
+        index.add(corpus[:4])
+        exact_scores, exact_positions = index.search(corpus[:2], k=6)
+        index.build_ivf(nlist=2, seed=0)
+        _, ivf_positions = index.search(corpus[:2], k=6)
+        
+        assert empty_positions.shape == (2, 3) and np.all(empty_positions == -1)
+        assert np.all(np.isneginf(empty_scores))
+        assert exact_positions.shape == ivf_positions.shape == (2, 6)
+        assert np.all(exact_positions[:, 4:] == -1) and np.all(np.isneginf(exact_scores[:, 4:]))
+        assert exact_positions[0, 0] == 0 and np.all(ivf_positions[:, 4:] == -1)
+    
+    def test_ivf_search_finds_near_duplicates(self, corpus):
+        """Test approximate search recovers perturbed copies of stored rows."""
+        index = VectorIndex(dim=32, nprobe=4)
+        index.add(corpus)
+        index.build_ivf(nlist=32)
+        rng = np.random.default_rng(1)
+        targets = rng.choice(len(corpus), 50, replace=False)
+        queries = corpus[targets] + 0.05 * rng.normal(size=(50, 32)).astype(np.float32)
+        
+        _, positions = index.search(queries, k=1)
+        
+        assert index.approximate
+        assert np.mean(positions[:, 0] == targets) >= 0.95
+    
+    def test_save_and_load_memory_mapped(self, corpus, tmp_path):
+        """Test a saved index reloads memory-mapped with keys and IVF state."""
+        index = VectorIndex(dim=32)
+        index.add(corpus[:100], keys=[f"doc{i}" for i in range(100)])
+        index.build_ivf(nlist=4)
+        index.save(tmp_path / "idx")
+        
+        loaded = VectorIndex.load(tmp_path / "idx")
+        
+        assert isinstance(loaded.vectors, np.memmap)
+        assert loaded.search_keys(corpus[10], k=1)[0][0] == "doc10"
+        loaded.add(corpus[100:101], keys=["new"])  # Copies out of the read-only map
+        assert len(loaded) == 101 and loaded.search_keys(corpus[100], k=1)[0][0] == "new"
+    
+    def test_tvca_alignment_uses_vector_cosine(self):
+        """Test TVCA cosine handles lists and zero vectors."""
+        tvca = TriVectorContext()
+        result = tvca.calculate_alignment([1.0, 0.0], [1.0, 0.0], [0.0, 1.0])
+        
+        assert result == pytest.approx({"adherence": 1.0, "internet_drift": 0.0})
+        assert tvca._cosine_sim([0.0, 0.0], [1.0, 0.0]) == 0.0
+
+
+class TestTriangulation:
+    """Tests for cohort-level TVCA."""
+    
+    def test_cohort_matches_per_student_alignment(self):
+        """Test one vectorised pass equals scoring students one at a time."""
+        rng = np.random.default_rng(3)
+        students = rng.normal(size=(50, 16))
+        course, world = rng.normal(size=16), rng.normal(size=16)
+        
+        cohort = TriangulationEngine([course], [world], penalty_weight=0.5).align(students)
+        tvca = TriVectorContext(penalty_weight=0.5)
+        single = [tvca.calculate_alignment(s.tolist(), course.tolist(), world.tolist()) for s in students[:5]]
+        
+        assert len(cohort) == 50
+        assert cohort.to_dicts()[:5] == pytest.approx(single)
+    
+    def test_per_student_alignment_reuses_engine(self):
+        """Test repeated calls with the same centroids share one engine."""
+        from backend.vectors.triangulation import get_triangulation_engine
+        
+        first = get_triangulation_engine([[1.0, 0.0]], [[0.0, 1.0]], penalty_weight=0.5)
+        
+        assert get_triangulation_engine([[1.0, 0.0]], [[0.0, 1.0]], penalty_weight=0.5) is first
+        assert get_triangulation_engine([[1.0, 0.0]], [[0.0, 1.0]], penalty_weight=0.8) is not first
+        assert get_triangulation_engine([[1.0, 0.0]], [[0.6, 0.8]], penalty_weight=0.5) is not first
+    
+    def test_multiple_centroids_use_best_match(self):
+        """Test each student is scored against its closest course and world centroid."""
+        engine = TriangulationEngine([[1, 0, 0], [0, 1, 0]], [[0, 0, 1]], penalty_weight=0.5)
+        
+        result = engine.align([[0, 1, 0], [0, 0, 1]])
+        
+        assert result.course_match.tolist() == [1, 0]
+        assert result.adherence == pytest.approx([1.0, -0.5])
+        assert result.internet_drift == pytest.approx([0.0, 1.0])
+    
+    def test_penalty_weight_from_consensus_matrix(self, tmp_path):
+        """Test the penalty comes from consensus_matrix.json with a safe default."""
+        config = tmp_path / "matrix.json"
+        config.write_text('{"tvca": {"internet_penalty_weight": 0.8}}')
+        
+        assert load_penalty_weight() == 0.5
+        assert load_penalty_weight(str(config)) == 0.8
+        assert load_penalty_weight(str(tmp_path / "missing.json")) == 0.5
+    
+    def test_benchmark_reports_throughput(self):
+        """Test the TVCA benchmark runs and both paths agree."""
+        from tests.benchmarks.bench_tvca import run_benchmark
+        
+        rows = run_benchmark([200], dim=32, loop_sample=50)
+        
+        assert rows[0]["vectorised_students_per_s"] > 0
+        assert rows[0]["max_abs_error"] < 1e-4
+
+
+ESSAY = (
+    "The industrial revolution began in Britain because of abundant coal, a growing "
+    "population, colonial markets and a culture of practical invention that rewarded "
+    "engineers who improved the steam engine and mechanised textile production."
+)
+
+
+PHOTOSYNTHESIS = (
+    "Photosynthesis takes place in the chloroplasts of leaf cells, where chlorophyll absorbs "
+    "light and the plant turns carbon dioxide and water into glucose, releasing oxygen."
+)
+
+
+class TestMinHash:
+    """Tests for the cross-submission MinHash/LSH index."""
+    
+    def test_near_duplicates_match_within_a_question(self):
+        """Test copies are found with a Jaccard estimate and other questions stay separate."""
+        index = MinHashIndex()
+        assert index.check_and_add("q1", "alice", ESSAY) == []
+        
+        edited = ESSAY.replace("abundant coal", "plentiful coal")
+        matches = index.check_and_add("q1", "bob", edited)
+        
+        assert [m.submission_id for m in matches] == ["alice"]
+        assert 0.6 < matches[0].jaccard < 1.0
+        assert index.check_and_add("q2", "carol", ESSAY) == []
+        assert index.check_and_add("q1", "dave", "Railways moved goods faster than canals ever could.") == []
+    
+    def test_resubmission_does_not_match_itself(self):
+        """Test a submission ID is indexed once and never matched against itself."""
+        index = MinHashIndex()
+        index.check_and_add("q1", "alice", ESSAY)
+        
+        assert index.check_and_add("q1", "alice", ESSAY) == []
+        assert index.get_stats()["submissions"] == 1
+    
+    def test_index_persists_and_recovers_partial_writes(self, tmp_path):
+        """Test signatures reload from disk and a torn append is discarded."""
+        index = MinHashIndex(directory=str(tmp_path))
+        index.check_and_add("q1", "alice", ESSAY)
+        index.check_and_add("q1", "bob", PHOTOSYNTHESIS)
+        sig_path, _ = index._paths("q1")
+        with open(sig_path, "ab") as f:
+            f.write(b"\x00" * 10)  # Crash mid-append
+        
+        reloaded = MinHashIndex(directory=str(tmp_path))
+        matches = reloaded.check_and_add("q1", "carol", ESSAY)
+        
+        assert [m.submission_id for m in matches] == ["alice"]
+        assert reloaded.get_stats()["submissions"] == 3
+        assert MinHashIndex(directory=str(tmp_path))._question("q1").ids == ["alice", "bob", "carol"]
+    
+    def test_short_answers_and_anonymous_submissions_are_not_indexed(self):
+        """Test identical short answers never match and answers without an ID are only checked."""
+        index = MinHashIndex()
+        short = "Mitochondria is the powerhouse of the cell."
+        
+        assert index.check_and_add("q1", "alice", short) == []
+        assert index.check_and_add("q1", "bob", short) == []
+        assert index.check_and_add("q1", None, ESSAY) == []
+        assert index.check_and_add("q1", None, ESSAY) == []
+        assert index.get_stats()["submissions"] == 0
+        assert index.get_stats()["skipped_short"] == 2
+    
+    def test_resubmission_replaces_earlier_entry(self, tmp_path):
+        """Test a new version under the same ID replaces the old one, also after reload."""
+        index = MinHashIndex(directory=str(tmp_path))
+        index.check_and_add("q1", "alice", ESSAY)
+        index.check_and_add("q1", "alice", PHOTOSYNTHESIS)
+        
+        assert index.check_and_add("q1", "bob", ESSAY) == []
+        reloaded = MinHashIndex(directory=str(tmp_path))
+        assert [m.submission_id for m in reloaded.check_and_add("q1", "carol", PHOTOSYNTHESIS)] == ["alice"]
+        assert reloaded.get_stats()["submissions"] == 3
+    
+    def test_resubmissions_overwrite_their_record_on_disk(self, tmp_path):
+        """Test repeated resubmissions keep one record per ID and old duplicate files are compacted."""
+        index = MinHashIndex(directory=str(tmp_path))
+        for text in (ESSAY, PHOTOSYNTHESIS, ESSAY, PHOTOSYNTHESIS):
+            index.check_and_add("q1", "alice", text)
+        sig_path, ids_path = index._paths("q1")
+        record = index.num_perm * 4
+        
+        assert sig_path.stat().st_size == record
+        assert ids_path.read_text().splitlines() == ["alice"]
+        
+        index._append("q1", "alice", index.signature(ESSAY))  # Older layout: appended copy
+        reloaded = MinHashIndex(directory=str(tmp_path))
+        assert [m.submission_id for m in reloaded.check_and_add("q1", "bob", ESSAY)] == ["alice"]
+        assert ids_path.read_text().splitlines() == ["alice", "bob"]
+        assert sig_path.stat().st_size == 2 * record
+    
+    def test_concurrent_near_duplicates_flag_each_other(self):
+        """Test two copies checked at the same time: the later one always sees the earlier."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        
+        index = MinHashIndex()
+        barrier = threading.Barrier(2)
+        signature = index.signature
+        
+        def synchronised_signature(text):
+            result = signature(text)
+            barrier.wait()  # Both answers reach the query together
+            return result
+        
+        index.signature = synchronised_signature
+        edited = ESSAY.replace("abundant coal", "plentiful coal")
+        with ThreadPoolExecutor(2) as pool:
+            results = list(pool.map(index.check_and_add, ["q1", "q1"], ["alice", "bob"], [ESSAY, edited]))
+        
+        assert sorted(len(matches) for matches in results) == [0, 1]
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Hashing embedder that records every batch it embeds."""
+    
+    def __init__(self, dim: int = 32):
+        super().__init__(dim)
+        self.batches = []
+    
+    def embed(self, texts):
+        self.batches.append(list(texts))
+        return super().embed(texts)
+
+
+class TestEmbeddingService:
+    """Tests for the shared, cached and batched embedding service."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_batched_and_embedded_once(self):
+        """Test concurrent callers share one embed() call and repeated texts hit the cache."""
+        import asyncio
+        
+        embedder = CountingEmbedder()
+        service = EmbeddingService(embedder, cache_dir=None)
+        
+        results = await asyncio.gather(
+            service.embed_many(["alpha", "beta"]),
+            service.embed_many(["beta", "gamma"]),
+            service.embed("alpha"),
+        )
+        again = await service.embed_many(["gamma", "alpha"])
+        
+        assert len(embedder.batches) == 1 and sorted(embedder.batches[0]) == ["alpha", "beta", "gamma"]
+        assert np.array_equal(results[0][0], results[2])
+        assert np.array_equal(again, embedder.embed(["gamma", "alpha"]))
+        assert service.get_stats()["hits"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_cache_persists_memory_mapped(self, tmp_path):
+        """Test vectors survive a restart and a torn append is discarded."""
+        await EmbeddingService(CountingEmbedder(), cache_dir=tmp_path).embed_many(["alpha", "beta"])
+        vectors_path = next(tmp_path.glob("*/vectors.f32"))
+        with open(vectors_path, "ab") as f:
+            f.write(b"\x00" * 7)
+        
+        embedder = CountingEmbedder()
+        service = EmbeddingService(embedder, cache_dir=tmp_path)
+        vectors = await service.embed_many(["beta", "alpha"])
+        
+        assert embedder.batches == []  # Served from disk
+        assert isinstance(service.cache._matrix(), np.memmap)
+        assert np.array_equal(vectors, embedder.embed(["beta", "alpha"]))
+    
+    def test_caches_sharing_a_directory_agree_on_rows(self, tmp_path):
+        """Test two processes' caches appending to one directory never misalign rows."""
+        from backend.vectors.service import EmbeddingCache
+        
+        first = EmbeddingCache(4, tmp_path)
+        second = EmbeddingCache(4, tmp_path)  # Opened before either writes
+        first.put_many(["a", "b"], np.array([[1, 0, 0, 0], [0, 1, 0, 0]], dtype=np.float32))
+        second.put_many(["c", "a"], np.array([[0, 0, 1, 0], [9, 9, 9, 9]], dtype=np.float32))
+        
+        for cache in (first, second, EmbeddingCache(4, tmp_path)):
+            vectors = cache.get_many(["a", "b", "c"])
+            assert vectors["a"].tolist() == [1, 0, 0, 0]
+            assert vectors["b"].tolist() == [0, 1, 0, 0]
+            assert vectors["c"].tolist() == [0, 0, 1, 0]
+        assert sorted((tmp_path / "keys.txt").read_text().split()) == ["a", "b", "c"]
+    
+    def test_cache_is_bounded(self, tmp_path):
+        """Test the cache starts over instead of growing past its bound."""
+        from backend.vectors.service import EmbeddingCache
+        
+        cache = EmbeddingCache(4, tmp_path, max_vectors=3)
+        reader = EmbeddingCache(4, tmp_path)
+        cache.put_many(["a", "b", "c"], np.eye(3, 4, dtype=np.float32))
+        assert reader.get_many(["a"])["a"].tolist() == [1, 0, 0, 0]
+        cache.put_many(["d"], np.ones((1, 4), dtype=np.float32))
+        
+        assert len(cache) == 1 and cache.resets == 1
+        assert (tmp_path / "vectors.f32").stat().st_size == 4 * 4
+        assert reader.get_many(["d", "a"]).keys() == {"d"}
+    
+    @pytest.mark.asyncio
+    async def test_cache_lock_waits_off_the_event_loop(self, tmp_path):
+        """Test a miss waiting on another worker's cache lock does not stall the loop."""
+        import asyncio
+        import threading
+        
+        fcntl = pytest.importorskip("fcntl")
+        service = EmbeddingService(HashingEmbedder(dim=8), cache_dir=tmp_path)
+        lock = open(service.cache.directory / ".lock", "a")
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)  # Another worker is appending
+        threading.Timer(0.2, fcntl.flock, (lock.fileno(), fcntl.LOCK_UN)).start()
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while not embedding.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+        
+        embedding = asyncio.ensure_future(service.embed_many(["waits for the lock"]))
+        await asyncio.gather(embedding, ticker())
+        lock.close()
+        
+        assert ticks >= 5
+        assert len(service.cache) == 1
+    
+    @pytest.mark.asyncio
+    async def test_tvca_and_persona_use_shared_embeddings(self):
+        """Test TVCA scores texts and persona style vectors come from the service."""
+        from backend.digital_twin.personality_loader import STYLE_VECTOR_DIM, load_teacher_persona
+        
+        service = EmbeddingService(HashingEmbedder(dim=64), cache_dir=None)
+        engine = await TriangulationEngine.from_texts(
+            ["photosynthesis light energy glucose chloroplast"],
+            ["stock markets and interest rates"],
+            embeddings=service,
+            penalty_weight=0.5,
+        )
+        result = await engine.align_texts(
+            ["light energy becomes glucose in the chloroplast", "interest rates move stock markets"],
+            embeddings=service,
+        )
+        persona = await load_teacher_persona("teacher_001")
+        
+        assert result.adherence[0] > result.adherence[1]
+        assert len(persona.style_vector) == STYLE_VECTOR_DIM
+        assert np.isclose(np.linalg.norm(persona.style_vector), 1.0)